@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# Chaikin3D - Node adjacency benchmark
+"""
+Measure the throughput of 'Node.connect' and 'Edge.are_connected'.
+
+Every node of a ring of random nodes is connected to its next 3 nodes (one
+main and two graphical edges, so the nodes have 6 edges), then random pairs
+of nodes that are at most 6 nodes apart are queried.
+
+    python benchmarks/adjacency.py [--src SRC] [--nodes 20000] [--queries 200000]
+
+'--src' is the 'src' directory to benchmark: a 'git worktree' of another
+commit gives the numbers to compare with.
+
+"""
+from __future__ import annotations
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# edges created per node (half of the valence)
+EDGES_PER_NODE = 3
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--src", default=os.path.join(ROOT, "src"))
+    parser.add_argument("--nodes", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200000)
+    args = parser.parse_args()
+    sys.path.insert(0, os.path.abspath(args.src))
+    from edge import Edge
+    from node import Node
+    import numpy as np
+
+    num_nodes = args.nodes
+    nodes = [Node(*point) for point in np.random.default_rng(0).random((num_nodes, 3))]
+    t = time.perf_counter()
+    for i in range(num_nodes):
+        for distance in range(1, EDGES_PER_NODE + 1):
+            nodes[i].connect(
+                nodes[(i + distance) % num_nodes],
+                "main" if distance == 1 else "graphical",
+            )
+    connect_rate = num_nodes * EDGES_PER_NODE / (time.perf_counter() - t)
+
+    rng = random.Random(0)
+    pairs = list()
+    for _ in range(args.queries):
+        i = rng.randrange(num_nodes)
+        pairs.append((nodes[i], nodes[(i + rng.randint(1, 6)) % num_nodes]))
+    t = time.perf_counter()
+    hits = sum(Edge.are_connected(node1, node2, "main") for node1, node2 in pairs)
+    query_rate = len(pairs) / (time.perf_counter() - t)
+    print(
+        f"connect {connect_rate:,.0f}/s, are_connected {query_rate:,.0f}/s "
+        f"({hits} connected pairs)"
+    )
+
+
+if __name__ == "__main__":
+    main()
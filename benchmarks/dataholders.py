@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# Chaikin3D - VirtualSet/VirtualDict benchmark
+"""
+Measure VirtualSet and VirtualDict against a list-scan reference.
+
+The reference classes ('ListSet' and 'ListDict') are the list-scan versions
+of VirtualSet and VirtualDict: their membership tests compare the values one
+by one (with 'Node.__eq__'). For every mesh, the nodes are split into sets of
+'--size' nodes, and 'add', '&', '-' and 'VirtualDict.__getitem__' are timed on
+them with both versions. Then one Chaikin3D generation ("python" kernel) is
+timed with both versions (the reference classes replace VirtualSet and
+VirtualDict in the modules of the tree), and the faces of the two generations
+are compared.
+
+    python benchmarks/dataholders.py [MESH ...] [--src SRC] [--size 200]
+
+The default meshes are all the files of 'example-meshes' but 'girl.obj' (the
+reference takes minutes on it). '--src' is the 'src' directory to benchmark:
+a 'git worktree' of another commit gives the numbers to compare with.
+
+"""
+from __future__ import annotations
+import argparse
+import glob
+import os
+import sys
+import time
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# meshes left out by default
+SLOW_MESHES = ("girl.obj",)
+
+
+class ListDict:
+    # list-scan reference of VirtualDict
+
+    def __init__(self, iterable=[]):
+        self.key_list = []
+        self.value_list = []
+        self.size = 0
+        for key, value in iterable:
+            self[key] = value
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        return zip(self.key_list, self.value_list)
+
+    def __setitem__(self, key, value):
+        if key in self.key_list:
+            self.value_list[self.key_list.index(key)] = value
+        else:
+            self.key_list.append(key)
+            self.value_list.append(value)
+            self.size += 1
+
+    def __getitem__(self, key):
+        return self.value_list[self.key_list.index(key)]
+
+    def __contains__(self, key) -> bool:
+        return key in self.key_list
+
+    def keys(self):
+        return self.key_list
+
+    def values(self):
+        return self.value_list
+
+    def contains_key(self, key) -> bool:
+        return key in self.key_list
+
+    def contains_value(self, value) -> bool:
+        return value in self.value_list
+
+
+class ListSet:
+    # list-scan reference of VirtualSet
+
+    def __init__(self, iterable=None):
+        self.data = []
+        if iterable:
+            if type(iterable) == ListSet:
+                self.data = list(iterable.data)
+            else:
+                for value in iterable:
+                    if value not in self.data:
+                        self.data.append(value)
+        self.size = len(self.data)
+
+    def __str__(self):
+        return "v{" + ", ".join(map(str, self.data)) + "}v"
+
+    def __repr__(self):
+        return str(self)
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __getitem__(self, index: int):
+        return self.data[index]
+
+    def __contains__(self, value) -> bool:
+        return value in self.data
+
+    def __eq__(self, other: ListSet) -> bool:
+        return all(element in other.data for element in self.data)
+
+    def __and__(self, other_set: ListSet) -> ListSet:
+        return ListSet(element for element in other_set if element in self)
+
+    def __or__(self, other_set: ListSet) -> ListSet:
+        return ListSet(self.data + other_set.data)
+
+    def __sub__(self, other_set: ListSet) -> ListSet:
+        return ListSet(element for element in self if element not in other_set)
+
+    def add(self, value, verify: bool = True) -> bool:
+        if not verify or value not in self.data:
+            self.data.append(value)
+            self.size += 1
+            return True
+        return False
+
+    def pop(self):
+        self.size -= 1
+        return self.data.pop()
+
+    def copy(self) -> ListSet:
+        virtual_set_copy = ListSet()
+        virtual_set_copy.data = self.data.copy()
+        virtual_set_copy.size = self.size
+        return virtual_set_copy
+
+
+def time_operations(nodes: list, size: int, Set: type, Dict: type) -> dict:
+    """
+    Returns the rate (operations per second) of the set and dict operations.
+
+    The nodes are split into sets of 'size' nodes. Every set is built with
+    'add', then intersected with and subtracted from the set of the next
+    nodes, half of which it shares. Every node is then stored in a dict and
+    read back.
+
+    """
+
+    chunks = [nodes[start : start + size] for start in range(0, len(nodes), size)]
+    elapsed = dict.fromkeys(("add", "&", "-", "getitem"), 0.0)
+    count = 0
+    for i, chunk in enumerate(chunks):
+        shifted = nodes[i * size + size // 2 : i * size + size // 2 + size]
+        t = time.perf_counter()
+        nodes_set = Set()
+        for node in chunk:
+            nodes_set.add(node)
+        elapsed["add"] += time.perf_counter() - t
+        other_set = Set(shifted)
+        t = time.perf_counter()
+        nodes_set & other_set
+        elapsed["&"] += time.perf_counter() - t
+        t = time.perf_counter()
+        nodes_set - other_set
+        elapsed["-"] += time.perf_counter() - t
+        nodes_dict = Dict((node, j) for j, node in enumerate(chunk))
+        t = time.perf_counter()
+        for node in chunk:
+            nodes_dict[node]
+        elapsed["getitem"] += time.perf_counter() - t
+        count += len(chunk)
+    return {name: count / max(seconds, 1e-9) for name, seconds in elapsed.items()}
+
+
+def time_generation(path: str, a: types.SimpleNamespace) -> tuple[float, list]:
+    """
+    Returns the time of one Chaikin3D generation of a mesh, and its faces.
+
+    The object graph of the mesh is built before the timer starts.
+
+    """
+
+    import mesh_cache
+
+    poly = mesh_cache.load_polyhedron(path)
+    poly.nodes
+    t = time.perf_counter()
+    poly = poly.chaikin(1, a)
+    elapsed = time.perf_counter() - t
+    coords = [tuple(point) for point in poly.mesh.vertices.round(9).tolist()]
+    faces = sorted(
+        tuple(sorted(coords[v] for v in face)) for face in poly.mesh.iter_faces()
+    )
+    return elapsed, faces
+
+
+def use_classes(Set: type, Dict: type) -> None:
+    """
+    Replace VirtualSet and VirtualDict in all the modules of the tree.
+
+    """
+
+    import dataholders
+
+    for module in list(sys.modules.values()):
+        for name, cls in (("VirtualSet", Set), ("VirtualDict", Dict)):
+            if module is not dataholders and hasattr(module, name):
+                setattr(module, name, cls)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("meshes", nargs="*")
+    parser.add_argument("--src", default=os.path.join(ROOT, "src"))
+    parser.add_argument("--size", type=int, default=200)
+    args = parser.parse_args()
+    sys.path.insert(0, os.path.abspath(args.src))
+    from dataholders import VirtualDict, VirtualSet
+    import mesh_cache
+
+    a = types.SimpleNamespace(
+        chaikin_coef=4.0,
+        chaikin_kernel="python",
+        order_edges="none",
+        workers=1,
+        verbosity=0,
+    )
+    meshes = args.meshes or [
+        path
+        for path in sorted(glob.glob(os.path.join(ROOT, "example-meshes", "*.obj")))
+        if os.path.basename(path) not in SLOW_MESHES
+    ]
+    for path in meshes:
+        nodes = list(mesh_cache.load_polyhedron(path).nodes)
+        rates = time_operations(nodes, args.size, VirtualSet, VirtualDict)
+        reference_rates = time_operations(nodes, args.size, ListSet, ListDict)
+        elapsed, faces = time_generation(path, a)
+        use_classes(ListSet, ListDict)
+        try:
+            reference_elapsed, reference_faces = time_generation(path, a)
+        finally:
+            use_classes(VirtualSet, VirtualDict)
+        operations = ", ".join(
+            f"{name} {rates[name]:,.0f}/s ({reference_rates[name]:,.0f}/s)"
+            for name in rates
+        )
+        print(
+            f"{os.path.basename(path)}: {len(nodes)} nodes, {operations}, "
+            f"chaikin {elapsed:.2f}s ({reference_elapsed:.2f}s, "
+            f"{'same' if faces == reference_faces else 'different'} faces)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# Chaikin3D - Plotly draw data benchmark
+"""
+Measure the time 'Renderer.get_polyhedron_draw_data' (plotly) takes.
+
+Every mesh is subdivided with the "numpy" kernel, then its draw data is built
+and timed. The triangle set of the draw data (sorted coordinate triples) is
+hashed, so that the output of two trees can be compared.
+
+    python benchmarks/draw_data.py [MESH ...] [--src SRC] [-g 0 1 2] [-t any]
+
+The default meshes are all the files of 'example-meshes'. '--src' is the 'src'
+directory to benchmark: a 'git worktree' of another commit gives the numbers
+to compare with.
+
+"""
+from __future__ import annotations
+import argparse
+import glob
+import hashlib
+import os
+import sys
+import time
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("meshes", nargs="*")
+    parser.add_argument("--src", default=os.path.join(ROOT, "src"))
+    parser.add_argument("-g", "--generations", type=int, nargs="+", default=[0])
+    parser.add_argument("-t", "--type", default="any", help="main, graphical, any")
+    args = parser.parse_args()
+    sys.path.insert(0, os.path.abspath(args.src))
+    from plotly_renderer import Renderer
+    import mesh_cache
+    import numpy as np
+
+    a = types.SimpleNamespace(
+        chaikin_coef=4.0,
+        chaikin_kernel="numpy",
+        order_edges="none",
+        workers=1,
+        verbosity=0,
+    )
+    meshes = args.meshes or sorted(
+        glob.glob(os.path.join(ROOT, "example-meshes", "*.obj"))
+    )
+    # the first plotly trace of a process also loads its validators
+    warm_up = os.path.join(ROOT, "example-meshes", "tetrahedron.obj")
+    Renderer().get_polyhedron_draw_data(mesh_cache.load_polyhedron(warm_up))
+    for path in meshes:
+        for generation in args.generations:
+            poly = mesh_cache.load_polyhedron(path).chaikin(generation, a)
+            # the mesh, its triangulation and the triangle index are not timed
+            poly.face_triangles()
+            if args.type != "any":
+                poly.triangles(args.type)
+            t = time.perf_counter()
+            draw_data = Renderer().get_polyhedron_draw_data(poly, type_=args.type)
+            elapsed = time.perf_counter() - t
+            if draw_data:
+                trace = draw_data[0]
+                vertices = np.column_stack(
+                    [np.asarray(trace[axis], dtype=np.float64) for axis in "xyz"]
+                )
+                triangles = np.column_stack(
+                    [np.asarray(trace[axis], dtype=np.int64) for axis in "ijk"]
+                )
+            else:
+                vertices = np.empty((0, 3))
+                triangles = np.empty((0, 3), dtype=np.int64)
+            key = sorted(
+                tuple(sorted(map(tuple, vertices[triangle].tolist())))
+                for triangle in triangles
+            )
+            digest = hashlib.sha1(repr(key).encode()).hexdigest()[:12]
+            print(
+                f"{os.path.basename(path):<18} gen {generation}  {elapsed:8.4f}s  "
+                f"{len(triangles):>7} triangles  {digest}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# Chaikin3D - Million-face benchmark
+"""
+Load, subdivide (one "numpy" generation) and save a synthetic mesh of more
+than a million faces, and check the peak memory of the run.
+
+The mesh is a flat (n x n) grid of quads, written as an OBJ file with v/vt/vn
+corners. The run is done in a child process, so that its peak RSS does not
+include the generation of the file.
+
+    python benchmarks/million_faces.py [--size 1001] [--max-rss 2G]
+
+"""
+from __future__ import annotations
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+from arg_utils import parse_size
+import numpy as np
+
+# number of grid rows written at once
+ROWS_PER_CHUNK = 64
+
+
+def write_grid(path: str, size: int) -> None:
+    """
+    Write a (size x size) grid of quads to an OBJ file.
+
+    Args:
+        path (str): Output file.
+        size (int): Number of quads per side.
+
+    """
+
+    with open(path, "w") as f:
+        f.write("vt 0 0\nvn 0 0 1\n")
+        for start in range(0, size + 1, ROWS_PER_CHUNK):
+            rows = np.arange(start, min(start + ROWS_PER_CHUNK, size + 1))
+            x, y = np.meshgrid(np.arange(size + 1), rows)
+            points = np.stack((x.ravel(), y.ravel(), np.zeros(x.size)), axis=1)
+            f.write(("v %d %d %d\n" * len(points)) % tuple(points.ravel().tolist()))
+        for start in range(0, size, ROWS_PER_CHUNK):
+            rows = np.arange(start, min(start + ROWS_PER_CHUNK, size))
+            x, y = np.meshgrid(np.arange(size), rows)
+            a = (y * (size + 1) + x + 1).ravel()
+            quads = np.stack((a, a + 1, a + size + 2, a + size + 1), axis=1)
+            f.write(
+                ("f %d/1/1 %d/1/1 %d/1/1 %d/1/1\n" * len(quads))
+                % tuple(quads.ravel().tolist())
+            )
+
+
+def run(input_path: str, output_path: str) -> None:
+    """
+    Load, subdivide and save a mesh (in the child process).
+
+    Args:
+        input_path  (str): Input (.obj) file.
+        output_path (str): Output (.obj) file.
+
+    """
+
+    import mesh_cache
+
+    a = types.SimpleNamespace(
+        chaikin_coef=4.0, chaikin_kernel="numpy", order_edges="none", workers=1
+    )
+    t = time.perf_counter()
+    poly = mesh_cache.load_polyhedron(input_path)
+    print(f"load    {time.perf_counter() - t:6.2f}s ({poly.size} faces)")
+    t = time.perf_counter()
+    poly = poly.chaikin(1, a)
+    print(f"chaikin {time.perf_counter() - t:6.2f}s ({poly.size} faces)")
+    t = time.perf_counter()
+    with open(output_path, "w") as f:
+        poly.save(f)
+    print(f"save    {time.perf_counter() - t:6.2f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--size", type=int, default=1001, help="quads per side")
+    parser.add_argument("--max-rss", default="2G", help="peak RSS bound of the run")
+    parser.add_argument("--run", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.run is not None:
+        run(*args.run)
+        return
+
+    max_rss = parse_size(args.max_rss)
+    with tempfile.TemporaryDirectory() as directory:
+        input_path = os.path.join(directory, "grid.obj")
+        output_path = os.path.join(directory, "grid-1.obj")
+        write_grid(input_path, args.size)
+        print(
+            f"input: {args.size ** 2} faces, "
+            f"{os.path.getsize(input_path) / 2 ** 20:.0f} MiB"
+        )
+        subprocess.run(
+            [sys.executable, __file__, "--run", input_path, output_path], check=True
+        )
+        print(f"output: {os.path.getsize(output_path) / 2 ** 20:.0f} MiB")
+    # kilobytes on Linux
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * 1024
+    print(f"peak RSS {peak / 2 ** 30:.2f} GiB (bound {max_rss / 2 ** 30:.2f} GiB)")
+    assert peak <= max_rss, "The run exceeded the memory bound"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# Chaikin3D - Node memory benchmark
+"""
+Measure the memory and the time it takes to create the nodes of a mesh.
+
+The nodes are created from the vertices of generation 3 of 'girl.obj' (with
+the "numpy" kernel), with 'Node.from_points' if the tree has it, or one
+'Node.from_point' per vertex. Only the coordinates and the node objects are
+measured (no edges), with tracemalloc, and the time is measured in a
+separate, untraced run.
+
+    python benchmarks/node_memory.py [--src SRC] [--input PATH] [--generations 3]
+
+'--src' is the 'src' directory to benchmark: a 'git worktree' of another
+commit gives the numbers to compare with.
+
+"""
+from __future__ import annotations
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--src", default=os.path.join(ROOT, "src"))
+    parser.add_argument(
+        "--input", default=os.path.join(ROOT, "example-meshes", "girl.obj")
+    )
+    parser.add_argument("--generations", type=int, default=3)
+    args = parser.parse_args()
+    sys.path.insert(0, os.path.abspath(args.src))
+    from node import Node
+    from wavefront_reader import WaveFrontReader
+    import numpy as np
+
+    a = types.SimpleNamespace(
+        chaikin_coef=4.0, chaikin_kernel="numpy", order_edges="none", workers=1
+    )
+    poly = WaveFrontReader(args.input, True).to_polyhedron()
+    for _ in range(args.generations):
+        poly = poly.Chaikin3D(a)
+    vertices = np.array(poly.mesh.vertices, dtype=np.float64)
+    del poly
+
+    def create_nodes() -> list:
+        # the buffer of the coordinates is part of the measure
+        if hasattr(Node, "from_points"):
+            return Node.from_points(vertices.copy())
+        return [Node.from_point(point) for point in vertices]
+
+    t = time.perf_counter()
+    nodes = create_nodes()
+    elapsed = time.perf_counter() - t
+    del nodes
+    # measured again, without the tracing overhead in the time
+    tracemalloc.start()
+    nodes = create_nodes()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{len(nodes)} nodes: {size / 2 ** 20:.1f} MiB "
+        f"({size / len(nodes):.0f} B/node), {elapsed:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
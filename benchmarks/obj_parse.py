@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# Chaikin3D - OBJ parser benchmark
+"""
+Measure the parse throughput of 'WaveFrontReader' (in MB/s).
+
+The files are 'girl.obj', and synthetic grids of quads with random heights,
+with plain ("f 1 2 3 4") or v/vt/vn ("f 1/1/1 ...") faces. '--large' adds a
+grid of a million vertices.
+
+    python benchmarks/obj_parse.py [--src SRC] [--large] [--repeat 3]
+
+'--src' is the 'src' directory to benchmark: a 'git worktree' of another
+commit gives the numbers to compare with.
+
+"""
+from __future__ import annotations
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def write_grid(path: str, size: int, slashes: bool) -> None:
+    """
+    Write a (size x size) grid of vertices, connected by quads, to an OBJ file.
+
+    Args:
+        path    (str) : Output file.
+        size    (int) : Number of vertices per side.
+        slashes (bool): Write v/vt/vn corners instead of plain indices.
+
+    """
+
+    import numpy as np
+
+    i, j = np.meshgrid(np.arange(size), np.arange(size), indexing="ij")
+    heights = np.random.default_rng(0).random(size * size)
+    vertices = np.stack((i.ravel() / size, j.ravel() / size, heights), axis=1)
+    a = (i[:-1, :-1] * size + j[:-1, :-1]).ravel() + 1
+    quads = np.stack((a, a + size, a + size + 1, a + 1), axis=1)
+    with open(path, "w") as f:
+        f.write("# grid\n")
+        np.savetxt(f, vertices, fmt="v %.9f %.9f %.9f")
+        if slashes:
+            np.savetxt(f, np.repeat(quads, 3, axis=1), fmt="f" + " %d/%d/%d" * 4)
+        else:
+            np.savetxt(f, quads, fmt="f %d %d %d %d")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--src", default=os.path.join(ROOT, "src"))
+    parser.add_argument("--large", action="store_true", help="add a 1M-vertex grid")
+    parser.add_argument("--repeat", type=int, default=3, help="best of N parses")
+    args = parser.parse_args()
+    sys.path.insert(0, os.path.abspath(args.src))
+    from wavefront_reader import WaveFrontReader
+
+    with tempfile.TemporaryDirectory() as directory:
+        files = [("girl.obj", os.path.join(ROOT, "example-meshes", "girl.obj"))]
+        grids = [(250, True), (250, False)] + ([(1000, True)] if args.large else [])
+        for size, slashes in grids:
+            name = (
+                f"{size * size}-vertex grid, {'v/vt/vn' if slashes else 'plain'} faces"
+            )
+            path = os.path.join(directory, f"grid-{size}-{slashes}.obj")
+            write_grid(path, size, slashes)
+            files.append((name, path))
+
+        for name, path in files:
+            megabytes = os.path.getsize(path) / 1e6
+            try:
+                elapsed = float("inf")
+                for _ in range(args.repeat):
+                    t = time.perf_counter()
+                    WaveFrontReader(path, True)
+                    elapsed = min(elapsed, time.perf_counter() - t)
+                result = f"{megabytes / elapsed:6.1f} MB/s"
+            except Exception as e:
+                result = f"failed ({type(e).__name__})"
+            print(f"{name:<40} {megabytes:7.1f} MB  {result}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,19 +3,54 @@ import sys
 
 sys.path.insert(0, "src/")
 from polyhedron import Polyhedron
-from wavefront_reader import WaveFrontReader
-from arg_utils import gen_arg_parser, read_args
+from arg_utils import gen_arg_parser, physical_memory, read_args
+from checkpoint import Checkpoint
+from generation_cache import GenerationCache
 import plotting
+import batch
+import mesh_cache
+import mesh_writers
 
 
-def save_poly(poly, figure, output):
+def format_size(size: int) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size < 1024:
+            break
+        size /= 1024
+    else:
+        unit = "TiB"
+    return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+
+
+def print_plan(plan, html_overhead):
+    print(
+        f"{'gen':>3} {'vertices':>12} {'main edges':>12} {'faces':>12} "
+        f"{'triangles':>12} {'memory':>10} {'obj':>10} {'html':>10}"
+    )
+    for row in plan:
+        print(
+            f"{row['generation']:>3} {row['vertices']:>12} {row['main edges']:>12} "
+            f"{row['faces']:>12} {row['triangles']:>12} "
+            f"{format_size(row['memory']):>10} {format_size(row['obj']):>10} "
+            f"{format_size(row['html'] + html_overhead):>10}"
+        )
+
+
+def save_poly(poly, figure, output, precision=None):
     # writing to file
     if not output:
         return
     print(f"Saving file to {output!r}")
     if output.endswith(".obj"):
         with open(output, "w") as f:
-            poly.save(f)
+            poly.save(f, precision)
+    elif output.endswith(".ply"):
+        mesh = poly.mesh
+        mesh_writers.write_ply(output, mesh.vertices, mesh.he_vertex, mesh.face_offsets)
+    elif output.endswith(".stl"):
+        mesh_writers.write_stl(output, poly.mesh.vertices, poly.face_triangles())
+    elif output.endswith(".glb"):
+        mesh_writers.write_glb(output, poly.mesh.vertices, poly.face_triangles())
     elif output.endswith(".html"):
         assert figure is not None, "Must plot the mesh when saving to html"
         figure.write_html(output)
@@ -33,26 +68,73 @@ def main():
 
     vprint = print if a.verbose else lambda *args, **kwargs: None
 
+    # batch mode
+    if a.output_dir is not None:
+        results = batch.run_batch(a)
+        if any(stats["error"] for stats in results):
+            sys.exit(1)
+        return
+
     # create a renderer
     Renderer = a.renderer_class
     renderer = Renderer(verbose=a.verbose)
 
     # input file
-    reader = WaveFrontReader(a.input, True, a.rotate_mesh, a.verbosity)
-    poly = reader.to_polyhedron()
+    poly = mesh_cache.load_polyhedron(a.input, a.rotate_mesh, a.cache_dir, a.verbosity)
+
+    # predict the size of the generations (nothing is rendered with '-p none'),
+    # or only their memory for the physical memory check
+    render = a.plot != "none"
+    if a.plan or a.memory_limit is not None:
+        plan = poly.plan(a.chaikin_generations, a, render)
+        memory = [row["memory"] for row in plan]
+    else:
+        memory = poly.memory_plan(a.chaikin_generations, a, render)
+    if a.plan:
+        try:
+            from plotly.offline import get_plotlyjs
+
+            html_overhead = len(get_plotlyjs())
+        except ImportError:
+            html_overhead = 0
+        print_plan(plan, html_overhead)
+    # the estimate is rough: only an explicit limit stops the run
+    limit = physical_memory() if a.memory_limit is None else a.memory_limit
+    if limit is not None and memory[-1] > limit:
+        feasible = [
+            generation for generation, size in enumerate(memory) if size <= limit
+        ]
+        suggestion = (
+            f"try -cg {feasible[-1]}"
+            if feasible
+            else "even the input mesh does not fit"
+        )
+        message = (
+            f"Estimated memory for {a.chaikin_generations} generations "
+            f"({format_size(memory[-1])}) exceeds the "
+            f"{'physical memory' if a.memory_limit is None else 'memory limit'} "
+            f"({format_size(limit)}): {suggestion}"
+        )
+        if a.memory_limit is not None:
+            sys.exit(message)
+        print(f"Warning: {message}", file=sys.stderr)
+    if a.plan:
+        return
+
+    cache = GenerationCache(a.generation_cache_size, a.generation_cache_dir, a.verbose)
 
     # do chaikin generations before any graphics ?
     if a.plot != "evolution" and a.plot != "animation":
-        assert (
-            a["chaikin generations"] >= 0
-        ), f"Number of generations must be positive ({a.chaikin_generations} >= 0)"
-        for _ in range(a.chaikin_generations):
-            vprint(" - 3D Chaikin -")
-            poly = poly.Chaikin3D(a)
-            vprint("Chaikin done")
+        if a.checkpoint_dir is None:
+            poly = cache.chaikin(poly, a.chaikin_generations, a)
+        else:
+            with Checkpoint(a.checkpoint_dir, a.input, a, a.verbose) as checkpoint:
+                poly = poly.chaikin(a.chaikin_generations, a, checkpoint)
 
     # switch the plot type
-    if a.plot == "simple" or a.plot == "none":
+    if a.plot == "none":
+        save_poly(poly, None, a.output, a.precision)
+    elif a.plot == "simple":
         poly_dd = renderer.get_polyhedron_draw_data(
             poly, type_="any", alpha=a.alpha, color=a.polygon_color
         )
@@ -75,15 +157,14 @@ def main():
         else:
             graphical_conn_dd = list()
         fig = renderer.figure(poly_dd + graphical_conn_dd + main_conn_dd)
-        save_poly(poly, fig, a.output)
-        if a.plot == "simple":
-            fig.show()
+        save_poly(poly, fig, a.output, a.precision)
+        fig.show()
     elif a.plot == "full":
         fig = plotting.draw_full(renderer, poly, a)
-        save_poly(poly, fig, a.output)
+        save_poly(poly, fig, a.output, a.precision)
     elif a.plot == "evolution":
-        fig = plotting.draw_chaikin_evolution(renderer, poly, a)
-        save_poly(poly, fig, a.output)
+        fig = plotting.draw_chaikin_evolution(renderer, poly, a, cache)
+        save_poly(poly, fig, a.output, a.precision)
     elif a.plot == "animation":
         raise NotImplementedError("Animation plot not implemetned yet")
         plotting.chaikin_animation(renderer, poly, a)
@@ -4,6 +4,8 @@ import os
 
 ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
 DEFAULT_ARGS_JSON_FILE_PATH = "default-args.json"
+# mesh formats (text and binary) and plotly rendering
+OUTPUT_EXTENSIONS = (".obj", ".ply", ".stl", ".glb", ".html")
 
 
 class ArgumentError(Exception):
@@ -39,6 +41,13 @@ def gen_arg_parser() -> ArgumentParser:
         help="Rotate the mesh when loading a file",
         action="store_true",
     )
+    parser.add_argument(
+        "-cd",
+        "--cache-dir",
+        type=str,
+        default=None,
+        help="Cache the parsed meshes in this directory",
+    )
     # chaikin algorithm
     parser.add_argument(
         "-cg",
@@ -50,6 +59,20 @@ def gen_arg_parser() -> ArgumentParser:
     parser.add_argument(
         "-cc", "--chaikin-coef", type=float, default=4.0, help="Chaikin coefficient"
     )
+    parser.add_argument(
+        "-ck",
+        "--chaikin-kernel",
+        type=str,
+        default="python",
+        help='Chaikin kernel ["python", "numpy"]',
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=1,
+        help='Number of worker processes for the cut points and the new faces (with the "numpy" kernel, the connectivity of the meshes is built in the main process)',
+    )
     parser.add_argument(
         "-oe",
         "--order-edges",
@@ -57,6 +80,41 @@ def gen_arg_parser() -> ArgumentParser:
         default="none",
         help='Order edges ["none", "first", "all"]',
     )
+    parser.add_argument(
+        "-cpd",
+        "--checkpoint-dir",
+        type=str,
+        default=None,
+        help='Save every generation in this directory, and resume from the last saved one (with the "numpy" kernel)',
+    )
+    parser.add_argument(
+        "-gcs",
+        "--generation-cache-size",
+        type=str,
+        default="1G",
+        help='Memory budget of the generation cache (e.g. "512M", "4G", df. "1G")',
+    )
+    parser.add_argument(
+        "-gcd",
+        "--generation-cache-dir",
+        type=str,
+        default=None,
+        help="Also keep the computed generations in this directory, to reuse them in later runs",
+    )
+    # planning
+    parser.add_argument(
+        "-pl",
+        "--plan",
+        help="Print the predicted size of each generation and exit",
+        action="store_true",
+    )
+    parser.add_argument(
+        "-ml",
+        "--memory-limit",
+        type=str,
+        default=None,
+        help='Refuse to run above this memory estimate (e.g. "512M", "4G", df. no limit)',
+    )
     parser.add_argument("-v", "--verbose", help="verbose mode", action="store_true")
     parser.add_argument("-vv", "--vverbose", help="very-verbose", action="store_true")
     # what to plot
@@ -120,12 +178,79 @@ def gen_arg_parser() -> ArgumentParser:
         "--output",
         type=str,
         default=None,
-        help="Output file path (wavefront '.obj' or '.html' format)",
+        help="Output file path (mesh: '.obj', '.ply', '.stl' or '.glb', rendering: '.html')",
+    )
+
+    parser.add_argument(
+        "-pr",
+        "--precision",
+        type=int,
+        default=None,
+        help="Number of significant digits of the coordinates in '.obj' outputs (df. exact)",
+    )
+
+    # batch
+    parser.add_argument(
+        "-od",
+        "--output-dir",
+        type=str,
+        default=None,
+        help="Batch mode: output directory (the input is a directory or a glob pattern)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Batch mode: number of files processed in parallel (df. number of CPUs)",
     )
 
     return parser
 
 
+def parse_size(size: str) -> int:
+    """
+    Parse a size in bytes, with an optional (binary) unit suffix.
+
+    Args:
+        size (str): Size ("1024", "512K", "4G", "1.5GB", etc.).
+
+    Returns:
+        int: Number of bytes.
+
+    Raises:
+        ArgumentError: The size is not valid
+
+    """
+
+    text = size.strip().upper().removesuffix("B").removesuffix("I")
+    exponent = "KMGT".find(text[-1:]) + 1 if text else 0
+    if exponent:
+        text = text[:-1]
+    try:
+        value = float(text)
+    except ValueError:
+        raise ArgumentError(f'Invalid size: "{size}"')
+    if value < 0:
+        raise ArgumentError(f'Invalid size: "{size}"')
+    return int(value * 1024 ** exponent)
+
+
+def physical_memory() -> int | None:
+    """
+    Returns the size of the physical memory of the machine.
+
+    Returns:
+        int | None: Number of bytes (None if it is not known on this platform).
+
+    """
+
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
 def read_args(arg_parser: ArgumentParser) -> dict[str, str | bool]:
     """
     Read and parse the command-line arguments.
@@ -159,11 +284,65 @@ def read_args(arg_parser: ArgumentParser) -> dict[str, str | bool]:
         f'Invalid value for "order-edges" option: {args["order edges"]}'
     )
 
+    # chaikin-kernel
+    assert args["chaikin kernel"] in ("python", "numpy"), ArgumentError(
+        f'Invalid value for "chaikin-kernel" option: {args["chaikin kernel"]}'
+    )
+
+    # workers
+    assert args["workers"] > 0, ArgumentError(
+        f'Invalid value for "workers" option: {args["workers"]} (must be positive)'
+    )
+    assert args["workers"] == 1 or args["chaikin kernel"] == "numpy", ArgumentError(
+        'The "workers" option needs the "numpy" chaikin-kernel'
+    )
+
+    # checkpoint-dir
+    assert (
+        args["checkpoint dir"] is None or args["chaikin kernel"] == "numpy"
+    ), ArgumentError('The "checkpoint-dir" option needs the "numpy" chaikin-kernel')
+    assert args["checkpoint dir"] is None or args["plot"] not in (
+        "evolution",
+        "animation",
+    ), ArgumentError(
+        f'The "checkpoint-dir" option cannot be used with the "{args["plot"]}" plot'
+    )
+
+    # generation cache
+    args["generation cache size"] = parse_size(args["generation cache size"])
+    assert (
+        args["generation cache dir"] is None or args["checkpoint dir"] is None
+    ), ArgumentError(
+        'The "generation-cache-dir" and "checkpoint-dir" options cannot be used together'
+    )
+
+    # batch
+    if args["output dir"] is not None:
+        assert args["output"] is None, ArgumentError(
+            'The "output" and "output-dir" options cannot be used together'
+        )
+        assert args["jobs"] > 0, ArgumentError(
+            f'Invalid value for "jobs" option: {args["jobs"]} (must be positive)'
+        )
+        assert args["workers"] == 1, ArgumentError(
+            'The "workers" option cannot be used in batch mode (use "jobs")'
+        )
+
+    # memory-limit
+    if args["memory limit"] is not None:
+        args["memory limit"] = parse_size(args["memory limit"])
+
     # output file
     if args["output"] is not None:
-        assert args["output"].endswith(".obj") or args["output"].endswith(
-            ".html"
-        ), f"Invalid file extension: '{args['output']}'. Must end with '.obj' or '.html'"
+        assert os.path.splitext(args["output"])[1] in OUTPUT_EXTENSIONS, ArgumentError(
+            f"Invalid file extension: '{args['output']}'. Must end with "
+            + ", ".join(f"'{extension}'" for extension in OUTPUT_EXTENSIONS)
+        )
+
+    # precision
+    assert args["precision"] is None or args["precision"] > 0, ArgumentError(
+        f'Invalid value for "precision" option: {args["precision"]} (must be positive)'
+    )
 
     # verbosity level
     if args["vverbose"]:
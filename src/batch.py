@@ -0,0 +1,172 @@
+# Chaikin3D - Batch module
+from __future__ import annotations
+from types import SimpleNamespace
+from checkpoint import Checkpoint
+from generation_cache import GenerationCache
+import glob
+import mesh_cache
+import multiprocessing
+import os
+import time
+
+
+def find_inputs(pattern: str) -> list[str]:
+    """
+    Returns the OBJ files of a batch, largest first.
+
+    Args:
+        pattern (str): Directory (all its '.obj' files), glob pattern or file.
+
+    Returns:
+        list[str]: Paths of the input files, sorted by decreasing size.
+
+    """
+
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, "*.obj")
+    paths = [path for path in glob.glob(pattern) if os.path.isfile(path)]
+    # largest first: the longest jobs start first, the small ones fill the gaps
+    return sorted(paths, key=lambda path: (-os.path.getsize(path), path))
+
+
+def process_file(path: str, output_path: str, a: SimpleNamespace) -> dict:
+    """
+    Read a mesh, apply the Chaikin generations and write the result.
+
+    Args:
+        path        (str)            : Input file.
+        output_path (str)            : Output file.
+        a           (SimpleNamespace): Arguments passed to the program.
+
+    Returns:
+        dict:
+            "input", "output", "vertices" (input and output), "read",
+            "chaikin" and "write" (seconds), "input size" and "output size"
+            (bytes), and "error" (None if the file was processed).
+
+    """
+
+    stats = {
+        "input": path,
+        "output": output_path,
+        "vertices": (0, 0),
+        "read": 0.0,
+        "chaikin": 0.0,
+        "write": 0.0,
+        "input size": os.path.getsize(path),
+        "output size": 0,
+        "error": None,
+    }
+    try:
+        t1 = time.perf_counter()
+        poly = mesh_cache.load_polyhedron(path, a.rotate_mesh, a.cache_dir)
+        t2 = time.perf_counter()
+        if a.checkpoint_dir is None:
+            cache = GenerationCache(a.generation_cache_size, a.generation_cache_dir)
+            new_poly = cache.chaikin(poly, a.chaikin_generations, a)
+        else:
+            with Checkpoint(a.checkpoint_dir, path, a) as checkpoint:
+                new_poly = poly.chaikin(a.chaikin_generations, a, checkpoint)
+        t3 = time.perf_counter()
+        with open(output_path, "w") as f:
+            new_poly.save(f, a.precision)
+        t4 = time.perf_counter()
+    except Exception as e:
+        stats["error"] = f"{type(e).__name__}: {e}"
+        return stats
+    stats["vertices"] = (len(poly), len(new_poly))
+    stats["read"] = t2 - t1
+    stats["chaikin"] = t3 - t2
+    stats["write"] = t4 - t3
+    stats["output size"] = os.path.getsize(output_path)
+    return stats
+
+
+def _process_file(job: tuple[str, str, SimpleNamespace]) -> dict:
+    return process_file(*job)
+
+
+def run_batch(a: A) -> list[dict]:
+    """
+    Apply the Chaikin generations to a batch of files, in a process pool.
+
+    The input ('a.input') is a directory or a glob pattern, and the results are
+    written to 'a.output_dir', with the same file names. The files are
+    scheduled largest first, on 'a.jobs' processes.
+
+    Args:
+        a (A): Arguments passed to the program (class holder).
+
+    Returns:
+        list[dict]: Statistics of each file (see 'process_file'), largest first.
+
+    """
+
+    paths = find_inputs(a.input)
+    assert paths, f"No input file matches {a.input!r}"
+    os.makedirs(a.output_dir, exist_ok=True)
+    # the class 'A' cannot be sent to the workers
+    settings = SimpleNamespace(
+        **{
+            key: value
+            for key, value in vars(type(a)).items()
+            if not key.startswith("__") and key != "renderer_class"
+        }
+    )
+    jobs = list()
+    for path in paths:
+        output_path = os.path.join(a.output_dir, os.path.basename(path))
+        assert not os.path.exists(output_path) or not os.path.samefile(
+            path, output_path
+        ), f"The output would overwrite the input file {path!r}"
+        jobs.append((path, output_path, settings))
+
+    results = dict()
+    t1 = time.perf_counter()
+    with multiprocessing.Pool(min(a.jobs, len(jobs))) as pool:
+        # chunksize=1: the jobs are handed out in order (largest first)
+        for stats in pool.imap_unordered(_process_file, jobs, chunksize=1):
+            results[stats["input"]] = stats
+            status = "failed" if stats["error"] else "done"
+            print(
+                f"[{len(results)}/{len(jobs)}] {status}: {stats['input']} "
+                f"({stats['read'] + stats['chaikin'] + stats['write']:.3}s)"
+            )
+    wall_time = time.perf_counter() - t1
+    results = [results[path] for path in paths]
+    print_summary(results, wall_time)
+    return results
+
+
+def print_summary(results: list[dict], wall_time: float) -> None:
+    """
+    Print the timing and size of every file of a batch.
+
+    Args:
+        results   (list[dict]): Statistics of each file (see 'process_file').
+        wall_time (float)     : Duration of the whole batch.
+
+    """
+
+    name_width = max(len("file"), *(len(stats["input"]) for stats in results))
+    print(
+        f"{'file':<{name_width}} {'vertices':>21} {'read':>8} {'chaikin':>8} "
+        f"{'write':>8} {'in size':>12} {'out size':>12}"
+    )
+    for stats in results:
+        if stats["error"]:
+            print(f"{stats['input']:<{name_width}} {stats['error']}")
+            continue
+        vertices = "{} -> {}".format(*stats["vertices"])
+        print(
+            f"{stats['input']:<{name_width}} {vertices:>21} "
+            f"{stats['read']:>7.3f}s {stats['chaikin']:>7.3f}s "
+            f"{stats['write']:>7.3f}s {stats['input size']:>12} "
+            f"{stats['output size']:>12}"
+        )
+    busy = sum(stats["read"] + stats["chaikin"] + stats["write"] for stats in results)
+    failed = sum(1 for stats in results if stats["error"])
+    print(
+        f"{len(results)} files ({failed} failed) in {wall_time:.3f}s "
+        f"(sum of the file times: {busy:.3f}s)"
+    )
@@ -30,7 +30,6 @@ class Group:
         self.ogroup = None
         self.ordered = False
         self.size = self.nodes.size
-        self._triangles: list[N.Triangle] = None
         # assert self.size > 2 # >= 3
         if do_order:
             self.order()
@@ -54,19 +53,17 @@ class Group:
             return self.ogroup[index]
         return self.nodes[index]
 
-    @property
-    def triangles(self) -> list[N.Triangle]:
-        assert self._triangles is not None, "Group has not been interconnected"
-        return iter(self._triangles)
-
     def order(self, force: bool = False) -> None:
         """
         Order a Group.
 
         Order a Group based on node inter-connectivity. We start be taking a
-        node (any node), and looking for nodes in this Group in its main edges.
-        Once such a node/edge is found, we can propagate to this node, until
-        we meet the starting node.
+        node (the last one), and looking for nodes in this Group in its main
+        edges. Once such a node/edge is found, we can propagate to this node,
+        until we meet the starting node. When several nodes of the Group are
+        connected to the current node, the first one (in the Group) is chosen.
+        Each step only looks at the main edges of the current node, so that
+        ordering a group of k nodes is O(k).
         Sets the 'ordered' attribute to True.
 
         Args:
@@ -86,19 +83,31 @@ class Group:
             self.ogroup = self.nodes
             self.ordered = True
             return
+        # position of the nodes in the group
+        positions: dict[int, int] = {node.key: i for i, node in enumerate(self.nodes)}
+        visited: list[bool] = [False] * self.size
         # initialize variables
-        group_list: list[N.Node] = list(self.nodes)
-        current_node = group_list.pop()
+        current_node = self.nodes[-1]
+        visited[-1] = True
         self.ogroup = [current_node]
         # connect the next ones (don't care if we go 'left' or 'right')
-        while group_list:
-            for index, remaining_node in enumerate(group_list):
-                if E.Edge.are_connected(current_node, remaining_node, "main"):
-                    self.ogroup.append(remaining_node)
-                    current_node = remaining_node
-                    group_list.pop(index)
-                    break
-            else:
+        while len(self.ogroup) < self.size:
+            next_position = min(
+                (
+                    position
+                    for position in (
+                        positions.get(key)
+                        for key, edge in current_node.neighbors.items()
+                        if edge.type_ == "main"
+                    )
+                    if position is not None and not visited[position]
+                ),
+                default=None,
+            )
+            if next_position is None:
+                group_list = [
+                    node for node, seen in zip(self.nodes, visited) if not seen
+                ]
                 print("current_node")
                 _debug_print_full_node(current_node)
                 print("group_list")
@@ -113,7 +122,27 @@ class Group:
                 )
                 self.ogroup.extend(group_list)
                 raise Exception("Broken group (see stdout for more info)")
+            visited[next_position] = True
+            current_node = self.nodes[next_position]
+            self.ogroup.append(current_node)
+
+        self.ordered = True
+
+    def cycle_order(self) -> None:
+        """
+        Order a Group from its construction, without any search.
+
+        The nodes must have been given in cycle order (like for 'cycle_connect').
+        The 'ogroup' is the one 'order' finds for such a Group: it starts with
+        the last node, followed by the other nodes.
+        Sets the 'ordered' attribute to True.
+
+        """
 
+        if self.size < 3:
+            self.ogroup = self.nodes
+        else:
+            self.ogroup = [self.nodes[-1]] + self.nodes.data[:-1]
         self.ordered = True
 
     def cycle_connect(self, edge_type: str = "main") -> None:
@@ -162,13 +191,3 @@ class Group:
                 prev_node = current_node
             # connect last one to first one
             self.ogroup[0].connect(prev_node, edge_type)
-
-    def calc_triangles(self) -> None:
-        assert self._triangles is None, "Triangles already calculated"
-        self._triangles = VirtualSet()
-        for node1 in self.nodes:
-            for node2 in (n for n in node1.partners if n in self.nodes):
-                for node3 in (
-                    n for n in node2.partners if n in self.nodes and n in node1.partners
-                ):
-                    self._triangles.add(N.Triangle(node1, node2, node3))
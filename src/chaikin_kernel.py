@@ -0,0 +1,554 @@
+# Chaikin3D - Vectorized kernel module
+from __future__ import annotations
+from collections.abc import Callable
+from halfedge import HalfEdgeMesh, index_dtype
+from worker_pool import WorkerPool
+import numpy as np
+
+
+def cut_points(vertices: np.ndarray, edges: np.ndarray, coef: float) -> np.ndarray:
+    """
+    Compute all the cut points of a Chaikin3D generation in one pass.
+
+    Every edge (A, B) is cut twice: once next to A and once next to B. The cut
+    points are computed exactly like 'Polyhedron.Chaikin3D' does: the vertex
+    with the lower index is split first, using the 'base' ratio, and the second
+    cut point is computed from the first one, using the 'special' ratio.
+
+    Args:
+        vertices (np.ndarray): (V, 3) vertex coordinates.
+        edges    (np.ndarray): (E, 2) vertex indices of the edges.
+        coef     (float)     : Chaikin coefficient.
+
+    Returns:
+        np.ndarray:
+            (E, 2, 3) cut points. 'cut[e, i]' is the cut point of the edge 'e'
+            next to the vertex 'edges[e, i]'.
+
+    """
+
+    base_ratio = (coef - 1) / coef
+    special_ratio = (coef - 2) / (coef - 1)
+    low = edges.min(axis=1)
+    high = edges.max(axis=1)
+    low_points = vertices[low]
+    high_points = vertices[high]
+    # split of the low vertex (its partner has not been truncated yet)
+    near_low = high_points + (low_points - high_points) * base_ratio
+    # split of the high vertex (its partner is the cut point next to low)
+    near_high = near_low + (high_points - near_low) * special_ratio
+
+    cut = np.empty((len(edges), 2, 3), dtype=np.float64)
+    swapped = (edges[:, 0] != low)[:, None]
+    cut[:, 0] = np.where(swapped, near_high, near_low)
+    cut[:, 1] = np.where(swapped, near_low, near_high)
+    return cut
+
+
+def face_cut_vertices(
+    he_vertex: np.ndarray,
+    he_edge: np.ndarray,
+    edges: np.ndarray,
+    face_offsets: np.ndarray,
+    incidence_to_vertex: np.ndarray,
+    out: np.ndarray,
+) -> None:
+    """
+    Compute the new vertices of some old faces (see 'chaikin_step').
+
+    Every half-edge gives two vertices: the cut points of its previous
+    half-edge, starting with the one next to the origin of the previous
+    half-edge.
+
+    Args:
+        he_vertex           (np.ndarray): (H,) origin vertex of each half-edge.
+        he_edge             (np.ndarray): (H,) undirected edge of each half-edge.
+        edges               (np.ndarray): (E, 2) vertex indices of the edges.
+        face_offsets        (np.ndarray):
+            Offsets of consecutive faces (a slice of the 'face_offsets' array).
+        incidence_to_vertex (np.ndarray): New vertex of every incidence.
+        out                 (np.ndarray):
+            Output: two new vertices for each half-edge of the faces.
+
+    """
+
+    start, stop = int(face_offsets[0]), int(face_offsets[-1])
+    he_prev = np.arange(start - 1, stop - 1, dtype=np.int64)
+    he_prev[face_offsets[:-1] - start] = face_offsets[1:] - 1
+    prev_edge = he_edge[he_prev]
+    side = (edges[prev_edge, 0] != he_vertex[he_prev]).astype(np.int64)
+    incidences = 2 * prev_edge.astype(np.int64)
+    out = out.reshape(-1, 2)
+    out[:, 0] = incidence_to_vertex[incidences + side]
+    out[:, 1] = incidence_to_vertex[incidences + 1 - side]
+
+
+def mesh_counts(mesh: HalfEdgeMesh) -> tuple[int, int, int, int, int]:
+    """
+    Returns the counts of a mesh that the size of its next generations depend on
+    (see 'predict_counts').
+
+    Args:
+        mesh (HalfEdgeMesh): Mesh.
+
+    Returns:
+        tuple[int, int, int, int, int]:
+            (vertices, main edges, faces, half-edges, open vertices), the open
+            vertices being the vertices with two main edges.
+
+    """
+
+    valences = np.bincount(
+        mesh.edges[mesh.edge_main].ravel(), minlength=mesh.num_vertices
+    )
+    return (
+        mesh.num_vertices,
+        int(np.count_nonzero(mesh.edge_main)),
+        mesh.num_faces,
+        mesh.num_half_edges,
+        int(np.count_nonzero(valences == 2)),
+    )
+
+
+def predict_counts(
+    num_vertices: int,
+    num_main_edges: int,
+    num_faces: int,
+    num_half_edges: int,
+    num_open_vertices: int,
+) -> tuple[int, int, int, int, int]:
+    """
+    Predict the size of the next Chaikin3D generation of a mesh.
+
+    Every main edge gives two new vertices (one per end) and a new main edge
+    (the cut edge). Every vertex with k > 2 main edges gives a new k-gon, whose
+    edges are main edges, and every face keeps its place with twice as many
+    vertices. The open vertices (two main edges, on the boundary of open
+    meshes) do not give a face, only a main edge between their two new
+    vertices. So the new vertices have three main edges, except the ones of
+    the open vertices, which have two.
+    The counts are exact when every vertex has two main edges or more (always,
+    except on input meshes with degenerate faces, where they are upper bounds).
+    The total number of edges is not predicted: the graphical edges of the new
+    faces depend on the geometry (see 'chaikin_step'). It is between the
+    number of main edges and the number of half-edges (every edge is on a
+    face).
+
+    Args:
+        num_vertices      (int): Number of vertices.
+        num_main_edges    (int): Number of main edges.
+        num_faces         (int): Number of faces.
+        num_half_edges    (int): Number of half-edges.
+        num_open_vertices (int): Number of vertices with two main edges.
+
+    Returns:
+        tuple[int, int, int, int, int]:
+            (vertices, main edges, faces, half-edges, open vertices) of the
+            next generation.
+
+    """
+
+    return (
+        2 * num_main_edges,
+        3 * num_main_edges - num_open_vertices,
+        num_faces + num_vertices - num_open_vertices,
+        2 * num_half_edges + 2 * num_main_edges - 2 * num_open_vertices,
+        2 * num_open_vertices,
+    )
+
+
+def chaikin_step(
+    mesh: HalfEdgeMesh,
+    coef: float,
+    rotation: bool = False,
+    out: tuple[np.ndarray, np.ndarray, np.ndarray] = None,
+    pool: WorkerPool = None,
+) -> tuple[HalfEdgeMesh, np.ndarray, np.ndarray]:
+    """
+    Apply one generation of the Chaikin3D algorithm to a mesh.
+
+    This is the vertex split of 'Polyhedron.Chaikin3D', on arrays. The main
+    edges are cut, the graphical ones are not (see 'HalfEdgeMesh.edge_main').
+    The new vertices are the cut points, grouped by the vertex they come from
+    (in ring order, see 'HalfEdgeMesh.vertex_rings'). Every vertex with k main
+    edges gives a new k-gon, and every face of size n gives a new 2n-gon, made
+    of the cut points of its edges. On a graphical edge of a face, which has
+    no cut points, the sub-vertex of each end that is the closest to the other
+    end is taken instead.
+    The vertex-faces come first, followed by the old faces (same order as
+    'Polyhedron.Chaikin3D'). The main edges of the new mesh are the cut edges
+    and the edges of the vertex rings: the other edges of the faces (between
+    two sub-vertices that are not next to each other in their ring, or taken
+    on a graphical edge) are graphical edges.
+
+    Args:
+        mesh     (HalfEdgeMesh): Mesh.
+        coef     (float)       : Chaikin coefficient.
+        rotation (bool)        :
+            Order the vertex-faces with the rotation system of the mesh (edge
+            ordering), instead of the edge numbering.
+        out      (tuple[np.ndarray, np.ndarray, np.ndarray]):
+            Raw (uint8) buffers for the vertices, half-edge vertices and face
+            offsets of the new mesh, big enough for the counts given by
+            'predict_counts'. The new mesh is a view on them (see 'chaikin').
+        pool     (WorkerPool)  :
+            Compute the cut points and the old faces in these worker processes
+            (the result is the same as without workers).
+
+    Returns:
+        tuple[HalfEdgeMesh, np.ndarray, np.ndarray]:
+            (mesh, parent_vertex, parent_edge): the next generation, and the
+            split vertex & cut edge of each new vertex (see 'Provenance').
+
+    """
+
+    edges = mesh.edges
+    # vertex table
+    ring, ring_offsets = mesh.vertex_rings(rotation)
+    ring_sizes = np.diff(ring_offsets)
+    valid_rings = ring_sizes > 2
+    num_vertices = len(ring)
+    num_ring_half_edges = int(ring_sizes[valid_rings].sum())
+    num_half_edges = num_ring_half_edges + 2 * mesh.num_half_edges
+    num_faces = int(np.count_nonzero(valid_rings)) + mesh.num_faces
+    new_dtype = index_dtype(max(num_vertices, num_half_edges))
+    if out is None:
+        vertices = np.empty((num_vertices, 3), dtype=np.float64)
+        he_vertex = np.empty(num_half_edges, dtype=new_dtype)
+        face_offsets = np.empty(num_faces + 1, dtype=np.int64)
+    else:
+        vertices = _view(out[0], np.float64, num_vertices * 3).reshape(-1, 3)
+        he_vertex = _view(out[1], new_dtype, num_half_edges)
+        face_offsets = _view(out[2], np.int64, num_faces + 1)
+    # (-1: incidence of a graphical edge)
+    incidence_to_vertex = np.full(2 * mesh.num_edges, -1, dtype=new_dtype)
+    incidence_to_vertex[ring] = np.arange(num_vertices, dtype=new_dtype)
+
+    # vertex-faces: the rings themselves (boundary vertices of valence 2
+    # cannot form a face)
+    he_vertex[:num_ring_half_edges] = np.flatnonzero(np.repeat(valid_rings, ring_sizes))
+    ring_face_sizes = ring_sizes[valid_rings]
+
+    # cut points (vertex table), and old faces: every half-edge gives two
+    # vertices, starting with the last half-edge of the face
+    face_vertices = he_vertex[num_ring_half_edges:]
+    if pool is None:
+        cut = cut_points(mesh.vertices, edges, coef).reshape(-1, 3)
+        np.take(cut, ring, axis=0, out=vertices)
+        del cut
+        face_cut_vertices(
+            mesh.he_vertex,
+            mesh.he_edge,
+            edges,
+            mesh.face_offsets,
+            incidence_to_vertex,
+            face_vertices,
+        )
+    else:
+        _parallel_step(
+            pool,
+            mesh,
+            coef,
+            ring,
+            incidence_to_vertex,
+            vertices,
+            face_vertices,
+        )
+    if not mesh.edge_main.all():
+        # graphical edges of the old faces: closest sub-vertices
+        he_prev = mesh.he_prev
+        corners = np.flatnonzero(~mesh.edge_main[mesh.he_edge[he_prev]])
+        origins = mesh.he_vertex[he_prev[corners]]
+        targets = mesh.he_vertex[corners]
+        face_vertices[2 * corners] = closest_sub_vertices(
+            vertices, ring_offsets, origins, mesh.vertices[targets]
+        )
+        face_vertices[2 * corners + 1] = closest_sub_vertices(
+            vertices, ring_offsets, targets, mesh.vertices[origins]
+        )
+
+    face_offsets[0] = 0
+    np.cumsum(
+        np.concatenate((ring_face_sizes, 2 * mesh.face_sizes)), out=face_offsets[1:]
+    )
+    new_mesh = HalfEdgeMesh(vertices, he_vertex, face_offsets)
+    parent_vertex = edges.ravel()[ring]
+    parent_edge = ring // 2
+    new_mesh.edge_main = _main_edges(
+        new_mesh.edges, parent_vertex, parent_edge, ring_sizes
+    )
+    return new_mesh, parent_vertex, parent_edge
+
+
+def closest_sub_vertices(
+    vertices: np.ndarray,
+    ring_offsets: np.ndarray,
+    parents: np.ndarray,
+    points: np.ndarray,
+) -> np.ndarray:
+    """
+    Returns the sub-vertices of some split vertices that are the closest to
+    some points (like 'Polyhedron.Chaikin3D' does for twisted groups).
+
+    The sub-vertices of the vertex 'v' are the new vertices
+    'ring_offsets[v]' to 'ring_offsets[v + 1]' (see 'chaikin_step'). On a tie,
+    the first one is taken.
+
+    Args:
+        vertices     (np.ndarray): (V', 3) new vertex coordinates.
+        ring_offsets (np.ndarray): (V + 1,) offsets of the vertex rings.
+        parents      (np.ndarray): (N,) split vertices.
+        points       (np.ndarray): (N, 3) points.
+
+    Returns:
+        np.ndarray: (N,) closest new vertex to each point.
+
+    """
+
+    starts = ring_offsets[parents]
+    sizes = ring_offsets[parents + 1] - starts
+    assert np.all(sizes > 0), "No sub-vertex found (empty group)"
+    segment_starts = np.cumsum(sizes) - sizes
+    segments = np.repeat(np.arange(len(parents)), sizes)
+    candidates = np.arange(int(sizes.sum())) + np.repeat(starts - segment_starts, sizes)
+    distances = np.linalg.norm(
+        vertices[candidates] - np.repeat(points, sizes, axis=0), axis=1
+    )
+    # stable sort: the first of equal distances comes first
+    order = np.lexsort((distances, segments))
+    return candidates[order[segment_starts]]
+
+
+def _main_edges(
+    edges: np.ndarray,
+    parent_vertex: np.ndarray,
+    parent_edge: np.ndarray,
+    ring_sizes: np.ndarray,
+) -> np.ndarray:
+    """
+    Returns the main edges of a new generation (see 'chaikin_step').
+
+    A new edge is a main edge if its vertices are the two cut points of an old
+    edge, or two consecutive sub-vertices of an old vertex (in ring order, the
+    first and the last ones being consecutive too). The edges from a vertex to
+    itself (faces going through a closest sub-vertex twice) are not main edges.
+
+    Args:
+        edges         (np.ndarray): (E', 2) edges of the new mesh.
+        parent_vertex (np.ndarray): (V',) split vertex of each new vertex.
+        parent_edge   (np.ndarray): (V',) cut edge of each new vertex.
+        ring_sizes    (np.ndarray): (V,) size of the ring of each old vertex.
+
+    Returns:
+        np.ndarray: (E',) whether each new edge is a main edge.
+
+    """
+
+    a = edges[:, 0].astype(np.int64)
+    b = edges[:, 1].astype(np.int64)
+    cut = (parent_edge[a] == parent_edge[b]) & (a != b)
+    distance = np.abs(a - b)
+    ring = (parent_vertex[a] == parent_vertex[b]) & (
+        (distance == 1) | (distance == ring_sizes[parent_vertex[a]] - 1)
+    )
+    return cut | ring
+
+
+def chaikin(
+    mesh: HalfEdgeMesh,
+    coef: float,
+    rotations: list[bool],
+    workers: int = 1,
+    on_generation: Callable[[HalfEdgeMesh, np.ndarray, np.ndarray], None] = None,
+) -> tuple[HalfEdgeMesh, list[np.ndarray], list[np.ndarray]]:
+    """
+    Apply several generations of the Chaikin3D algorithm to a mesh.
+
+    The sizes of all the generations are predicted up-front (see
+    'predict_counts'), and the generations are written alternately into two
+    preallocated (ping-pong) buffers: the buffer of the last generation and the
+    buffer of the one before it. Only the mesh being read and the mesh being
+    written are alive at any time, so the peak memory is about twice the size of
+    the last generation. With workers, the buffers are allocated in shared
+    memory, once per run (see '_parallel_step'), and the last generation is
+    copied out of them at the end.
+
+    Args:
+        mesh      (HalfEdgeMesh): Mesh.
+        coef      (float)       : Chaikin coefficient.
+        rotations (list[bool])  :
+            Use the rotation system in each generation (see 'chaikin_step').
+            There is one generation per element.
+        workers   (int)         : Number of worker processes (see 'WorkerPool').
+        on_generation (Callable[[HalfEdgeMesh, np.ndarray, np.ndarray], None]):
+            Called with (mesh, parent_vertex, parent_edge) after every
+            generation. The mesh lives in a buffer that is reused two
+            generations later: it must be copied to be kept.
+
+    Returns:
+        tuple[HalfEdgeMesh, list[np.ndarray], list[np.ndarray]]:
+            (mesh, parent_vertices, parent_edges): the last generation, and the
+            split vertices & cut edges of every generation (see 'Provenance').
+
+    """
+
+    num_generations = len(rotations)
+    # the last generation goes into the first buffer, the one before it into
+    # the second buffer, etc. (the sizes are exact, see 'predict_counts')
+    sizes = _buffer_sizes(mesh, num_generations)[::-1]
+    parent_vertices = list()
+    parent_edges = list()
+    pool = WorkerPool(workers) if workers > 1 and num_generations else None
+    try:
+        # with workers, the buffers are in shared memory: the workers read the
+        # previous generation and write the new one in place
+        allocate = pool.buffer if pool is not None else lambda n: np.empty(n, np.uint8)
+        buffers = [
+            tuple(allocate(size) for size in np.max(sizes[index::2], axis=0))
+            for index in range(min(num_generations, 2))
+        ]
+        for generation, rotation in enumerate(rotations):
+            index = (num_generations - 1 - generation) % 2
+            mesh, parent_vertex, parent_edge = chaikin_step(
+                mesh, coef, rotation, buffers[index], pool
+            )
+            parent_vertices.append(parent_vertex)
+            parent_edges.append(parent_edge)
+            if on_generation is not None:
+                on_generation(mesh, parent_vertex, parent_edge)
+        if pool is not None:
+            # the shared buffers are unmapped with the pool
+            for name in ("vertices", "he_vertex", "face_offsets"):
+                setattr(mesh, name, getattr(mesh, name).copy())
+    finally:
+        if pool is not None:
+            pool.close()
+    return mesh, parent_vertices, parent_edges
+
+
+def _parallel_step(
+    pool: WorkerPool,
+    mesh: HalfEdgeMesh,
+    coef: float,
+    ring: np.ndarray,
+    incidence_to_vertex: np.ndarray,
+    vertices: np.ndarray,
+    face_vertices: np.ndarray,
+) -> None:
+    """
+    Compute the cut points and the old faces of a generation in the workers.
+
+    The edges are split between the workers to compute the cut points, then
+    the vertices (ring) and the old faces are split to build the new vertex
+    table and the new faces. The arrays that are in the shared buffers of the
+    run (the vertices and faces of the mesh, and the outputs) are not copied:
+    only the arrays computed in this process (edges, rings) are. The vertex
+    rings and the connectivity of the new mesh (see
+    'HalfEdgeMesh._build_connectivity') are computed in this process.
+
+    Args:
+        pool                (WorkerPool): Workers.
+        mesh                (HalfEdgeMesh): Mesh.
+        coef                (float)     : Chaikin coefficient.
+        ring                (np.ndarray): Incidences, in vertex ring order.
+        incidence_to_vertex (np.ndarray): New vertex of every incidence.
+        vertices            (np.ndarray): Output: new vertex coordinates.
+        face_vertices       (np.ndarray): Output: new vertices of the old faces.
+
+    """
+
+    try:
+        pool.share("vertices", mesh.vertices)
+        pool.share("edges", mesh.edges)
+        pool.empty("cut", (mesh.num_edges, 2, 3), np.float64)
+        pool.map(_cut_task, mesh.num_edges, coef)
+        pool.share("ring", ring)
+        pool.share("he_vertex", mesh.he_vertex)
+        pool.share("he_edge", mesh.he_edge)
+        pool.share("face_offsets", mesh.face_offsets)
+        pool.share("incidence_to_vertex", incidence_to_vertex)
+        new_vertices = pool.share("new_vertices", vertices)
+        new_face_vertices = pool.share("new_face_vertices", face_vertices)
+        pool.map(_ring_task, len(ring))
+        pool.map(_face_task, mesh.num_faces)
+        # (outputs that are not in shared memory)
+        if new_vertices is not vertices:
+            vertices[...] = new_vertices
+        if new_face_vertices is not face_vertices:
+            face_vertices[...] = new_face_vertices
+        del new_vertices, new_face_vertices
+    finally:
+        pool.release()
+
+
+def _cut_task(arrays: dict[str, np.ndarray], start: int, stop: int, coef: float):
+    arrays["cut"][start:stop] = cut_points(
+        arrays["vertices"], arrays["edges"][start:stop], coef
+    )
+
+
+def _ring_task(arrays: dict[str, np.ndarray], start: int, stop: int):
+    np.take(
+        arrays["cut"].reshape(-1, 3),
+        arrays["ring"][start:stop],
+        axis=0,
+        out=arrays["new_vertices"][start:stop],
+    )
+
+
+def _face_task(arrays: dict[str, np.ndarray], start: int, stop: int):
+    face_offsets = arrays["face_offsets"][start : stop + 1]
+    face_cut_vertices(
+        arrays["he_vertex"],
+        arrays["he_edge"],
+        arrays["edges"],
+        face_offsets,
+        arrays["incidence_to_vertex"],
+        arrays["new_face_vertices"][2 * face_offsets[0] : 2 * face_offsets[-1]],
+    )
+
+
+def _buffer_sizes(mesh: HalfEdgeMesh, generations: int) -> np.ndarray:
+    """
+    Returns the predicted sizes of the buffers of the next generations.
+
+    Args:
+        mesh        (HalfEdgeMesh): Mesh.
+        generations (int)         : Number of generations.
+
+    Returns:
+        np.ndarray:
+            (generations, 3) bytes needed for the vertices, half-edge vertices
+            and face offsets of each generation (see 'chaikin_step').
+
+    """
+
+    counts = mesh_counts(mesh)
+    sizes = list()
+    for _ in range(generations):
+        counts = predict_counts(*counts)
+        num_vertices, _, num_faces, num_half_edges, _ = counts
+        itemsize = index_dtype(max(num_vertices, num_half_edges)).itemsize
+        sizes.append(
+            (num_vertices * 3 * 8, num_half_edges * itemsize, (num_faces + 1) * 8)
+        )
+    return np.array(sizes, dtype=np.int64).reshape(-1, 3)
+
+
+def _view(buffer: np.ndarray, dtype: np.dtype, count: int) -> np.ndarray:
+    """
+    Returns the first 'count' elements of a raw (uint8) buffer, as 'dtype'.
+
+    Args:
+        buffer (np.ndarray): Raw buffer.
+        dtype  (np.dtype)  : Type of the elements.
+        count  (int)       : Number of elements.
+
+    Returns:
+        np.ndarray: View on the buffer.
+
+    """
+
+    nbytes = count * np.dtype(dtype).itemsize
+    assert nbytes <= len(buffer), "Buffer too small for the next generation"
+    return buffer[:nbytes].view(dtype)
@@ -0,0 +1,177 @@
+# Chaikin3D - Checkpoint module
+from __future__ import annotations
+from contextlib import contextmanager
+from halfedge import HalfEdgeMesh
+from polyhedron import Polyhedron
+from provenance import Provenance
+import glob
+import hashlib
+import mesh_cache
+import os
+import signal
+import threading
+
+# signals that interrupt a run (the checkpoint being written is completed first)
+SIGNALS = (signal.SIGINT, signal.SIGTERM)
+
+
+class Checkpoint:
+    """
+    Per-generation checkpoints of a Chaikin3D run.
+
+    After every generation, the mesh and the provenance of the generation are
+    written to '<key>-<generation>.ckpt' in the checkpoint directory (see
+    'mesh_cache.write_arrays'), with the arguments that produced them. The key
+    is the hash of the input file and of the arguments that change the result
+    (rotate-mesh, chaikin-coef, chaikin-kernel and order-edges). The number of
+    generations and of workers are not part of it: a longer run resumes from
+    the checkpoints of a shorter one.
+
+    Only the runs of the "numpy" kernel can be checkpointed. The "python"
+    kernel continues from the object graph of the previous generation, which
+    cannot be rebuilt the same from a saved mesh (the order of the edges of
+    the nodes and the graphical edges are not the same).
+
+    A checkpoint is never left half-written: while it is written, SIGINT and
+    SIGTERM are deferred until it is complete, then handled as usual. Used as
+    a context manager, a Checkpoint also turns SIGTERM into a SystemExit, so
+    that the run is cleaned up (worker processes, shared memory) like on a
+    KeyboardInterrupt.
+
+    """
+
+    def __init__(self, directory: str, input_path: str, a: A, verbose: bool = False):
+        assert (
+            a.chaikin_kernel == "numpy"
+        ), 'Only the runs of the "numpy" kernel can be checkpointed'
+        self.directory = directory
+        self.verbose = verbose
+        self.vprint = print if verbose else lambda *args, **kwargs: None
+        self.arguments = {
+            "rotate mesh": a.rotate_mesh,
+            "chaikin coef": a.chaikin_coef,
+            "chaikin kernel": a.chaikin_kernel,
+            "order edges": a.order_edges,
+        }
+        digest = hashlib.sha256(mesh_cache.cache_key(input_path, False).encode())
+        digest.update(repr(sorted(self.arguments.items())).encode())
+        self.key = digest.hexdigest()
+        self.input_path = os.path.abspath(input_path)
+        self._previous_handler = None
+
+    def __enter__(self) -> Checkpoint:
+        if threading.current_thread() is threading.main_thread():
+            self._previous_handler = signal.signal(signal.SIGTERM, _exit_on_signal)
+        return self
+
+    def __exit__(self, *args) -> None:
+        if self._previous_handler is not None:
+            signal.signal(signal.SIGTERM, self._previous_handler)
+            self._previous_handler = None
+
+    def path(self, generation: int) -> str:
+        """
+        Returns the path of the checkpoint of a generation.
+
+        Args:
+            generation (int): Generation.
+
+        Returns:
+            str: Checkpoint file.
+
+        """
+
+        return os.path.join(self.directory, f"{self.key}-{generation}.ckpt")
+
+    def resume(self, poly: Polyhedron, generations: int) -> Polyhedron:
+        """
+        Returns the latest checkpointed generation of a run.
+
+        The checkpoints are tried from the latest one (but not after
+        'generations'), and the stale or corrupt ones are skipped.
+
+        Args:
+            poly        (Polyhedron): Input polyhedron (generation 0 of the run).
+            generations (int)       : Number of generations of the run.
+
+        Returns:
+            Polyhedron: Latest checkpointed generation ('poly' if there is none).
+
+        """
+
+        checkpoints = list()
+        for path in glob.glob(os.path.join(self.directory, f"{self.key}-*.ckpt")):
+            generation = os.path.basename(path)[len(self.key) + 1 : -len(".ckpt")]
+            if generation.isdigit() and 0 < int(generation) <= generations:
+                checkpoints.append((int(generation), path))
+        for generation, path in sorted(checkpoints, reverse=True):
+            try:
+                arrays, metadata = mesh_cache.read_arrays(path, self.key)
+                assert metadata["generation"] == generation, "Wrong generation"
+                mesh, provenance = mesh_cache.read_generation(
+                    arrays, poly.provenance, generation
+                )
+            except (AssertionError, KeyError, ValueError, OSError) as e:
+                self.vprint(f"Skipping the checkpoint {path!r} ({e})")
+                continue
+            self.vprint(f"Resuming from the checkpoint of generation {generation}")
+            return Polyhedron(
+                initial_mesh=False,
+                verbose=poly.verbose,
+                mesh=mesh,
+                provenance=provenance,
+            )
+        return poly
+
+    def save(self, generation: int, mesh: HalfEdgeMesh, provenance: Provenance) -> None:
+        """
+        Write the checkpoint of a generation.
+
+        Args:
+            generation (int)         : Generation (number of generations of the run).
+            mesh       (HalfEdgeMesh): Mesh of the generation.
+            provenance (Provenance)  : Provenance of the generation.
+
+        """
+
+        # the generations of the run are the last ones of the provenance
+        arrays = mesh_cache.generation_arrays(mesh, provenance, generation)
+        metadata = {
+            "input": self.input_path,
+            "arguments": self.arguments,
+            "generation": generation,
+        }
+        with _deferred_signals():
+            mesh_cache.write_arrays(self.path(generation), self.key, arrays, metadata)
+        self.vprint(f"Checkpoint of generation {generation} saved")
+
+
+@contextmanager
+def _deferred_signals():
+    """
+    Defer SIGINT and SIGTERM until the end of the block.
+
+    The signals received in the block are raised again (once each) when it is
+    over, with the handlers of before the block.
+
+    """
+
+    if threading.current_thread() is not threading.main_thread():
+        yield
+        return
+    received = list()
+    handlers = {
+        signum: signal.signal(signum, lambda signum, frame: received.append(signum))
+        for signum in SIGNALS
+    }
+    try:
+        yield
+    finally:
+        for signum, handler in handlers.items():
+            signal.signal(signum, handler)
+        for signum in dict.fromkeys(received):
+            signal.raise_signal(signum)
+
+
+def _exit_on_signal(signum: int, frame) -> None:
+    raise SystemExit(128 + signum)
@@ -1,17 +1,45 @@
 #
 from __future__ import annotations
+from collections.abc import Hashable
+
+
+def hash_key(value) -> Hashable:
+    """
+    Returns the key under which 'value' is stored in a VirtualSet/VirtualDict.
+
+    Values can provide their own stable identity with a 'key' attribute (like
+    Node and Triangle). Hashable values are their own key and the other values
+    are identified by their id.
+
+    Args:
+        value (_): Value to store.
+
+    Returns:
+        Hashable: Key of the value.
+
+    """
+
+    key = getattr(value, "key", None)
+    if key is not None:
+        return key
+    try:
+        hash(value)
+    except TypeError:
+        return id(value)
+    return value
 
 
 class VirtualDict:
     """
     VirtualDict is like the dict class, but can store non-hashable types as keys.
-    Because of this, it is much slower.
+    The keys are indexed by their 'hash_key', so lookups are O(1).
 
     """
 
     def __init__(self, iterable=[]):
         self.key_list = []
         self.value_list = []
+        self.index = dict()
         self.size = 0
         for key, value in iterable:
             self[key] = value
@@ -20,21 +48,24 @@ class VirtualDict:
         return self.size
 
     def __iter__(self):
-        return iter(
-            map(lambda i: (self.key_list[i], self.value_list[i]), range(self.size))
-        )
+        return zip(self.key_list, self.value_list)
 
     def __setitem__(self, key, value):
-        if key in self.key_list:
-            self.value_list[self.key_list.index(key)] = value
+        h = hash_key(key)
+        index = self.index.get(h)
+        if index is not None:
+            self.value_list[index] = value
         else:
+            self.index[h] = self.size
             self.key_list.append(key)
             self.value_list.append(value)
             self.size += 1
 
     def __getitem__(self, key):
-        index = self.key_list.index(key)
-        return self.value_list[index]
+        return self.value_list[self.index[hash_key(key)]]
+
+    def __contains__(self, key) -> bool:
+        return hash_key(key) in self.index
 
     def keys(self):
         """
@@ -70,7 +101,7 @@ class VirtualDict:
 
         """
 
-        return key in self.key_list
+        return hash_key(key) in self.index
 
     def contains_value(self, value) -> bool:
         """
@@ -90,23 +121,23 @@ class VirtualDict:
 class VirtualSet:
     """
     VirtualSet is like the set class, but can store non-hashable types.
-    Because of this, it is much slower.
+    The values are indexed by their 'hash_key', so membership tests are O(1),
+    while the insertion order is kept (like a list).
 
     """
 
     def __init__(self, iterable=None):
         self.data = []
+        self.key_set = set()
+        self.size = 0
         if iterable:
-            if type(iterable) == VirtualSet or type(iterable) == set:
-                self.data = list(iterable)
+            if type(iterable) == VirtualSet:
+                self.data = list(iterable.data)
+                self.key_set = set(iterable.key_set)
+                self.size = iterable.size
             else:
                 for value in iterable:
-                    if value not in self.data:
-                        self.data.append(value)
-                    else:
-                        # print("Warning: doublon in VirtualSet initial-data iterable")
-                        pass
-        self.size = len(self.data)
+                    self.add(value)
 
     def __str__(self):
         return "v{" + ", ".join(map(str, self.data)) + "}v"
@@ -123,11 +154,11 @@ class VirtualSet:
     def __getitem__(self, index: int):
         return self.data[index]
 
+    def __contains__(self, value) -> bool:
+        return hash_key(value) in self.key_set
+
     def __eq__(self, other: VirtualSet) -> bool:
-        for element in self.data:
-            if element not in other.data:
-                return False
-        return True
+        return self.key_set <= other.key_set
 
     def __and__(self, other_set: VirtualSet) -> VirtualSet:
         """
@@ -149,7 +180,10 @@ class VirtualSet:
 
         """
 
-        return VirtualSet(self.data + other_set.data)
+        union = self.copy()
+        for element in other_set:
+            union.add(element)
+        return union
 
     def __sub__(self, other_set: VirtualSet) -> VirtualSet:
         """
@@ -170,14 +204,14 @@ class VirtualSet:
             value  (_)   : Value to add to the VirtualSet.
             verify (bool):
                 Verify that the value is not inside the Set before adding it ?
-                Because of non-hashable nature of the values stored in this Set,
-                we must manually verify an item's unicity. You can disable this
-                if you are sure that the item is not inside the VirtualSet by
-                setting the 'verify' argument to False.
+                You can disable this if you are sure that the item is not inside
+                the VirtualSet by setting the 'verify' argument to False.
 
         """
 
-        if not verify or value not in self.data:
+        key = hash_key(value)
+        if not verify or key not in self.key_set:
+            self.key_set.add(key)
             self.data.append(value)
             self.size += 1
             return True
@@ -192,7 +226,10 @@ class VirtualSet:
 
         """
 
-        return self.data.pop()
+        value = self.data.pop()
+        self.key_set.discard(hash_key(value))
+        self.size -= 1
+        return value
 
     def copy(self):
         """
@@ -206,6 +243,7 @@ class VirtualSet:
 
         virtual_set_copy = VirtualSet()
         virtual_set_copy.data = self.data.copy()
+        virtual_set_copy.key_set = self.key_set.copy()
         virtual_set_copy.size = self.size
         return virtual_set_copy
 
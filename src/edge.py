@@ -15,10 +15,10 @@ class Edge:
         self.type_: str = type_  # 'main', 'graphical'
 
     def __eq__(self, other: Edge) -> bool:
-        return self.type_ == other.type_ and (self.A, self.B) in [
-            (other.A, other.B),
-            (other.B, other.A),
-        ]
+        return self.type_ == other.type_ and (
+            (self.A == other.A and self.B == other.B)
+            or (self.A == other.B and self.B == other.A)
+        )
 
     def __iter__(self):
         return iter((self.A, self.B))
@@ -41,7 +41,7 @@ class Edge:
 
         """
 
-        return self.A == node or self.B == node
+        return self.A is node or self.B is node or self.A == node or self.B == node
 
     def get_partner_node(self, node: N.Node) -> N.Node:
         """
@@ -60,6 +60,11 @@ class Edge:
 
         """
 
+        # same instance (no coordinate comparison needed)
+        if self.A is node and self.B is not node:
+            return self.B
+        if self.B is node and self.A is not node:
+            return self.A
         # partner is B
         if self.A == node:
             assert self.B != node
@@ -83,11 +88,20 @@ class Edge:
 
         """
 
-        if self.A == old_partner:
+        if self.A is old_partner or (
+            self.B is not old_partner and self.A == old_partner
+        ):
             self.A = new_partner
+            partner = self.B
         else:
             assert self.B == old_partner
             self.B = new_partner
+            partner = self.A
+        # update the adjacency index
+        old_partner.neighbors.pop(partner.key, None)
+        partner.neighbors.pop(old_partner.key, None)
+        partner.neighbors[new_partner.key] = self
+        new_partner.neighbors[partner.key] = self
 
     @staticmethod
     def edge_list_contains_node(
@@ -145,6 +159,8 @@ class Edge:
         """
         Is 'node1' connected to 'node2' with a edge of type 'tpye_' ?
 
+        This is a lookup in the adjacency index of 'node1' ('Node.neighbors').
+
         Args:
             node1 (Node): First Node.
             node2 (Node): Second Node.
@@ -155,7 +171,8 @@ class Edge:
 
         """
 
-        return Edge.edge_list_contains_node(node1.edge_list, node2, type_)
+        edge = node1.neighbors.get(node2.key)
+        return edge is not None and (type_ == "any" or edge.type_ == type_)
 
     @staticmethod
     def get_edge_with_node(edge_list: list[Edge], node: N.Node) -> Edge:
@@ -0,0 +1,440 @@
+# Chaikin3D - Generation cache module
+from __future__ import annotations
+from collections import OrderedDict
+from polyhedron import Polyhedron
+from provenance import Provenance
+from types import SimpleNamespace
+from typing import Iterator
+import hashlib
+import mesh_cache
+import multiprocessing
+import numpy as np
+import os
+import queue
+import shutil
+import signal
+import sys
+import tempfile
+import weakref
+
+# default size of the in-memory tier (bytes)
+DEFAULT_MAX_BYTES = 1 << 30
+# how often a consumer waiting for a prefetched generation checks that the
+# worker is still running (seconds)
+PREFETCH_POLL_INTERVAL = 1.0
+# key of the files of the prefetched generations
+PREFETCH_KEY = "prefetch"
+
+
+class GenerationCache:
+    """
+    Memoized Chaikin3D generations.
+
+    The generations are keyed by a fingerprint of the polyhedron they were
+    computed from (the hash of its mesh arrays), the arguments that change the
+    result (chaikin-coef, order-edges and chaikin-kernel) and the number of
+    generations. Asking for a generation starts from the highest cached one
+    below it: generation 5 costs a single generation if generation 4 is cached.
+    The "python" kernel depends on the object graph built by the previous
+    generations, which cannot always be rebuilt from the mesh: with this
+    kernel, new generations are only computed from the cached polyhedrons
+    that still have their object graph (or from generation 0).
+
+    The cached polyhedrons are kept in memory, in least-recently-used order,
+    up to 'max_bytes' (see 'Polyhedron.nbytes'). With a directory, they are
+    also written to '<key>-<generation>.gen' files (see
+    'mesh_cache.write_arrays'), which outlive the in-memory tier and the
+    process: a generation found on disk is memory-mapped, then kept in memory.
+
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        directory: str | None = None,
+        verbose: bool = False,
+    ):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.verbose = verbose
+        self.vprint = print if verbose else lambda *args, **kwargs: None
+        self._entries: OrderedDict[tuple[str, int], Polyhedron] = OrderedDict()
+        self._fingerprints: weakref.WeakKeyDictionary[
+            Polyhedron, str
+        ] = weakref.WeakKeyDictionary()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(poly.nbytes for poly in self._entries.values())
+
+    def key(self, poly: Polyhedron, a: A) -> str:
+        """
+        Returns the key of the generations of a polyhedron.
+
+        Args:
+            poly (Polyhedron): Polyhedron (generation 0).
+            a    (A)         : Arguments passed to the program (class holder).
+
+        Returns:
+            str: Hexadecimal digest of the mesh and of the arguments.
+
+        """
+
+        fingerprint = self._fingerprints.get(poly)
+        if fingerprint is None:
+            mesh = poly.mesh
+            digest = hashlib.sha256()
+            for array in (mesh.vertices, mesh.face_offsets, mesh.he_vertex):
+                digest.update(f"{array.dtype.str}{array.shape};".encode())
+                digest.update(np.ascontiguousarray(array))
+            # the first generation of an input mesh can be ordered differently
+            digest.update(f"initial={poly.initial_mesh}".encode())
+            fingerprint = digest.hexdigest()
+            self._fingerprints[poly] = fingerprint
+        arguments = (a.chaikin_coef, a.order_edges, a.chaikin_kernel)
+        return hashlib.sha256(f"{fingerprint};{arguments!r}".encode()).hexdigest()
+
+    def path(self, key: str, generation: int) -> str:
+        """
+        Returns the path of the file of a cached generation.
+
+        Args:
+            key        (str): Key of the generations (see 'key').
+            generation (int): Generation.
+
+        Returns:
+            str: Cache file.
+
+        """
+
+        return os.path.join(self.directory, f"{key}-{generation}.gen")
+
+    def chaikin(self, poly: Polyhedron, generations: int, a: A) -> Polyhedron:
+        """
+        Apply several generations of the Chaikin3D Algorithm, through the cache.
+
+        The generations are computed (see 'Polyhedron.chaikin') from the
+        highest cached generation, and the last one is cached.
+
+        Args:
+            poly        (Polyhedron): Polyhedron (generation 0).
+            generations (int)       : Number of generations.
+            a           (A)         : Arguments passed to the program (class holder).
+
+        Returns:
+            Polyhedron: Polyhedron of the last generation ('poly' if 'generations' is 0).
+
+        """
+
+        assert (
+            generations >= 0
+        ), f"Number of generations must be positive ({generations} >= 0)"
+        if generations == 0:
+            return poly
+        key = self.key(poly, a)
+        cached = self.get(key, generations, poly)
+        if cached is not None:
+            return cached
+        start, start_poly = 0, poly
+        for generation in range(generations - 1, 0, -1):
+            cached = self.get(key, generation, poly)
+            if cached is not None and _extendable(cached, a):
+                start, start_poly = generation, cached
+                break
+        self.vprint(
+            f"Computing generations {start + 1} to {generations} (from generation {start})"
+        )
+        new_poly = start_poly.chaikin(generations - start, a)
+        self.put(key, generations, new_poly)
+        return new_poly
+
+    def generations(
+        self, poly: Polyhedron, generations: int, a: A, prefetch: int = 0
+    ) -> Iterator[Polyhedron]:
+        """
+        Iterate over the Chaikin3D generations of a polyhedron, through the cache.
+
+        The cached generations are used up to the first missing one (see
+        'chaikin' for the "python" kernel). The next generations are computed
+        from the previous one, and cached. With 'prefetch', they are computed
+        in a worker process, while the consumer works on the previous ones:
+        at most 'prefetch' computed generations wait for the consumer (the
+        worker computes the next one, then waits), which caps the memory. The
+        worker starts from the mesh of the previous generation. With the
+        "python" kernel, it is only used if that generation has no object graph
+        yet (generation 0, usually): the worker builds it from the mesh, like
+        the consumer would, then keeps its own object graph. An object graph
+        built by a previous generation cannot always be rebuilt the same from
+        its mesh (see 'checkpoint.Checkpoint').
+
+        Args:
+            poly        (Polyhedron): Polyhedron (generation 0).
+            generations (int)       : Number of generations.
+            a           (A)         : Arguments passed to the program (class holder).
+            prefetch    (int)       : Generations computed ahead in a worker process (0: none).
+
+        Returns:
+            Iterator[Polyhedron]: Polyhedrons of the generations 0 to 'generations'.
+
+        """
+
+        key = self.key(poly, a)
+        cached = [poly]
+        while len(cached) <= generations:
+            cached_poly = self.get(key, len(cached), poly)
+            if cached_poly is None:
+                break
+            cached.append(cached_poly)
+        # latest generation the next ones can be computed from
+        start = max(
+            generation
+            for generation, cached_poly in enumerate(cached)
+            if generation == 0 or _extendable(cached_poly, a)
+        )
+        previous = cached[start]
+        prefetcher = None
+        if prefetch > 0 and start < generations:
+            if a.chaikin_kernel == "numpy" or not previous.has_object_graph:
+                # started first: the next generations are computed while the
+                # cached ones are used
+                self.vprint(
+                    f"Computing generations {start + 1} to {generations} in a worker process"
+                )
+                prefetcher = _Prefetcher(previous, generations - start, a, prefetch)
+            else:
+                self.vprint(
+                    f"Computing generations {start + 1} to {generations} without "
+                    f"prefetching (the object graph of generation {start} cannot "
+                    f'be sent to a worker process with the "python" kernel)'
+                )
+        try:
+            yield from cached[: start + 1]
+            for generation in range(start + 1, generations + 1):
+                if prefetcher is None:
+                    new_poly = previous.chaikin(1, a)
+                else:
+                    new_poly = prefetcher.next(previous)
+                self.put(key, generation, new_poly)
+                previous = new_poly
+                yield new_poly
+        finally:
+            if prefetcher is not None:
+                prefetcher.close()
+
+    def get(self, key: str, generation: int, poly: Polyhedron) -> Polyhedron | None:
+        """
+        Returns a cached generation.
+
+        Args:
+            key        (str)       : Key of the generations (see 'key').
+            generation (int)       : Generation.
+            poly       (Polyhedron): Polyhedron the generations start from.
+
+        Returns:
+            Polyhedron | None: Cached polyhedron (None if it is not cached).
+
+        """
+
+        cached = self._entries.get((key, generation))
+        if cached is not None:
+            self._entries.move_to_end((key, generation))
+            self.vprint(f"Generation {generation} found in the memory cache")
+            return cached
+        if self.directory is not None:
+            path = self.path(key, generation)
+            if os.path.isfile(path):
+                try:
+                    arrays, metadata = mesh_cache.read_arrays(path, key)
+                    assert metadata["generation"] == generation, "Wrong generation"
+                    mesh, provenance = mesh_cache.read_generation(
+                        arrays, poly.provenance, generation
+                    )
+                except (AssertionError, KeyError, ValueError, OSError) as e:
+                    self.vprint(f"Skipping the cache file {path!r} ({e})")
+                else:
+                    self.vprint(f"Generation {generation} found in the disk cache")
+                    cached = Polyhedron(
+                        initial_mesh=False,
+                        verbose=poly.verbose,
+                        mesh=mesh,
+                        provenance=provenance,
+                    )
+                    self._remember(key, generation, cached)
+                    return cached
+        return None
+
+    def put(self, key: str, generation: int, poly: Polyhedron) -> None:
+        """
+        Cache a generation (in memory, and on disk if there is a directory).
+
+        Args:
+            key        (str)       : Key of the generations (see 'key').
+            generation (int)       : Generation.
+            poly       (Polyhedron): Polyhedron of the generation.
+
+        """
+
+        self._remember(key, generation, poly)
+        if self.directory is not None:
+            arrays = mesh_cache.generation_arrays(
+                poly.mesh, poly.provenance, generation
+            )
+            mesh_cache.write_arrays(
+                self.path(key, generation), key, arrays, {"generation": generation}
+            )
+
+    def clear(self) -> None:
+        """
+        Empty the in-memory tier (the files of the directory are kept).
+
+        """
+
+        self._entries.clear()
+
+    def _remember(self, key: str, generation: int, poly: Polyhedron) -> None:
+        # the sizes change (object graphs are built and consumed): they are
+        # measured again on every insertion
+        if poly.nbytes > self.max_bytes:
+            self.vprint(f"Generation {generation} is too large for the memory cache")
+            return
+        self._entries[(key, generation)] = poly
+        self._entries.move_to_end((key, generation))
+        sizes = {entry: cached.nbytes for entry, cached in self._entries.items()}
+        total = sum(sizes.values())
+        while total > self.max_bytes:
+            entry, _ = self._entries.popitem(last=False)
+            total -= sizes[entry]
+            self.vprint(f"Evicted generation {entry[1]} from the memory cache")
+
+
+class _Prefetcher:
+    """
+    Worker process computing the next Chaikin3D generations of a polyhedron.
+
+    The worker writes the mesh and provenance arrays of every generation to
+    a temporary file (see 'mesh_cache.write_arrays'), that the consumer
+    memory-maps: the arrays are not copied through a pipe. The files are
+    announced through a queue of 'depth' items: when the queue is full, the
+    worker waits for the consumer to take a generation before computing the
+    next one.
+
+    """
+
+    def __init__(self, poly: Polyhedron, generations: int, a: A, depth: int):
+        # the class 'A' cannot be sent to the worker
+        settings = SimpleNamespace(
+            chaikin_coef=a.chaikin_coef,
+            chaikin_kernel=a.chaikin_kernel,
+            order_edges=a.order_edges,
+            workers=a.workers,
+            verbosity=a.verbosity,
+        )
+        arrays = mesh_cache.generation_arrays(
+            poly.mesh, poly.provenance, poly.generation
+        )
+        self._directory = tempfile.mkdtemp(prefix="chaikin3d-")
+        self._queue = multiprocessing.Queue(depth)
+        self._process = multiprocessing.Process(
+            target=_prefetch,
+            args=(
+                self._directory,
+                arrays,
+                poly.generation,
+                poly.initial_mesh,
+                poly.verbose,
+                generations,
+                settings,
+                self._queue,
+            ),
+        )
+        self._process.start()
+
+    def next(self, poly: Polyhedron) -> Polyhedron:
+        """
+        Returns the next generation computed by the worker.
+
+        Args:
+            poly (Polyhedron): Previous generation.
+
+        Returns:
+            Polyhedron: Next generation.
+
+        Raises:
+            Exception: The exception raised in the worker.
+            RuntimeError: The worker exited before sending the generation.
+
+        """
+
+        while True:
+            try:
+                path, error = self._queue.get(timeout=PREFETCH_POLL_INTERVAL)
+                break
+            except queue.Empty:
+                if not self._process.is_alive() and self._queue.empty():
+                    raise RuntimeError(
+                        f"The generation worker exited (exit code {self._process.exitcode})"
+                    )
+        if error is not None:
+            raise error
+        arrays, _ = mesh_cache.read_arrays(path, PREFETCH_KEY)
+        try:
+            # the mapping outlives the file (except on Windows, see 'close')
+            os.unlink(path)
+        except OSError:
+            pass
+        mesh, provenance = mesh_cache.read_generation(arrays, poly.provenance, 1)
+        return Polyhedron(
+            initial_mesh=False, verbose=poly.verbose, mesh=mesh, provenance=provenance
+        )
+
+    def close(self) -> None:
+        """
+        Stop the worker (if it is still running) and wait for it.
+
+        """
+
+        if self._process.is_alive():
+            self._process.terminate()
+        self._process.join()
+        self._queue.close()
+        shutil.rmtree(self._directory, ignore_errors=True)
+
+
+def _prefetch(
+    directory: str,
+    arrays: dict[str, np.ndarray],
+    generation: int,
+    initial_mesh: bool,
+    verbose: bool,
+    generations: int,
+    a: SimpleNamespace,
+    results: multiprocessing.Queue,
+) -> None:
+    def stop(signum: int, frame) -> None:
+        # the consumer stopped early: the generations it did not take are
+        # dropped, and the worker pool and shared memory are cleaned up
+        results.cancel_join_thread()
+        sys.exit(128 + signum)
+
+    signal.signal(signal.SIGTERM, stop)
+    mesh, provenance = mesh_cache.read_generation(arrays, Provenance(), generation)
+    poly = Polyhedron(
+        initial_mesh=initial_mesh, verbose=verbose, mesh=mesh, provenance=provenance
+    )
+    try:
+        for index in range(generations):
+            poly = poly.chaikin(1, a)
+            path = os.path.join(directory, f"{index}.gen")
+            arrays = mesh_cache.generation_arrays(poly.mesh, poly.provenance, 1)
+            mesh_cache.write_arrays(path, PREFETCH_KEY, arrays)
+            results.put((path, None))
+    except Exception as e:
+        results.put((None, e))
+
+
+def _extendable(poly: Polyhedron, a: A) -> bool:
+    # the "python" kernel needs the object graph of the previous generations
+    return a.chaikin_kernel == "numpy" or poly.has_object_graph
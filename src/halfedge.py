@@ -0,0 +1,438 @@
+# Chaikin3D - Half-edge mesh module
+from __future__ import annotations
+from collections.abc import Iterable, Iterator
+import numpy as np
+
+
+def index_dtype(count: int) -> np.dtype:
+    """
+    Returns the smallest signed integer dtype that can index 'count' elements.
+
+    Args:
+        count (int): Number of elements that have to be indexed.
+
+    Returns:
+        np.dtype: np.int32 or np.int64.
+
+    """
+
+    return np.dtype(np.int32) if count < 2 ** 31 - 1 else np.dtype(np.int64)
+
+
+class HalfEdgeMesh:
+    """
+    Compact, array-backed polygon mesh.
+
+    Every face is stored as a cycle of half-edges. The half-edges of the face 'f'
+    are stored contiguously, from 'face_offsets[f]' to 'face_offsets[f + 1]', in
+    the order of the face's vertices. The half-edge 'h' goes from the vertex
+    'he_vertex[h]' to the vertex 'he_vertex[he_next[h]]'. This means that
+    ('he_vertex', 'face_offsets') is also the CSR layout of the face list.
+
+    Two half-edges that lie on the same undirected edge are twins, whatever
+    their direction is (some meshes are not consistently oriented). Half-edges
+    on the border of an open mesh have no twin (-1). On non-manifold edges,
+    the half-edges are paired in order of appearance.
+
+    The undirected edges are numbered in order of first appearance in the faces,
+    which is the order in which 'Group.cycle_connect' creates them.
+
+    An edge is a main edge if it is a main edge of the object graph (see
+    'Polyhedron.edge_index'). All the edges of a mesh built from faces are main
+    edges. From the second Chaikin3D generation on, the faces can also have
+    graphical edges, which are not cut (see 'chaikin_kernel.chaikin_step').
+
+    Attributes:
+        vertices     (np.ndarray): (V, 3) float64 vertex coordinates.
+        face_offsets (np.ndarray): (F + 1,) start of each face in the half-edge arrays.
+        he_vertex    (np.ndarray): (H,) origin vertex of each half-edge.
+        he_next      (np.ndarray): (H,) next half-edge in the same face.
+        he_twin      (np.ndarray): (H,) twin half-edge (-1 for border half-edges).
+        he_face      (np.ndarray): (H,) face of each half-edge.
+        he_edge      (np.ndarray): (H,) undirected edge of each half-edge.
+        edges        (np.ndarray): (E, 2) undirected edges (first half-edge direction).
+        edge_main    (np.ndarray): (E,) whether each edge is a main edge.
+
+    """
+
+    # arrays that fully describe a mesh (see 'from_arrays')
+    ARRAYS = (
+        "vertices",
+        "face_offsets",
+        "he_vertex",
+        "he_next",
+        "he_twin",
+        "he_face",
+        "he_edge",
+        "edges",
+        "edge_main",
+    )
+
+    def __init__(
+        self, vertices: np.ndarray, he_vertex: np.ndarray, face_offsets: np.ndarray
+    ):
+        self.vertices: np.ndarray = np.ascontiguousarray(
+            vertices, dtype=np.float64
+        ).reshape(-1, 3)
+        he_vertex = np.asarray(he_vertex)
+        assert len(he_vertex) == 0 or (
+            he_vertex.min() >= 0 and he_vertex.max() < len(self.vertices)
+        ), "Vertex indices out of range"
+        dtype = index_dtype(max(len(self.vertices), len(he_vertex)))
+        self.he_vertex: np.ndarray = np.ascontiguousarray(he_vertex, dtype=dtype)
+        self.face_offsets: np.ndarray = np.ascontiguousarray(
+            face_offsets, dtype=np.int64
+        )
+        assert self.face_offsets[0] == 0 and self.face_offsets[-1] == len(
+            self.he_vertex
+        ), "Face offsets do not match the half-edge arrays"
+        assert np.all(
+            np.diff(self.face_offsets) > 2
+        ), "Faces must have at least three vertices"
+        self._build_connectivity()
+
+    def __str__(self) -> str:
+        return (
+            f"HalfEdgeMesh(vertices={self.num_vertices}, edges={self.num_edges}, "
+            f"faces={self.num_faces})"
+        )
+
+    def __repr__(self) -> str:
+        return str(self)
+
+    @property
+    def num_vertices(self) -> int:
+        return len(self.vertices)
+
+    @property
+    def num_faces(self) -> int:
+        return len(self.face_offsets) - 1
+
+    @property
+    def num_half_edges(self) -> int:
+        return len(self.he_vertex)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.edges)
+
+    @property
+    def face_sizes(self) -> np.ndarray:
+        return np.diff(self.face_offsets)
+
+    @property
+    def he_dest(self) -> np.ndarray:
+        """(H,) destination vertex of each half-edge."""
+        return self.he_vertex[self.he_next]
+
+    @property
+    def he_prev(self) -> np.ndarray:
+        """(H,) previous half-edge in the same face."""
+        he_prev = np.arange(-1, self.num_half_edges - 1, dtype=self.he_vertex.dtype)
+        he_prev[self.face_offsets[:-1]] = self.face_offsets[1:] - 1
+        return he_prev
+
+    @property
+    def nbytes(self) -> int:
+        """Number of bytes held by the arrays of this mesh."""
+        return sum(getattr(self, name).nbytes for name in HalfEdgeMesh.ARRAYS)
+
+    def face(self, index: int) -> np.ndarray:
+        """
+        Returns the (ordered) vertex indices of a face.
+
+        Args:
+            index (int): Index of the face.
+
+        Returns:
+            np.ndarray: View on the vertex indices of the face.
+
+        """
+
+        return self.he_vertex[self.face_offsets[index] : self.face_offsets[index + 1]]
+
+    def iter_faces(self) -> Iterator[np.ndarray]:
+        """
+        Iterate over the (ordered) vertex indices of all the faces.
+
+        Returns:
+            Iterator[np.ndarray]: Views on the vertex indices of each face.
+
+        """
+
+        offsets = self.face_offsets
+        return (
+            self.he_vertex[offsets[f] : offsets[f + 1]] for f in range(self.num_faces)
+        )
+
+    def vertex_rings(self, rotation: bool = False) -> tuple[np.ndarray]:
+        """
+        Returns the ring of incident main edges of every vertex, in CSR layout.
+
+        An incidence is a (vertex, edge) pair, numbered '2 * edge + side', where
+        'side' is the position of the vertex in 'edges[edge]'. Every incidence
+        of a main edge appears exactly once, in the ring of its vertex (the
+        graphical edges are not in the rings).
+
+        Without rotation, the incidences of a ring follow the edge numbering,
+        which is the order of the main edges in 'Node.edge_list'. With rotation,
+        they follow the rotation system of the vertex: two consecutive edges
+        of the ring share a face (see '_rotation_order').
+
+        Args:
+            rotation (bool): Order the rings using the rotation system.
+
+        Returns:
+            tuple[np.ndarray]:
+                (ring, ring_offsets): the incidences of the vertex 'v' are
+                'ring[ring_offsets[v] : ring_offsets[v + 1]]'.
+
+        """
+
+        incidence_vertex = self.edges.ravel()
+        main = np.repeat(self.edge_main, 2)
+        ring_offsets = np.zeros(self.num_vertices + 1, dtype=np.int64)
+        np.cumsum(
+            np.bincount(incidence_vertex[main], minlength=self.num_vertices),
+            out=ring_offsets[1:],
+        )
+        if rotation:
+            ring = self._rotation_order()
+            # incidences that the rotation did not reach (broken fans) go last
+            missing = np.setdiff1d(
+                np.arange(len(incidence_vertex)), ring, assume_unique=True
+            )
+            ring = np.concatenate((ring, missing))
+            ring = ring[main[ring]]
+            ring = ring[np.argsort(incidence_vertex[ring], kind="stable")]
+        else:
+            ring = np.flatnonzero(main)
+            ring = ring[np.argsort(incidence_vertex[ring], kind="stable")]
+        return ring.astype(self.he_vertex.dtype), ring_offsets
+
+    def _rotation_order(self) -> np.ndarray:
+        """
+        Returns the incidences, sorted by vertex and by rotation around it.
+
+        A corner is a half-edge 'c', seen from its origin vertex: it sits between
+        the half-edges 'he_prev[c]' (in-side) and 'c' (out-side). A dart
+        '2 * c + s' walks around the vertex by leaving the corner 'c' through its
+        in-side (s = 0) or out-side (s = 1), and entering the corner of the twin
+        half-edge. On a border, the dart bounces back into the same corner.
+        The darts form a permutation, whose cycles are the fans around the
+        vertices (an inner fan is covered by two cycles, one per direction, a
+        border fan by one cycle going back and forth).
+
+        The cycles are ranked with pointer jumping, so the whole ordering is done
+        in O(H log(valence)) vectorized operations. For consistently oriented
+        meshes, the kept direction makes the rings turn opposite to the faces, so
+        that the Chaikin vertex-faces keep the orientation of the mesh.
+
+        Returns:
+            np.ndarray: Ordered incidences (some incidences of broken fans may be missing).
+
+        """
+
+        num_darts = 2 * self.num_half_edges
+        corner = np.arange(num_darts, dtype=np.int64) // 2
+        he_prev = self.he_prev.astype(np.int64)
+        exit_he = np.stack((he_prev, np.arange(self.num_half_edges)), axis=1).ravel()
+        vertex = self.he_vertex.astype(np.int64)[corner]
+        darts = np.arange(num_darts, dtype=np.int64)
+
+        # next dart: enter the corner on the other side of the exit half-edge
+        twin = self.he_twin.astype(np.int64)[exit_he]
+        border = twin < 0
+        twin[border] = 0
+        same_origin = self.he_vertex[twin] == vertex
+        next_corner = np.where(same_origin, twin, self.he_next[twin])
+        next_dart = np.where(border, darts ^ 1, 2 * next_corner + (~same_origin))
+
+        # cycle leaders: border cycles start on a border dart (out-side first)
+        priority = np.where(border, 1 - (darts & 1), 2)
+        key = priority * num_darts + darts
+        pointer = next_dart
+        while True:
+            new_key = np.minimum(key, key[pointer])
+            pointer = pointer[pointer]
+            if np.array_equal(new_key, key):
+                break
+            key = new_key
+        leader = key % num_darts
+        is_border_cycle = key < 2 * num_darts
+
+        # rank of each dart in its cycle (list ranking on the predecessors)
+        is_leader = leader == darts
+        rank = (~is_leader).astype(np.int64)
+        pointer = np.empty(num_darts, dtype=np.int64)
+        pointer[next_dart] = darts
+        pointer[is_leader] = darts[is_leader]
+        while not np.array_equal(pointer, pointer[pointer]):
+            rank += rank[pointer]
+            pointer = pointer[pointer]
+
+        # keep one direction per inner fan, and one pass per border fan
+        cycle_length = np.bincount(leader, minlength=num_darts)[leader]
+        fan_size = np.where(is_border_cycle, cycle_length // 2 + 1, cycle_length)
+        keep = (key <= key[darts ^ 1]) & (rank < fan_size)
+        darts = darts[keep]
+        darts = darts[np.lexsort((rank[keep], leader[keep], vertex[keep]))]
+
+        # exit incidence of each dart (first occurrence only)
+        edge = self.he_edge.astype(np.int64)[exit_he[darts]]
+        side = self.edges[edge, 0] != vertex[darts]
+        incidences = 2 * edge + side
+        _, first = np.unique(incidences, return_index=True)
+        return incidences[np.sort(first)]
+
+    def _build_connectivity(self) -> None:
+        """
+        Compute the 'he_next', 'he_face', 'he_twin', 'he_edge', 'edges' and
+        'edge_main' arrays.
+
+        Everything is done with a handful of vectorized passes: the twins are
+        found by sorting the half-edges by their (min, max) vertex key. All the
+        edges are main edges ('edge_main').
+
+        """
+
+        num_half_edges = self.num_half_edges
+        dtype = self.he_vertex.dtype
+        sizes = self.face_sizes
+        starts = self.face_offsets[:-1]
+        # next half-edge: the following one, except for the last one of each face
+        self.he_next = np.arange(1, num_half_edges + 1, dtype=dtype)
+        self.he_next[self.face_offsets[1:] - 1] = starts
+        self.he_face = np.repeat(np.arange(self.num_faces, dtype=dtype), sizes)
+
+        # undirected edge key of every half-edge (the temporaries are released
+        # as soon as possible, this is the peak memory of a Chaikin generation)
+        src = self.he_vertex.astype(np.int64)
+        dst = src[self.he_next]
+        key = np.minimum(src, dst)
+        key *= max(self.num_vertices, 1)
+        key += np.maximum(src, dst)
+        del src, dst
+        # stable sort: the first half-edge of an edge is the first one in its run
+        order = np.argsort(key, kind="stable")
+        sorted_key = key[order]
+        del key
+        run_start = np.ones(num_half_edges, dtype=bool)
+        run_start[1:] = sorted_key[1:] != sorted_key[:-1]
+        del sorted_key
+        run_index = np.cumsum(run_start) - 1
+        run_starts = np.flatnonzero(run_start)
+        del run_start
+        run_sizes = np.diff(np.append(run_starts, num_half_edges))
+
+        # number the edges by first appearance
+        first_half_edges = order[run_starts]
+        edge_order = np.argsort(first_half_edges, kind="stable")
+        run_to_edge = np.empty(len(run_starts), dtype=dtype)
+        run_to_edge[edge_order] = np.arange(len(run_starts), dtype=dtype)
+        self.he_edge = np.empty(num_half_edges, dtype=dtype)
+        self.he_edge[order] = run_to_edge[run_index]
+        del run_to_edge
+        first_half_edges = first_half_edges[edge_order]
+        self.edges = np.stack(
+            (
+                self.he_vertex[first_half_edges],
+                self.he_vertex[self.he_next[first_half_edges]],
+            ),
+            axis=1,
+        )
+        del first_half_edges, edge_order
+
+        # twins: pair the half-edges of each run (0 <-> 1, 2 <-> 3, ...)
+        run_first = run_starts[run_index]
+        run_end = run_sizes[run_index]
+        run_end += run_first
+        del run_index
+        twin_position = np.arange(num_half_edges)
+        twin_position -= run_first
+        twin_position ^= 1
+        twin_position += run_first
+        del run_first
+        has_twin = twin_position < run_end
+        del run_end
+        sorted_twin = np.full(num_half_edges, -1, dtype=dtype)
+        sorted_twin[has_twin] = order[twin_position[has_twin]]
+        del twin_position, has_twin
+        self.he_twin = np.empty(num_half_edges, dtype=dtype)
+        self.he_twin[order] = sorted_twin
+        self.edge_main = np.ones(len(self.edges), dtype=bool)
+
+    def copy(self) -> HalfEdgeMesh:
+        """
+        Returns a copy of this mesh (the arrays are copied too).
+
+        Returns:
+            HalfEdgeMesh: Copy of this mesh.
+
+        """
+
+        mesh = HalfEdgeMesh(
+            self.vertices.copy(), self.he_vertex.copy(), self.face_offsets
+        )
+        mesh.edge_main[...] = self.edge_main
+        return mesh
+
+    @staticmethod
+    def from_arrays(arrays: dict[str, np.ndarray]) -> HalfEdgeMesh:
+        """
+        Returns a HalfEdgeMesh wrapping already computed arrays.
+
+        The connectivity is not recomputed: the arrays must come from an
+        existing mesh (e.g. a cache file).
+
+        Args:
+            arrays (dict[str, np.ndarray]): One array per name in 'ARRAYS'.
+
+        Returns:
+            HalfEdgeMesh: Mesh using the given arrays (they are not copied).
+
+        Raises:
+            AssertionError: The arrays do not describe a mesh.
+
+        """
+
+        mesh = HalfEdgeMesh.__new__(HalfEdgeMesh)
+        for name in HalfEdgeMesh.ARRAYS:
+            setattr(mesh, name, arrays[name])
+        num_half_edges = len(mesh.he_vertex)
+        assert (
+            mesh.vertices.ndim == 2 and mesh.vertices.shape[1] == 3
+        ), "Invalid vertices"
+        assert mesh.edges.ndim == 2 and mesh.edges.shape[1] == 2, "Invalid edges"
+        assert mesh.edge_main.shape == (len(mesh.edges),), "Invalid edge types"
+        assert len(mesh.face_offsets) > 0 and mesh.face_offsets[0] == 0, "Invalid faces"
+        assert mesh.face_offsets[-1] == num_half_edges, "Invalid faces"
+        assert all(
+            len(getattr(mesh, name)) == num_half_edges
+            for name in ("he_next", "he_twin", "he_face", "he_edge")
+        ), "Half-edge arrays of different sizes"
+        return mesh
+
+    @staticmethod
+    def from_faces(
+        vertices: Iterable[np.ndarray], faces: Iterable[Iterable[int]]
+    ) -> HalfEdgeMesh:
+        """
+        Returns a HalfEdgeMesh built from a list of vertices and a list of faces.
+
+        Args:
+            vertices (Iterable[np.ndarray]): Vertex coordinates.
+            faces    (Iterable[Iterable[int]]): Ordered vertex indices of each face.
+
+        Returns:
+            HalfEdgeMesh: Generated mesh.
+
+        """
+
+        faces = [np.asarray(face, dtype=np.int64) for face in faces]
+        sizes = np.fromiter(map(len, faces), dtype=np.int64, count=len(faces))
+        face_offsets = np.zeros(len(faces) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=face_offsets[1:])
+        he_vertex = np.concatenate(faces) if faces else np.zeros(0, dtype=np.int64)
+        vertices = np.asarray(vertices, dtype=np.float64).reshape(-1, 3)
+        return HalfEdgeMesh(vertices, he_vertex, face_offsets)
@@ -0,0 +1,290 @@
+# Chaikin3D - Mesh cache module
+from __future__ import annotations
+from halfedge import HalfEdgeMesh
+from polyhedron import Polyhedron
+from provenance import Provenance
+from wavefront_reader import WaveFrontReader
+import hashlib
+import json
+import numpy as np
+import os
+import struct
+import tempfile
+import zlib
+
+# file layout: magic, header size, JSON header, then the (aligned) arrays
+MAGIC = b"CHAIKIN3DMESH\x00\x00\x00"
+VERSION = 2
+ALIGNMENT = 64
+# size of the blocks read to hash the input files (bytes)
+HASH_BLOCK_SIZE = 1 << 22
+
+
+def load_polyhedron(
+    path: str, rotate: bool = False, cache_dir: str | None = None, verbose: bool = False
+) -> Polyhedron:
+    """
+    Read a mesh file, through the cache if there is one.
+
+    The cache entries are keyed by the content of the input file and by the
+    'rotate' flag. On a hit, the mesh arrays (vertices, faces and adjacency)
+    are memory-mapped from the cache file: both the parsing and the topology
+    construction are skipped. On a miss, or if the entry is stale or corrupt,
+    the file is parsed and the entry is (re)written.
+
+    Args:
+        path      (str)       : Input (.obj) file.
+        rotate    (bool)      : Invert the y and z axes.
+        cache_dir (str | None): Cache directory (None: no cache).
+        verbose   (bool)      : Verbose.
+
+    Returns:
+        Polyhedron: Polyhedron backed by the mesh.
+
+    """
+
+    if cache_dir is None:
+        reader = WaveFrontReader(path, True, rotate, verbose)
+        return reader.to_polyhedron()
+
+    key = cache_key(path, rotate)
+    cache_path = os.path.join(cache_dir, f"{key}.mesh")
+    mesh = None
+    if os.path.isfile(cache_path):
+        try:
+            mesh = read_mesh(cache_path, key)
+            if verbose:
+                print(f"Loaded the mesh from the cache ({cache_path})")
+        except (AssertionError, KeyError, ValueError, OSError) as e:
+            if verbose:
+                print(f"Rebuilding the cache entry {cache_path!r} ({e})")
+    if mesh is None:
+        reader = WaveFrontReader(path, True, rotate, verbose)
+        mesh = reader.to_polyhedron().mesh
+        write_mesh(cache_path, key, mesh)
+        if verbose:
+            print(f"Saved the mesh to the cache ({cache_path})")
+    return Polyhedron.from_mesh(mesh, verbose=verbose)
+
+
+def cache_key(path: str, rotate: bool) -> str:
+    """
+    Returns the cache key of a mesh file.
+
+    Args:
+        path   (str) : Input file.
+        rotate (bool): Invert the y and z axes.
+
+    Returns:
+        str: Hexadecimal digest of the file content, the flags and the cache version.
+
+    """
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while block := f.read(HASH_BLOCK_SIZE):
+            digest.update(block)
+    digest.update(f"rotate={rotate};version={VERSION}".encode())
+    return digest.hexdigest()
+
+
+def write_mesh(path: str, key: str, mesh: HalfEdgeMesh) -> None:
+    """
+    Write the arrays of a mesh to a cache file (see 'write_arrays').
+
+    Args:
+        path (str)         : Cache file.
+        key  (str)         : Cache key (see 'cache_key').
+        mesh (HalfEdgeMesh): Mesh.
+
+    """
+
+    write_arrays(path, key, {name: getattr(mesh, name) for name in HalfEdgeMesh.ARRAYS})
+
+
+def read_mesh(path: str, key: str) -> HalfEdgeMesh:
+    """
+    Memory-map the arrays of a mesh from a cache file (see 'read_arrays').
+
+    Args:
+        path (str): Cache file.
+        key  (str): Expected cache key (see 'cache_key').
+
+    Returns:
+        HalfEdgeMesh: Mesh backed by the file.
+
+    Raises:
+        AssertionError: The entry is stale (other version or key) or corrupt.
+
+    """
+
+    arrays, _ = read_arrays(path, key)
+    return HalfEdgeMesh.from_arrays(arrays)
+
+
+def generation_arrays(
+    mesh: HalfEdgeMesh, provenance: Provenance, generations: int
+) -> dict[str, np.ndarray]:
+    """
+    Returns the arrays of a Chaikin3D generation, to write with 'write_arrays'.
+
+    The arrays are the ones of the mesh, and the provenance arrays of the last
+    'generations' generations ('parent_vertices_<g>' and 'parent_edges_<g>',
+    'g' going from 0 to 'generations' - 1).
+
+    Args:
+        mesh        (HalfEdgeMesh): Mesh of the generation.
+        provenance  (Provenance)  : Provenance of the generation.
+        generations (int)         : Number of generations to store the provenance of.
+
+    Returns:
+        dict[str, np.ndarray]: Named arrays (not copied).
+
+    """
+
+    arrays = {name: getattr(mesh, name) for name in HalfEdgeMesh.ARRAYS}
+    first = provenance.generation - generations
+    for g in range(generations):
+        arrays[f"parent_vertices_{g}"] = provenance.parent_vertices[first + g]
+        arrays[f"parent_edges_{g}"] = provenance.parent_edges[first + g]
+    return arrays
+
+
+def read_generation(
+    arrays: dict[str, np.ndarray], provenance: Provenance, generations: int
+) -> tuple[HalfEdgeMesh, Provenance]:
+    """
+    Returns the mesh and provenance of arrays built by 'generation_arrays'.
+
+    Args:
+        arrays      (dict[str, np.ndarray]): Named arrays (see 'read_arrays').
+        provenance  (Provenance)           : Provenance of the generation the arrays start from.
+        generations (int)                  : Number of generations stored in the arrays.
+
+    Returns:
+        tuple[HalfEdgeMesh, Provenance]: (mesh, provenance) of the generation.
+
+    Raises:
+        KeyError: An array is missing.
+
+    """
+
+    mesh = HalfEdgeMesh.from_arrays(arrays)
+    provenance = Provenance(
+        provenance.parent_vertices
+        + [arrays[f"parent_vertices_{g}"] for g in range(generations)],
+        provenance.parent_edges
+        + [arrays[f"parent_edges_{g}"] for g in range(generations)],
+    )
+    return mesh, provenance
+
+
+def write_arrays(
+    path: str, key: str, arrays: dict[str, np.ndarray], metadata: dict = None
+) -> None:
+    """
+    Write named arrays to a binary file.
+
+    The file is written next to its destination, then renamed: a file is
+    either complete or missing, even if several processes write it at once.
+
+    Args:
+        path     (str)                  : Output file.
+        key      (str)                  : Key of the content (checked when reading).
+        arrays   (dict[str, np.ndarray]): Arrays.
+        metadata (dict)                 : Extra (JSON) information.
+
+    """
+
+    # array table (offsets from the start of the data section)
+    table = dict()
+    offset = 0
+    for name, array in arrays.items():
+        table[name] = {
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "offset": offset,
+        }
+        offset = _align(offset + array.nbytes)
+    data_size = offset
+    checksum = 0
+    for name, array in arrays.items():
+        checksum = zlib.crc32(np.ascontiguousarray(array), checksum)
+    header = json.dumps(
+        {
+            "version": VERSION,
+            "key": key,
+            "arrays": table,
+            "data size": data_size,
+            "crc32": checksum,
+            "metadata": metadata or dict(),
+        }
+    ).encode()
+    data_start = _align(len(MAGIC) + 8 + len(header))
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<Q", len(header)))
+            f.write(header)
+            for name, array in arrays.items():
+                f.seek(data_start + table[name]["offset"])
+                f.write(np.ascontiguousarray(array).data)
+            f.truncate(data_start + data_size)
+        # 'mkstemp' creates private files
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def read_arrays(path: str, key: str) -> tuple[dict[str, np.ndarray], dict]:
+    """
+    Memory-map the arrays of a file written by 'write_arrays'.
+
+    The pages are mapped copy-on-write: the arrays can be modified without
+    changing the file.
+
+    Args:
+        path (str): Input file.
+        key  (str): Expected key of the content.
+
+    Returns:
+        tuple[dict[str, np.ndarray], dict]: (arrays, metadata).
+
+    Raises:
+        AssertionError: The file is stale (other version or key) or corrupt.
+
+    """
+
+    file_size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        magic = f.read(len(MAGIC))
+        assert magic == MAGIC, "Not a mesh cache file"
+        (header_size,) = struct.unpack("<Q", f.read(8))
+        assert len(MAGIC) + 8 + header_size <= file_size, "Truncated header"
+        header = json.loads(f.read(header_size))
+    assert header["version"] == VERSION, f"Cache version {header['version']}"
+    assert header["key"] == key, "Stale cache entry"
+    data_start = _align(len(MAGIC) + 8 + header_size)
+    assert data_start + header["data size"] == file_size, "Truncated data"
+
+    data = np.memmap(path, dtype=np.uint8, mode="c")
+    arrays = dict()
+    checksum = 0
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        start = data_start + spec["offset"]
+        stop = start + int(np.prod(spec["shape"], dtype=np.int64)) * dtype.itemsize
+        assert stop <= file_size, f"Array {name!r} out of the file"
+        arrays[name] = data[start:stop].view(dtype).reshape(spec["shape"])
+        checksum = zlib.crc32(data[start:stop], checksum)
+    assert checksum == header["crc32"], "Checksum mismatch"
+    return arrays, header.get("metadata", dict())
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
@@ -0,0 +1,170 @@
+# Chaikin3D - Binary mesh writers module
+from __future__ import annotations
+import json
+import numpy as np
+import struct
+
+GENERATOR = "Chaikin3D (https://github.com/Nicolas-Reyland/Chaikin3D)"
+
+
+def write_ply(
+    path: str, vertices: np.ndarray, face_indices: np.ndarray, face_offsets: np.ndarray
+) -> None:
+    """
+    Write a mesh to a binary (little-endian) PLY file.
+
+    The faces are written as they are (polygons). The size of each face is
+    stored as an 'uchar', or as an 'int' if a face has more than 255 vertices.
+
+    Args:
+        path         (str)       : Output file.
+        vertices     (np.ndarray): (V, 3) vertex coordinates.
+        face_indices (np.ndarray): 0-based vertex indices of the faces (flat).
+        face_offsets (np.ndarray): (F + 1,) offsets of the faces in 'face_indices'.
+
+    """
+
+    vertices = np.asarray(vertices, dtype="<f4").reshape(-1, 3)
+    face_offsets = np.asarray(face_offsets, dtype=np.int64)
+    sizes = np.diff(face_offsets)
+    count_dtype = np.dtype("<u1" if sizes.max(initial=0) < 256 else "<i4")
+    count_type = "uchar" if count_dtype.itemsize == 1 else "int"
+
+    # face records: the size of the face, then its indices (not aligned)
+    num_faces = len(sizes)
+    faces = np.empty(count_dtype.itemsize * num_faces + 4 * len(face_indices), np.uint8)
+    face_starts = count_dtype.itemsize * np.arange(num_faces) + 4 * face_offsets[:-1]
+    faces[face_starts[:, None] + np.arange(count_dtype.itemsize)] = (
+        sizes.astype(count_dtype).view(np.uint8).reshape(num_faces, -1)
+    )
+    face_of_index = np.repeat(np.arange(num_faces), sizes)
+    index_starts = count_dtype.itemsize * (face_of_index + 1) + 4 * np.arange(
+        len(face_indices)
+    )
+    faces[index_starts[:, None] + np.arange(4)] = (
+        np.asarray(face_indices).astype("<i4").view(np.uint8).reshape(-1, 4)
+    )
+
+    header = (
+        "ply\n"
+        "format binary_little_endian 1.0\n"
+        f"comment generated by {GENERATOR}\n"
+        f"element vertex {len(vertices)}\n"
+        "property float x\n"
+        "property float y\n"
+        "property float z\n"
+        f"element face {num_faces}\n"
+        f"property list {count_type} int vertex_indices\n"
+        "end_header\n"
+    )
+    with open(path, "wb") as f:
+        f.write(header.encode("ascii"))
+        vertices.tofile(f)
+        faces.tofile(f)
+
+
+def write_stl(path: str, vertices: np.ndarray, triangles: np.ndarray) -> None:
+    """
+    Write a triangulated mesh to a binary STL file.
+
+    The facet normals follow the winding of the triangles (null for the
+    degenerate triangles).
+
+    Args:
+        path      (str)       : Output file.
+        vertices  (np.ndarray): (V, 3) vertex coordinates.
+        triangles (np.ndarray): (T, 3) vertex indices of the triangles.
+
+    """
+
+    corners = np.asarray(vertices, dtype=np.float64)[np.asarray(triangles)]
+    normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    np.divide(normals, lengths, out=normals, where=lengths > 0)
+
+    # 50-byte facet records (normal, three vertices, attribute byte count)
+    facets = np.zeros(
+        len(corners),
+        dtype=[("normal", "<f4", (3,)), ("vertices", "<f4", (3, 3)), ("attr", "<u2")],
+    )
+    facets["normal"] = normals
+    facets["vertices"] = corners
+    with open(path, "wb") as f:
+        f.write(f"Binary STL generated by {GENERATOR}".encode("ascii")[:80].ljust(80))
+        f.write(struct.pack("<I", len(facets)))
+        facets.tofile(f)
+
+
+def write_glb(path: str, vertices: np.ndarray, triangles: np.ndarray) -> None:
+    """
+    Write a triangulated mesh to a GLB (binary glTF 2.0) file.
+
+    The file holds a single mesh, with one indexed triangle primitive (float32
+    positions and uint32 indices).
+
+    Args:
+        path      (str)       : Output file.
+        vertices  (np.ndarray): (V, 3) vertex coordinates.
+        triangles (np.ndarray): (T, 3) vertex indices of the triangles.
+
+    """
+
+    positions = np.asarray(vertices, dtype="<f4").reshape(-1, 3)
+    indices = np.asarray(triangles).astype("<u4").ravel()
+    # binary chunk: the positions, then the indices (both 4-byte aligned)
+    positions_length = positions.nbytes
+    indices_length = indices.nbytes
+    binary_length = positions_length + indices_length
+    gltf = {
+        "asset": {"version": "2.0", "generator": GENERATOR},
+        "scene": 0,
+        "scenes": [{"nodes": [0]}],
+        "nodes": [{"mesh": 0}],
+        "meshes": [
+            {"primitives": [{"attributes": {"POSITION": 0}, "indices": 1, "mode": 4}]}
+        ],
+        "accessors": [
+            {
+                "bufferView": 0,
+                "componentType": 5126,
+                "count": len(positions),
+                "type": "VEC3",
+                "min": positions.min(axis=0, initial=np.inf).tolist(),
+                "max": positions.max(axis=0, initial=-np.inf).tolist(),
+            },
+            {
+                "bufferView": 1,
+                "componentType": 5125,
+                "count": len(indices),
+                "type": "SCALAR",
+            },
+        ],
+        "bufferViews": [
+            {
+                "buffer": 0,
+                "byteOffset": 0,
+                "byteLength": positions_length,
+                "target": 34962,
+            },
+            {
+                "buffer": 0,
+                "byteOffset": positions_length,
+                "byteLength": indices_length,
+                "target": 34963,
+            },
+        ],
+        "buffers": [{"byteLength": binary_length}],
+    }
+    # the JSON chunk is padded with spaces, the binary chunk with zeros
+    json_chunk = json.dumps(gltf, separators=(",", ":")).encode()
+    json_chunk += b" " * (-len(json_chunk) % 4)
+    binary_padding = -binary_length % 4
+    total_length = 12 + 8 + len(json_chunk) + 8 + binary_length + binary_padding
+    with open(path, "wb") as f:
+        f.write(struct.pack("<4sII", b"glTF", 2, total_length))
+        f.write(struct.pack("<I4s", len(json_chunk), b"JSON"))
+        f.write(json_chunk)
+        f.write(struct.pack("<I4s", binary_length + binary_padding, b"BIN\x00"))
+        positions.tofile(f)
+        indices.tofile(f)
+        f.write(b"\x00" * binary_padding)
@@ -10,19 +10,40 @@ class Node:
     """
     A Node is a point in space, at the corner of a mesh.
 
+    The coordinates of a Node are a row of a (N, 3) float64 coordinate buffer.
+    Nodes built with 'Node.from_points' share one buffer, and 'coords' is a
+    view into it.
+
     """
 
+    __slots__ = (
+        "_buffer",
+        "_row",
+        "num_edges",
+        "edge_list",
+        "neighbors",
+        "index",
+        "generation",
+    )
+
     def __init__(self, x: float, y: float, z: float):
-        self.x, self.y, self.z = x, y, z
-        self.coords_list = [x, y, z]
-        self.coords = np.array(self.coords_list)
+        self._init(np.array(((x, y, z),), dtype=np.float64), 0)
+
+    def _init(self, buffer: np.ndarray, row: int) -> None:
+        self._buffer: np.ndarray = buffer
+        self._row: int = row
         self.num_edges: int = 0
         self.edge_list: list[E.Edge] = list()
+        # adjacency index: partner node key -> edge (see 'Edge.are_connected')
+        self.neighbors: dict[int, E.Edge] = dict()
+        # position in the polyhedron's node list & Chaikin generation
+        self.index: int = -1
+        self.generation: int = 0
 
     def __eq__(self, other: Node) -> bool:
         T = type(other)
         if T is Node:
-            return self.x == other.x and self.y == other.y and self.z == other.z
+            return self is other or self.coords_list == other.coords_list
             # return self is other
         elif T is list:
             return self.coords_list == other
@@ -41,6 +62,35 @@ class Node:
     def __repr__(self):
         return str(self)
 
+    @property
+    def coords(self) -> np.ndarray:
+        return self._buffer[self._row]
+
+    @coords.setter
+    def coords(self, coords: np.ndarray) -> None:
+        self._buffer[self._row] = coords
+
+    @property
+    def key(self) -> int:
+        # stable identity (two nodes can share the same coordinates)
+        return id(self)
+
+    @property
+    def x(self) -> float:
+        return float(self._buffer[self._row, 0])
+
+    @property
+    def y(self) -> float:
+        return float(self._buffer[self._row, 1])
+
+    @property
+    def z(self) -> float:
+        return float(self._buffer[self._row, 2])
+
+    @property
+    def coords_list(self) -> list[float]:
+        return self._buffer[self._row].tolist()
+
     @property
     def partners(self) -> Iterable[Node]:
         return (edge.get_partner_node(self) for edge in self.edge_list)
@@ -66,9 +116,11 @@ class Node:
         edge = E.Edge(self, other, type_)
         # add to self
         self.edge_list.append(edge)
+        self.neighbors[other.key] = edge
         self.num_edges += 1
         # add to other
         other.edge_list.append(edge)
+        other.neighbors[self.key] = edge
         other.num_edges += 1
 
     def get_edges_by_type(self, type_: str) -> list[Edge]:
@@ -108,12 +160,11 @@ class Node:
             # find the other, "partner", node in the edge
             edge_node = edge.get_partner_node(self)
             # find triangular edge_list
-            for sub_edge in filter(
-                lambda sub_edge: not sub_edge.contains_node(self),
-                edge_node.get_edges_by_type(type_),
-            ):
+            for sub_edge in edge_node.get_edges_by_type(type_):
                 sub_edge_node = sub_edge.get_partner_node(edge_node)
-                if E.Edge.are_connected(sub_edge_node, self, type_):
+                if sub_edge_node is not self and E.Edge.are_connected(
+                    sub_edge_node, self, type_
+                ):
                     triangles.add(Triangle(self, edge_node, sub_edge_node))
         return triangles
 
@@ -203,51 +254,59 @@ class Node:
         #
         # 'Reducing' the corresponding triangle set means to remove DAC from it
 
-        participations = list()
-        for i, edge in enumerate(self.edge_list):
-            partner_node_coords = edge.get_partner_node(self).coords_list
-            participations.append(
-                len([t for t in raw_triangles if partner_node_coords in t])
-            )
+        # position of the partner nodes in the edge-list
+        edge_positions: dict[int, int] = {
+            edge.get_partner_node(self).key: position
+            for position, edge in enumerate(self.edge_list)
+        }
+        participations = [0] * len(self.edge_list)
+        for triangle in raw_triangles:
+            for triangle_node in triangle:
+                position = edge_positions.get(triangle_node.key)
+                if position is not None:
+                    participations[position] += 1
 
         triangles, duplicate_triangles = Triangle.reduce_triangle_set(
             self, raw_triangles, participations
         )
         triangles = list(triangles)
 
+        def own_edges(triangle: Triangle) -> tuple[E.Edge]:
+            # the two edges of this node in the triangle (see '_own_edges_in_triangle')
+            first, second = sorted(
+                edge_positions[triangle_node.key]
+                for triangle_node in triangle
+                if triangle_node.key in edge_positions
+            )[:2]
+            return self.edge_list[first], self.edge_list[second]
+
         # Last triangle (keeping track of the last one)
         last_triangle = triangles.pop()
+        # Remaining triangles, indexed by node
+        remaining = [True] * len(triangles)
+        node_triangles: dict[int, list[int]] = dict()
+        for position, triangle in enumerate(triangles):
+            for triangle_node in triangle:
+                node_triangles.setdefault(triangle_node.key, []).append(position)
 
         # Ordered list of the edges
         # Fill it with the two edges of the last_triangle that this node is part of
-        _, popped_edge = self._own_edges_in_triangle(last_triangle)
+        _, popped_edge = own_edges(last_triangle)
         ordered_edge_list: list[Edge] = [popped_edge]
         last_partner_node: Node = ordered_edge_list[-1].get_partner_node(self)
-        last_partner_node_coords = last_partner_node.coords_list
 
         # while there are triangles left ...
-        while triangles:
-            # ... look for the next one (and the corresponding edges)
-            for index, triangle in enumerate(triangles):
-                if last_partner_node_coords in triangle:
-                    # found the next triangle !
-                    (edge1, edge2) = self._own_edges_in_triangle(triangle)
-                    if edge1.contains_node(last_partner_node):
-                        # order: edge1, edge2
-                        ordered_edge_list.append(edge2)
-                        # prepare next iteration
-                        last_partner_node = edge2.get_partner_node(self)
-                    else:
-                        # order: edge2, edge1
-                        assert edge2.contains_node(last_partner_node)
-                        ordered_edge_list.append(edge1)
-                        # prepare next iteration
-                        last_partner_node = edge1.get_partner_node(self)
-                    # prepare next iteration through triangles
-                    last_partner_node_coords = last_partner_node.coords_list
-                    triangles.pop(index)
-                    break
-            else:
+        for _ in range(len(triangles)):
+            # ... take the first one with the last partner (and the corresponding edges)
+            position = next(
+                (
+                    position
+                    for position in node_triangles.get(last_partner_node.key, ())
+                    if remaining[position]
+                ),
+                None,
+            )
+            if position is None:
                 print("official", len(self.edge_list))
                 for edge in self.edge_list:
                     print(f"    {edge = }")
@@ -260,6 +319,19 @@ class Node:
                     print(f"    {edge = }")
                 print()
                 raise Exception(f"Corrupt node found. Aborting. node = {self}")
+            remaining[position] = False
+            (edge1, edge2) = own_edges(triangles[position])
+            if edge1.get_partner_node(self) is last_partner_node:
+                # order: edge1, edge2
+                ordered_edge_list.append(edge2)
+                # prepare next iteration
+                last_partner_node = edge2.get_partner_node(self)
+            else:
+                # order: edge2, edge1
+                assert edge2.get_partner_node(self) is last_partner_node
+                ordered_edge_list.append(edge1)
+                # prepare next iteration
+                last_partner_node = edge1.get_partner_node(self)
         # replace class edge_list with ordered one
         self.edge_list = ordered_edge_list
         return duplicate_triangles
@@ -285,6 +357,38 @@ class Node:
         ), f"The number of scalar values in the vector are not 3 ({len(point)} != 3)"
         return Node(point[0], point[1], point[2])
 
+    @staticmethod
+    def from_points(points: np.ndarray) -> list[Node]:
+        """
+        Return the Nodes at 'points', sharing one coordinate buffer.
+
+        The buffer is 'points' itself if it already is a C-contiguous float64
+        array (no copy is made), so writing to the coordinates of a Node
+        writes to 'points' (and vice-versa).
+
+        Args:
+            points (np.ndarray): (N, 3) points in space.
+
+        Returns:
+            list[Node]:
+                Node instances, in the same order as the points (their 'index'
+                is their row in the buffer).
+
+        Raises:
+            AssertionError: The points are not an (N, 3) array
+
+        """
+
+        buffer = np.ascontiguousarray(points, dtype=np.float64)
+        assert (
+            buffer.ndim == 2 and buffer.shape[1] == 3
+        ), f"The points must be an (N, 3) array (got {buffer.shape})"
+        nodes = [Node.__new__(Node) for _ in range(len(buffer))]
+        for row, node in enumerate(nodes):
+            node._init(buffer, row)
+            node.index = row
+        return nodes
+
 
 class Triangle:
     """
@@ -294,6 +398,7 @@ class Triangle:
 
     def __init__(self, A: Node, B: Node, C: Node):
         self.nodes = [A, B, C]
+        self.key = frozenset((A.key, B.key, C.key))
 
     def __str__(self) -> str:
         return (
@@ -325,13 +430,6 @@ class Triangle:
     def __iter__(self):
         return iter(self.nodes)
 
-    @property
-    def sim_hash(self):
-        # Give a NON-UNIQUE hash for this triangle
-        # The goal is to return a value that is as unique as possible
-        # This is used for optimization.
-        return sum(sum(node.coords + i + 1) for i, node in enumerate(self.nodes))
-
     @property
     def iter_coords(self):
         return iter(map(lambda node: node.coords_list, self))
@@ -376,7 +474,13 @@ class Triangle:
         #
         # current node is D
 
-        reduced_triangle_set = triangle_set.copy()
+        # triangles that are still in the reduced set, indexed by node
+        triangles = list(triangle_set)
+        remaining = [True] * len(triangles)
+        node_triangles: dict[int, list[int]] = dict()
+        for position, triangle in enumerate(triangles):
+            for triangle_node in triangle:
+                node_triangles.setdefault(triangle_node.key, []).append(position)
         duplicate_triangles = VirtualSet()
 
         for n in range(3, max(participations) + 1):
@@ -389,16 +493,21 @@ class Triangle:
                 partner_node = edge.get_partner_node(node)
                 # triplet_nodes : [P2, P3, P5] ([E, A, F])
                 triplet_nodes = list()
-                p_triangles = list()
-                for triangle in reduced_triangle_set:
-                    if partner_node in triangle:
-                        p_triangles.append(triangle)
-                        for triangle_node in triangle:
-                            if triangle_node not in [node, partner_node]:
-                                triplet_nodes.append(triangle_node)
-                                break
-                        else:
-                            raise Exception(f"Corrupt triangle: {triangle}")
+                p_triangles = [
+                    position
+                    for position in node_triangles.get(partner_node.key, ())
+                    if remaining[position]
+                ]
+                for position in p_triangles:
+                    for triangle_node in triangles[position]:
+                        if (
+                            triangle_node is not node
+                            and triangle_node is not partner_node
+                        ):
+                            triplet_nodes.append(triangle_node)
+                            break
+                    else:
+                        raise Exception(f"Corrupt triangle: {triangles[position]}")
                 # Make sure that we have P2, P3 and P5
                 if len(triplet_nodes) != n:
                     continue
@@ -424,9 +533,7 @@ class Triangle:
                 assert p5_node is not None
                 # now that P5 has been removed from the 'triplet_nodes', it
                 # is no longer a triplet.
-                # We loose a bit of efficiency, while having clearer code.
-                p_nodes = triplet_nodes.copy()
-                del triplet_nodes
+                p_nodes = triplet_nodes
                 # We have P2 and P3 left
                 # The goal is to distinguish P2 and P3. P3 is connected to
                 # P4 (G) and possibly other nodes, while P2 is only connected
@@ -438,9 +545,8 @@ class Triangle:
                 for p_node, alter_node in (p_nodes, reversed(p_nodes)):
                     # looking for P3
                     if len(p_node.edge_list) >= 3 and any(
-                        edge.get_partner_node(p_node)
-                        not in (node, partner_node, alter_node)  # (P0, P1, P(2?3))
-                        for edge in p_node.edge_list
+                        partner_key not in (node.key, partner_node.key, alter_node.key)
+                        for partner_key in p_node.neighbors
                     ):
                         p3_node = p_node
                         p2_node = alter_node
@@ -450,10 +556,17 @@ class Triangle:
                 # As a last step, remove the P0-P1-P3 triangle from
                 # the triangle set.
                 p0_p1_p3 = next(
-                    triangle for triangle in p_triangles if p3_node in triangle
+                    position
+                    for position in p_triangles
+                    if any(
+                        triangle_node is p3_node
+                        for triangle_node in triangles[position]
+                    )
                 )
-                p0_p1_p3_set = VirtualSet([p0_p1_p3])
-                reduced_triangle_set -= p0_p1_p3_set
-                duplicate_triangles &= p0_p1_p3_set
+                remaining[p0_p1_p3] = False
+                duplicate_triangles.add(triangles[p0_p1_p3])
 
+        reduced_triangle_set = VirtualSet(
+            triangle for triangle, keep in zip(triangles, remaining) if keep
+        )
         return reduced_triangle_set, duplicate_triangles
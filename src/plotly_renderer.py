@@ -146,30 +146,22 @@ class Renderer:
     ) -> list[go.Mesh3d]:
         self.vprint("Reading polyhedron data for rendering")
         t1 = time.perf_counter()
-        vertex_list = []
-        vertex_list_length = 0
-        vertex_index_list = []
-        triangle_iterable = (
-            polyhedron if type_ == "any" else polyhedron._iter_triangles(type_)
+        # the coordinates come straight from the vertex array, and the
+        # triangles index it (the nodes and the vertices have the same indices)
+        triangles = (
+            polyhedron.face_triangles()
+            if type_ == "any"
+            else polyhedron.triangles(type_)
         )
-        for triangle in triangle_iterable:
-            index_list = []
-            for vertex in triangle.iter_coords:
-                if vertex not in vertex_list:
-                    vertex_list.append(vertex)
-                    vertex_list_length += 1
-                    index_list.append(vertex_list_length - 1)
-                else:
-                    index_list.append(vertex_list.index(vertex))
-            vertex_index_list.append(index_list)
+        vertices = polyhedron.mesh.vertices
         self.vprint(f"Total time for processing: {time.perf_counter() - t1:.3}s")
 
-        if not vertex_list and not vertex_index_list:
+        if len(triangles) == 0:
             self.vprint("No polyhedron data")
             return []
 
-        X, Y, Z = list(zip(*vertex_list))
-        I, J, K = list(zip(*vertex_index_list))
+        X, Y, Z = vertices.T
+        I, J, K = triangles.T
         if color == "random":
             num_colorscales = 4
             return [
@@ -219,24 +211,15 @@ class Renderer:
         node_color: str = "green",
         width: int = 2,
     ) -> list[go.Scatter3d]:
-        # flatten a list of lists into a list
-        flatten = lambda l: list(y for x in l for y in x)
-        # iterative code below
-        xs, ys, zs = map(
-            flatten,
-            zip(
-                *(
-                    [[edge.A.coords[i], edge.B.coords[i], None] for i in range(3)]
-                    for edge in polyhedron.get_edges(type_)
-                )
-            ),
-        )
-        # xs, ys, zs = [], [], []
-        # for edge in polyhedron.get_edges(type_):
-        #     A, B = edge.A.coords, edge.B.coords
-        #     xs.extend([A[0], B[0], None])
-        #     ys.extend([A[1], B[1], None])
-        #     zs.extend([A[2], B[2], None])
+        # the edges of all the types come from one pass over the object graph,
+        # shared by every call on the polyhedron: the type is only a mask
+        edges, main = polyhedron.edge_index()
+        if type_ != "any":
+            edges = edges[main if type_ == "main" else ~main]
+        # (A, B, NaN) points of every edge: the NaN points are gaps in the line
+        points = np.full((len(edges), 3, 3), np.nan)
+        points[:, :2] = polyhedron.mesh.vertices[edges]
+        xs, ys, zs = points.reshape(-1, 3).T
         return [
             go.Scatter3d(
                 x=xs,
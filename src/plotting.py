@@ -1,5 +1,11 @@
 from __future__ import annotations
+from generation_cache import GenerationCache
 from math import sqrt
+import os
+
+# number of generations computed ahead (in a worker process) while the
+# previous ones are drawn, by 'draw_chaikin_evolution' (with several CPUs)
+EVOLUTION_PREFETCH = 1
 
 # functions
 def draw_full(renderer: Renderer, poly: Polyhedron, a: A) -> None:
@@ -30,7 +36,11 @@ def draw_full(renderer: Renderer, poly: Polyhedron, a: A) -> None:
      * (3, 3)
        - all edges
        - all faces (translucent)
-    They are drawn left to right, top to bottom.
+    They are drawn left to right, top to bottom. The edges of the polyhedron are
+    listed in one pass over its object graph, and its triangles are enumerated
+    once from them (see 'Polyhedron.edge_index' and 'Polyhedron.triangles'):
+    every panel only selects the edges or triangles of one type, and they all
+    share the same vertex array.
 
     Args:
         renderer (Renderer)  : renderer for the mesh
@@ -110,18 +120,24 @@ def draw_full(renderer: Renderer, poly: Polyhedron, a: A) -> None:
     return renderer.draw_subplots()
 
 
-def draw_chaikin_evolution(renderer: Renderer, poly: Polyhedron, a: A) -> None:
+def draw_chaikin_evolution(
+    renderer: Renderer, poly: Polyhedron, a: A, cache: GenerationCache = None
+) -> None:
     """
     Draw six different Chaikin generations of the same mesh
 
     Draw six the same mesh, but everytime it gets drawn, the Chaikin3D algorithm
     is applied to it. Starting with generation zero (original polyhedron), we
-    end at generation 5.
+    end at generation 5. The generations are taken from the cache when they
+    are in it, and every other one is computed from the previous one, in a
+    worker process if there are several CPUs: generation i + 1 is computed
+    while generation i is drawn (see 'GenerationCache.generations').
 
     Args:
-        renderer (Renderer)  : renderer for the mesh
-        poly     (Polyhedron): polyhedron (mesh) to draw
-        a        (A)         : this variable contains all the cmd-line arguments
+        renderer (Renderer)       : renderer for the mesh
+        poly     (Polyhedron)     : polyhedron (mesh) to draw
+        a        (A)              : this variable contains all the cmd-line arguments
+        cache    (GenerationCache): generation cache (None: a new in-memory cache)
 
     Raises:
         AssertionError: Invalid number of Chaikin generations
@@ -145,7 +161,16 @@ def draw_chaikin_evolution(renderer: Renderer, poly: Polyhedron, a: A) -> None:
             "Chaikin Gen {}".format(i) for i in range(a.chaikin_generations + 1)
         ],
     )
-    for i in range(a.chaikin_generations + 1):
+    if cache is None:
+        cache = GenerationCache(verbose=a.verbose)
+    # on a single CPU, the worker would only slow the drawing down
+    if (os.cpu_count() or 1) > 1:
+        prefetch = EVOLUTION_PREFETCH
+    else:
+        prefetch = 0
+        vprint("Single CPU: the generations are not computed in a worker process")
+    generations = cache.generations(poly, a.chaikin_generations, a, prefetch)
+    for i, poly in enumerate(generations):
         print(f"Generation: [{i}/{a.chaikin_generations}]")
         # get values
         alpha_poly_dd = renderer.get_polyhedron_draw_data(
@@ -176,8 +201,6 @@ def draw_chaikin_evolution(renderer: Renderer, poly: Polyhedron, a: A) -> None:
                 renderer.add_to_subplot(gconn_dd)
         # go to next plot
         renderer.next_subplot()
-        # Chaikin
-        poly = poly.Chaikin3D(a)
 
     return renderer.draw_subplots()
 
@@ -3,14 +3,25 @@ from __future__ import annotations
 import node as N
 import edge as E
 import matrix
+import chaikin_kernel
 import numpy as np
 import sys, time
 from chaikin_groups import Group
 from dataholders import VirtualDict, VirtualSet
+from halfedge import HalfEdgeMesh, index_dtype
+from provenance import Provenance
+from triangles import enumerate_triangles, triangulate_faces
+from wavefront_writer import write_wavefront
 from copy import deepcopy
 
 matrix.EPSILON = 10e-6
 VERBOSE_STEP = 100
+# memory model of 'Polyhedron.memory_plan' (bytes per half-edge, measured with
+# tracemalloc): Node/Edge/Group object graph, temporaries of a numpy Chaikin
+# generation, and renderer draw data
+GRAPH_BYTES_PER_HALF_EDGE = 600
+KERNEL_BYTES_PER_HALF_EDGE = 56
+RENDER_BYTES_PER_HALF_EDGE = 300
 
 
 class Polyhedron:
@@ -18,72 +29,273 @@ class Polyhedron:
     A Polyhedron, or mesh / 3D polygon is a set of nodes and vertices that form
     a 3D shape.
 
+    A Polyhedron is a thin facade over two representations of the same mesh:
+    a compact HalfEdgeMesh ('mesh') and the Node/Edge/Group object graph
+    ('nodes' and 'groups'). Either one can be given, the other one is built on
+    demand. Polyhedrons read from files are backed by a HalfEdgeMesh, so that the
+    object graph is only built when an algorithm or a renderer needs it.
+
+    The 'provenance' index tells which vertex/edge of the previous generations
+    every vertex comes from (see 'Provenance').
+
     """
 
     def __init__(
         self,
-        nodes: list[N.Node],
+        nodes: list[N.Node] = None,
         groups: VirtualSet = None,
         initial_mesh: bool = True,
         verbose=False,
+        mesh: HalfEdgeMesh = None,
+        provenance: Provenance = None,
     ):
-        self.nodes = nodes
-        self.groups = groups
-        self.size = len(groups)
+        assert (
+            nodes is not None and groups is not None
+        ) or mesh is not None, "A Polyhedron needs nodes and groups, or a mesh"
+        self._nodes = nodes
+        self._groups = groups
+        self._mesh = mesh
+        self.provenance = Provenance() if provenance is None else provenance
+        self._edge_index: tuple[np.ndarray, np.ndarray] = None
+        self._triangle_index: dict[str, np.ndarray] = None
+        self._face_triangles: np.ndarray = None
         self.initial_mesh = initial_mesh
         self.verbose = verbose
         self.vprint = print if verbose else lambda *args, **kwargs: None
 
-        for i, group in enumerate(self.groups):
-            if self.verbose and i % 100 == 0:
-                self.vprint(f"pre-calculted triangles from [{i}/{self.size}] group")
-            group.calc_triangles()
+    @property
+    def nodes(self) -> list[N.Node]:
+        if self._nodes is None:
+            self._build_object_graph()
+        return self._nodes
+
+    @property
+    def groups(self) -> VirtualSet:
+        if self._groups is None:
+            self._build_object_graph()
+        return self._groups
+
+    @property
+    def mesh(self) -> HalfEdgeMesh:
+        if self._mesh is None:
+            self._mesh = self._build_mesh()
+        return self._mesh
+
+    @property
+    def generation(self) -> int:
+        return self.provenance.generation
+
+    @property
+    def size(self) -> int:
+        return self._mesh.num_faces if self._groups is None else len(self._groups)
+
+    @property
+    def has_object_graph(self) -> bool:
+        return self._groups is not None
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Estimated number of bytes held by this polyhedron: the arrays of the
+        mesh and of the provenance, and the object graph if it is built (see
+        'GRAPH_BYTES_PER_HALF_EDGE').
+
+        """
+
+        nbytes = self.provenance.nbytes
+        if self._mesh is not None:
+            nbytes += self._mesh.nbytes
+        if self._groups is not None:
+            num_half_edges = sum(group.size for group in self._groups)
+            nbytes += GRAPH_BYTES_PER_HALF_EDGE * num_half_edges
+        return nbytes
+
+    def _build_object_graph(self) -> None:
+        """
+        Build the Node/Edge/Group object graph from the HalfEdgeMesh.
+
+        """
+
+        mesh = self._mesh
+        # build nodes
+        nodes: list[N.Node] = N.Node.from_points(mesh.vertices)
+        generation = self.generation
+        for node in nodes:
+            node.generation = generation
+        groups: VirtualSet = VirtualSet()
+        to_connect = []
+        # type of the edges of the faces (the graphical edges of a Chaikin3D
+        # generation stay graphical)
+        he_type = None
+        if not mesh.edge_main.all():
+            he_type = np.where(mesh.edge_main, "main", "graphical")[mesh.he_edge]
+        # connect using the faces
+        num_faces = mesh.num_faces
+        for i, face in enumerate(mesh.iter_faces()):
+            if self.verbose and i % 500 == 0:
+                print(f"Built [{i}/{num_faces}] groups from the mesh")
+            # get the corresponding (ordered) group
+            group = Group([nodes[index] for index in face])
+            # connect the main edges (circular edge)
+            if he_type is None:
+                group.cycle_connect("main")
+            else:
+                types = he_type[mesh.face_offsets[i] : mesh.face_offsets[i + 1]]
+                for j, type_ in enumerate(types):
+                    nodes[face[j]].connect(nodes[face[(j + 1) % len(face)]], type_)
+            # order the group (the face is already ordered)
+            group.cycle_order()
+            # connect later
+            if group.size > 3:
+                to_connect.append(group)
+            # add group to list
+            groups.add(group, verify=False)
+
+        # connect later
+        self.vprint(f"Inter-connecting {len(to_connect)} groups from the mesh")
+        for ogroup in to_connect:
+            # connect the graphical edges
+            ogroup.inter_connect("graphical")
+
+        self._nodes = nodes
+        self._groups = groups
+
+    def _build_mesh(self) -> HalfEdgeMesh:
+        """
+        Build the HalfEdgeMesh from the Node/Edge/Group object graph.
+
+        Returns:
+            HalfEdgeMesh: Array-backed version of this polyhedron.
+
+        """
+
+        node_indices = {id(node): i for i, node in enumerate(self._nodes)}
+        faces = list()
+        for group in self._groups:
+            # boundary nodes with two main edges give two-node groups: they
+            # are kept in the object graph, but they are not faces
+            if group.size < 3:
+                continue
+            group.order()
+            faces.append([node_indices[id(node)] for node in group.ogroup])
+        vertices = np.array([node.coords for node in self._nodes], dtype=np.float64)
+        mesh = HalfEdgeMesh.from_faces(vertices, faces)
+        # the edges of the faces are not all main edges, some of them are not
+        # even connected in the object graph (see 'Chaikin3D')
+        nodes = self._nodes
+        mesh.edge_main[...] = [
+            getattr(nodes[a].neighbors.get(nodes[b].key), "type_", None) == "main"
+            for a, b in mesh.edges.tolist()
+        ]
+        return mesh
 
     def __str__(self):
         return "\n* ".join(map(str, self.nodes))
 
     def __len__(self):
-        return len(self.nodes)
+        return len(self._nodes) if self._mesh is None else self._mesh.num_vertices
 
     def __getitem__(self, index: int):
         return self.nodes[index]
 
     def __iter__(self):
-        return (tr for group in self.groups for tr in group.triangles)
+        nodes = self.nodes
+        return (
+            N.Triangle(nodes[i], nodes[j], nodes[k])
+            for i, j, k in self.face_triangles().tolist()
+        )
 
-    def _iter_triangles(self, type_: str = "any") -> VirtualSet:
-        triangle_list = list()
-        h_set = set()
-        for node in self.nodes:
-            for triangle in node.get_triangles(type_):
-                h = triangle.sim_hash
-                if h in h_set and triangle in triangle_list:
-                    continue
-                h_set.add(h)
-                yield triangle
-                triangle_list.append(triangle)
-        self.vprint("num triangles (" + str(type_) + ")", len(triangle_list))
-        return triangle_list
+    def face_triangles(self) -> np.ndarray:
+        """
+        Returns the triangulation of the faces, as node indices.
+
+        The triangulation is only computed (and cached) when it is needed, in
+        one vectorized step from the ordered faces (see 'triangulate_faces').
+
+        Returns:
+            np.ndarray: (T, 3) node indices of the triangles.
+
+        """
+
+        if self._face_triangles is None:
+            mesh = self.mesh
+            self._face_triangles = triangulate_faces(mesh.he_vertex, mesh.face_offsets)
+        return self._face_triangles
+
+    def triangles(self, type_: str = "any") -> np.ndarray:
+        """
+        Returns the triangles of the polyhedron, as node indices.
+
+        The triangles of all the edge types are enumerated in one pass over the
+        edges of the object graph (see 'edge_index' and 'enumerate_triangles')
+        and cached.
+
+        Args:
+            type_ (str): Type of the edges ("main", "graphical", "any").
+
+        Returns:
+            np.ndarray:
+                (T, 3) sorted node indices (i < j < k) of the triangles made of
+                edges with type 'type_', in lexicographic order.
+
+        """
+
+        if self._triangle_index is None:
+            edges, main = self.edge_index()
+            self._triangle_index = enumerate_triangles(edges, main, len(self.nodes))
+        return self._triangle_index[type_]
+
+    def edge_index(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the edges of the polyhedron, as node indices.
+
+        The edges of all the types are listed in one pass over the object graph
+        and cached: the edges of one type are selected with the 'main' mask.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]:
+                (E, 2) node indices (A, B) of the edges, in the order of
+                'get_edges', and (E,) whether the edge is a main edge.
+
+        """
+
+        if self._edge_index is None:
+            node_indices = {node.key: i for i, node in enumerate(self.nodes)}
+            edges = list(self.get_edges("any"))
+            self._edge_index = (
+                np.array(
+                    [
+                        (node_indices[edge.A.key], node_indices[edge.B.key])
+                        for edge in edges
+                    ],
+                    dtype=np.int64,
+                ).reshape(-1, 2),
+                np.array([edge.type_ == "main" for edge in edges], dtype=bool),
+            )
+        return self._edge_index
 
     def _set_recursion_limit(self):
         sys.setrecursionlimit(10 ** 6)
 
-    def save(self, stream: _io.TextIOWrapper) -> None:
-        stream.write(
-            "# Mesh file generated by https://github.com/Nicolas-Reyland/Chaikin3D\n"
-        )
+    def save(self, stream: _io.TextIOWrapper, precision: int | None = None) -> None:
+        """
+        Write the polyhedron to a stream, in the WaveFront (.obj) format.
 
-        # write vertex positions
-        stream.write("\n")
-        for node in self.nodes:
-            x, y, z = node.coords_list
-            stream.write(f"v {x} {y} {z}\n")
+        The file is written from the HalfEdgeMesh (built from the object graph
+        if needed, see '_build_mesh'), like the files of 'mesh_writers': all
+        the formats hold the same (ordered) faces, whatever the kernel is.
+
+        Args:
+            stream    (_io.TextIOWrapper): Output stream.
+            precision (int | None)       :
+                Number of significant digits of the coordinates (None: exact).
 
-        # write faces
-        stream.write("\n")
-        for group in self.groups:
-            node_indices = map(lambda n: str(self.nodes.index(n) + 1), group.nodes)
-            stream.write("f " + " ".join(node_indices) + "\n")
+        """
+
+        mesh = self.mesh
+        write_wavefront(
+            stream, mesh.vertices, mesh.he_vertex, mesh.face_offsets, precision
+        )
 
     def get_edges(self, type_: str = "any") -> Iterable[E.Edge]:
         """
@@ -132,40 +344,29 @@ class Polyhedron:
 
         """
 
-        # build nodes
-        nodes: list[N.Node] = list(map(N.Node.from_point, vertex_list))
-        groups: VirtualSet = VirtualSet()
-        to_connect = []
-        # connect using the index list
-        vertex_index_list_length = len(vertex_index_list)
-        for i in range(vertex_index_list_length):
-            if verbose and i % 500 == 0:
-                print(
-                    f"Read and processed [{i}/{vertex_index_list_length}] from input file"
-                )
-            # get the indices
-            node_groupe_index_list = vertex_index_list[i]
-            # get the corresponding (ordered) group
-            group = Group([nodes[index] for index in node_groupe_index_list])
-            # connect the main edges (circular edge)
-            group.cycle_connect("main")
-            # order the group (should already be orderer tho -> else the cycle edge would fuck everything up)
-            group.order()
-            # connect later
-            if group.size > 3:
-                to_connect.append(group)
-            # add group to list
-            groups.add(group)
-
-        # connect later
         if verbose:
-            print(f"Inter-connecting {len(to_connect)} groups from input file")
-        for ogroup in to_connect:
-            # connect the graphical edges
-            ogroup.inter_connect("graphical")
+            print(f"Building the mesh from {len(vertex_index_list)} faces")
+        mesh = HalfEdgeMesh.from_faces(vertex_list, vertex_index_list)
+        return Polyhedron(initial_mesh=True, verbose=verbose, mesh=mesh)
+
+    @staticmethod
+    def from_mesh(
+        mesh: HalfEdgeMesh, initial_mesh: bool = True, verbose: bool = False
+    ) -> Polyhedron:
+        """
+        Returns a Polyhedron instance backed by the given HalfEdgeMesh.
+
+        Args:
+            mesh         (HalfEdgeMesh): Mesh.
+            initial_mesh (bool)        : The mesh was not generated by Chaikin3D.
+            verbose      (bool)        : Verbose.
+
+        Returns:
+            Polyhedron: Polyhedron facade for the mesh.
+
+        """
 
-        # return polyhedron
-        return Polyhedron(nodes, groups, initial_mesh=True, verbose=verbose)
+        return Polyhedron(initial_mesh=initial_mesh, verbose=verbose, mesh=mesh)
 
     def Chaikin3D(self, a: A) -> Polyhedron:
         """
@@ -181,6 +382,9 @@ class Polyhedron:
 
         """
 
+        if a.chaikin_kernel == "numpy":
+            return self._chaikin3d_numpy(a)
+
         vvprint = (
             (lambda *a, **k: print(*a, **k))
             if a.verbosity == 2
@@ -188,6 +392,10 @@ class Polyhedron:
         )
         # change recursion limit
         self._set_recursion_limit()
+        # the split re-wires the edges of the object graph: build the mesh
+        # first, so that this polyhedron stays usable afterwards
+        if self._mesh is None:
+            self._mesh = self._build_mesh()
         t1 = time.perf_counter()
         # init
         base_ratio = (a.chaikin_coef - 1) / a.chaikin_coef
@@ -209,6 +417,21 @@ class Polyhedron:
         # set of groups all the groups, one group per 'old' node
         final_group_set: VirtualSet = VirtualSet()
 
+        # sub-node created on each (old node, old partner node) main edge
+        edge_sub_nodes: dict[tuple[int, int], N.Node] = dict()
+
+        # provenance of the new nodes (split node & cut edge in the mesh)
+        generation = self.generation
+        parent_vertex: list[int] = list()
+        parent_edge: list[int] = list()
+        mesh_edges = self._mesh.edges
+        edge_ids = dict(
+            zip(
+                zip(mesh_edges.min(axis=1).tolist(), mesh_edges.max(axis=1).tolist()),
+                range(len(mesh_edges)),
+            )
+        )
+
         # First, order all the edge-lists in the nodes
         if a.order_edges == "all" or (a.order_edges == "first" and self.initial_mesh):
             self.vprint("Ordering the edge-lists")
@@ -219,6 +442,19 @@ class Polyhedron:
 
         # count of the nodes
         total_nodes = len(self.nodes)
+        # one sub-node per main edge of each node, sharing one buffer
+        sub_nodes: list[N.Node] = N.Node.from_points(
+            np.empty(
+                (
+                    sum(
+                        edge.type_ == "main"
+                        for node in self.nodes
+                        for edge in node.edge_list
+                    ),
+                    3,
+                )
+            )
+        )
         # new nodes & groups
         self.vprint(f"Calculating new node positions for {total_nodes} verticies")
         for node_index, current_node in enumerate(self.nodes):
@@ -241,17 +477,34 @@ class Polyhedron:
                     )
                     # get the right coefficient
                     if (
-                        partner_node not in self.nodes
+                        partner_node.generation > generation
                     ):  # partner is one of the new nodes (already has been truncated once)
                         ratio = special_ratio
+                        partner_index = parent_vertex[partner_node.index]
                     else:
                         ratio = base_ratio
+                        partner_index = partner_node.index
                     # new vector
                     v: list[float] = u * ratio
                     w = partner_node.coords + v
 
                     # create new Node
-                    sub_node = N.Node.from_point(w)
+                    sub_node = sub_nodes[len(parent_vertex)]
+                    sub_node.coords = w
+                    sub_node.index = len(parent_vertex)
+                    sub_node.generation = generation + 1
+                    edge_sub_nodes.setdefault((node_index, partner_index), sub_node)
+                    parent_vertex.append(node_index)
+                    # (-1: main edge of a twisted group, missing in the mesh)
+                    parent_edge.append(
+                        edge_ids.get(
+                            (
+                                min(node_index, partner_index),
+                                max(node_index, partner_index),
+                            ),
+                            -1,
+                        )
+                    )
 
                     # not creating a new Edge, because modifying the old one is really easier
                     # re-connect edge to new node & vice-versa
@@ -269,8 +522,10 @@ class Polyhedron:
             group = Group(group_set)
             # connect main edges, in a cycle-like order
             group.cycle_connect("main")
+            # the sub-nodes were created in cycle order
+            group.cycle_order()
             # connect graphical together
-            group.inter_connect("graphical", order_first=True)
+            group.inter_connect("graphical")
             # add it to the set
             final_group_set.add(group)
 
@@ -280,6 +535,14 @@ class Polyhedron:
             # add new node to new nodes list
             new_node_list.extend(group.nodes)
 
+        # the groups can re-order their nodes: index the new nodes by their
+        # position in the new node list
+        creation_index = [node.index for node in new_node_list]
+        parent_vertex = [parent_vertex[index] for index in creation_index]
+        parent_edge = [parent_edge[index] for index in creation_index]
+        for index, node in enumerate(new_node_list):
+            node.index = index
+
         # Now, the variable 'final_group_set' holds 'total_nodes' group objects.
         # Every node of the given Polyhedron has exactly one corresponding group
         # This group is already inter-connected, and ordered
@@ -291,44 +554,43 @@ class Polyhedron:
         # surfaces to be drawn.
 
         # To re-construct the old surfaces, we need to find the new nodes that
-        # are connected to these. The thing is, we can try and find them using
-        # vector-space mathematics or with plane point-on-plane calculations, but
-        # a more algorithmic solution is more elegant and would eradicate the
-        # errors that come with floating-point number precisions etc.
+        # are connected to these. The split recorded the sub-node created on
+        # each main edge, so this is a lookup, not a geometric search.
 
         # Methodology:
         # Foreach group of old_groups :
-        # 	Foreach couple of nodes in this group :
-        # 		search their equivalent new nodes :
-        # 			- based on distance :
-        # 				The two new nodes that should be connected are the ones that are the closest to
-        # 				the 'other' old node. Illustration :
-        # 					------C---------------------------G----H--
-        # 					------------------------------------------
-        # 					-----oA--B---------------------F---oE---I-
-        # 					-D-------------------------------K--------
-        # 	 				--------------------------------------J---
-        # 				old nodes : oA and oE (old A & old E)
-        # 				new nodes that should be chosen for edge: B & F
-        # 					because :
-        # 						eucl_dist(B, oE) < eucl_dist(*\ {B} U nE, oE) (w/ nE = new nodes, sourcing from oE)
-        # 						 <=> eucl_dist(B, oE) < eucl_dist(C, oE) and eucl_dist(B, oE) < eucl_dist(D, oE)
-        # 						eucl_dist(F, oE) < eucl_dist(*\ {F} U nA, oE) (w/ nA = new nodes, sourcing from oA)
-        # 						 <=> eucl_dist(F, oE) < eucl_dist(K, oE) and eucl_dist(F, oE) < eucl_dist(I, oE) and ...
-
-        # TODO: UPDATE THIS LIST OF VARS
-        # List of the existing variables that are used to reconnect the surfaces :
-        # - final_group_set: (explained earlier)
-        # - old_groups: groups of the Polyhedron we are trying to approximate using this algorithm
-        # List of the non-existing variables that are being built/extended/used to reconnect the surfaces :
-        # - final_group_set: the surface groups are going to be added to this set
-        # - group_objects: list of all the surface-groups. only used to connect the groups
-        # - total_old_groups: number of old groups
+        # 	Foreach couple of nodes (oA, oE) in this group :
+        # 		take the sub-node of oA on the edge (oA, oE), then the sub-node
+        # 		of oE on the edge (oE, oA). Illustration :
+        # 			------C---------------------------G----H--
+        # 			------------------------------------------
+        # 			-----oA--B---------------------F---oE---I-
+        # 			-D-------------------------------K--------
+        # 			--------------------------------------J---
+        # 		old nodes : oA and oE (old A & old E)
+        # 		new nodes that should be chosen for edge: B & F
+        #
+        # If a group is twisted (its main edges don't follow its order), there
+        # is no main edge between two consecutive nodes: in this case only, the
+        # sub-node that is the closest to the other old node is chosen.
+
+        def closest_sub_node(old_node: N.Node, other_old_node: N.Node) -> N.Node:
+            # sub-node of 'old_node' that is the closest to 'other_old_node'
+            sub_nodes = list(node_virt_dict[old_node])
+            assert sub_nodes, "No sub-node found (empty group)"
+            distances = [
+                np.linalg.norm(sub_node.coords - other_old_node.coords)
+                for sub_node in sub_nodes
+            ]
+            return sub_nodes[int(np.argmin(distances))]
 
         # set of new (ordered) groups, one per surface
         new_group_set: VirtualSet[Group] = VirtualSet()
         # one new group per old group (talking about old-surface-groups !)
         for old_group in old_groups:
+            # two-node groups are not surfaces (see '_build_mesh')
+            if old_group.size < 3:
+                continue
             # an old_group should be ordered, but let's make sure of it
             # if the group is already ordered, it will instantly return anyway
             old_group.order()
@@ -337,46 +599,19 @@ class Polyhedron:
             # iterate over the nodes
             # we start at 1 bc we do them in pairs and we don't want
             # a node to be in 2 pairs (first and last one for example)
-            for i in range(old_group.size):
+            # (a face can go twice through the same node: the ordered group
+            # is longer than the group)
+            for i in range(len(old_group.ogroup)):
                 # get two nodes in group that 'follow' each other
                 current_old_node = old_group.ogroup[i - 1]
                 partner_old_node = old_group.ogroup[i]
-                # get corresponding new node lists (one old node has multiple new nodes -> thx Chaikin)
-                # 'current_old_node' corresponding new nodes
-                current_old_node_corresp_new_nodes = node_virt_dict[current_old_node]
-                partner_old_node_corresp_new_nodes = node_virt_dict[partner_old_node]
-                # find the two nodes that are the closest to the 'other' old node
-                # for the 'current_old_node_corresp_new_nodes' :
-                min_dist_to_other_node: float = np.inf
-                closest_new_node_1: N.Node = None
-                for new_node in current_old_node_corresp_new_nodes:
-                    # calculate distance to partner_old_node (this new node is sourcing from current_old_node)
-                    # dist(a - b) == dist(b - a)
-                    dist_to_other_node: float = np.linalg.norm(
-                        new_node.coords - partner_old_node.coords
-                    )
-                    # new node is closer than previously found nodes
-                    if dist_to_other_node < min_dist_to_other_node:
-                        # update distance
-                        min_dist_to_other_node = dist_to_other_node
-                        # update closest node
-                        closest_new_node_1 = new_node
-                # for the 'current_old_node_corresp_new_nodes' :
-                min_dist_to_other_node: float = np.inf
-                closest_new_node_2: N.Node = None
-                for new_node in partner_old_node_corresp_new_nodes:
-                    # calculate distance to current_old_node (this new node is sourcing from partner_old_node)
-                    dist_to_other_node: float = np.linalg.norm(
-                        new_node.coords - current_old_node.coords
-                    )
-                    # new node is closer than previously found nodes
-                    if dist_to_other_node < min_dist_to_other_node:
-                        # update distance
-                        min_dist_to_other_node = dist_to_other_node
-                        # update closest node
-                        closest_new_node_2 = new_node
-                # assert that nodes were found (no empty group)
-                assert closest_new_node_1 and closest_new_node_2
+                # get the sub-nodes created on the edge (one per old node)
+                closest_new_node_1 = edge_sub_nodes.get(
+                    (current_old_node.index, partner_old_node.index)
+                ) or closest_sub_node(current_old_node, partner_old_node)
+                closest_new_node_2 = edge_sub_nodes.get(
+                    (partner_old_node.index, current_old_node.index)
+                ) or closest_sub_node(partner_old_node, current_old_node)
 
                 # add 'closest_new_node_1' & 'closest_new_node_1' to the new group node list
                 new_group_node_list.append(closest_new_node_1)
@@ -402,14 +637,269 @@ class Polyhedron:
         # Merge groups together
         final_group_set |= new_group_set
 
+        # the object graph of this polyhedron has been consumed by the split
+        self._nodes = self._groups = None
+        self._edge_index = self._triangle_index = None
+
         # return the final polyhedron
         self.vprint(
             f"Chaikin 3D iteration finished {num_new_groups} nodes in {time.perf_counter() - t1:.3} sec"
         )
         return Polyhedron(
-            new_node_list, final_group_set, initial_mesh=False, verbose=self.verbose
+            new_node_list,
+            final_group_set,
+            initial_mesh=False,
+            verbose=self.verbose,
+            provenance=self.provenance.split(parent_vertex, parent_edge),
+        )
+
+    def _chaikin3d_numpy(self, a: A) -> Polyhedron:
+        """
+        Apply the Chaikin3D Algorithm with the vectorized kernel.
+
+        All the cut points of the generation are computed in one NumPy pass over
+        the edge array (split between 'a.workers' processes), and the new mesh
+        is built in bulk (see 'chaikin_kernel'). This polyhedron is left
+        untouched.
+
+        Args:
+            a (A): Arguments passed to the program (class holder).
+
+        Returns:
+            Polyhedron: Polyhedron which was generated by this algorithm.
+
+        """
+
+        t1 = time.perf_counter()
+        rotation = a.order_edges == "all" or (
+            a.order_edges == "first" and self.initial_mesh
+        )
+        mesh, (parent_vertex,), (parent_edge,) = chaikin_kernel.chaikin(
+            self.mesh, a.chaikin_coef, [rotation], a.workers
+        )
+        self.vprint(
+            f"Chaikin 3D iteration finished {mesh.num_faces} groups in {time.perf_counter() - t1:.3} sec"
+        )
+        return Polyhedron(
+            initial_mesh=False,
+            verbose=self.verbose,
+            mesh=mesh,
+            provenance=self.provenance.split(parent_vertex, parent_edge),
+        )
+
+    def chaikin(
+        self, generations: int, a: A, checkpoint: Checkpoint = None
+    ) -> Polyhedron:
+        """
+        Apply several generations of the Chaikin3D Algorithm to this polyhedron.
+
+        With the "numpy" kernel, all the generations are fused: they run on the
+        arrays of the meshes only, alternating between two preallocated buffers
+        (see 'chaikin_kernel.chaikin'), and only the last generation is turned
+        into a Polyhedron. The work of each generation is split between
+        'a.workers' processes. With the "python" kernel, 'Chaikin3D' is called
+        'generations' times.
+
+        With a checkpoint ("numpy" kernel only, see 'checkpoint.Checkpoint'),
+        the run starts from the latest checkpointed generation, and every new
+        generation is checkpointed.
+
+        Args:
+            generations (int)       : Number of generations.
+            a           (A)         : Arguments passed to the program (class holder).
+            checkpoint  (Checkpoint): Checkpoints of the run (see 'checkpoint.Checkpoint').
+
+        Returns:
+            Polyhedron: Polyhedron of the last generation (this one if 'generations' is 0).
+
+        """
+
+        assert (
+            generations >= 0
+        ), f"Number of generations must be positive ({generations} >= 0)"
+        poly = self
+        if checkpoint is not None:
+            poly = checkpoint.resume(self, generations)
+        done = poly.generation - self.generation
+        if a.chaikin_kernel != "numpy" or generations == done:
+            for generation in range(done + 1, generations + 1):
+                self.vprint(" - 3D Chaikin -")
+                poly = poly.Chaikin3D(a)
+                self.vprint("Chaikin done")
+            return poly
+
+        t1 = time.perf_counter()
+        rotations = [
+            a.order_edges == "all"
+            or (a.order_edges == "first" and poly.initial_mesh and generation == 0)
+            for generation in range(generations - done)
+        ]
+        provenance = poly.provenance
+
+        def on_generation(
+            mesh: HalfEdgeMesh, parent_vertex: np.ndarray, parent_edge: np.ndarray
+        ) -> None:
+            nonlocal provenance
+            provenance = provenance.split(parent_vertex, parent_edge)
+            if checkpoint is not None:
+                generation = provenance.generation - self.generation
+                checkpoint.save(generation, mesh, provenance)
+
+        mesh, _, _ = chaikin_kernel.chaikin(
+            poly.mesh, a.chaikin_coef, rotations, a.workers, on_generation
+        )
+        self.vprint(
+            f"Chaikin 3D: {generations - done} generations finished {mesh.num_faces} groups in {time.perf_counter() - t1:.3} sec"
+        )
+        return Polyhedron(
+            initial_mesh=False,
+            verbose=self.verbose,
+            mesh=mesh,
+            provenance=provenance,
+        )
+
+    def plan(self, generations: int, a: A, render: bool = True) -> list[dict[str, int]]:
+        """
+        Predict the size of the next Chaikin3D generations of this polyhedron.
+
+        The counts only depend on the topology, and are exact for both kernels
+        (see 'chaikin_kernel.predict_counts'): every generation has V' = 2M
+        vertices and M' = 3M main edges, M being the number of main edges, and
+        F' = F + V faces (the faces double in size and every vertex gives a new
+        face), a bit less on open meshes. The graphical edges are not counted.
+        The face triangulations have H - 2F triangles, H being the number of
+        half-edges (the sum of the face sizes).
+        The memory is the estimate of 'memory_plan'. The OBJ and HTML sizes are
+        the sizes of the files written by 'save' and by the plotly renderer
+        (without the plotly.js bundle).
+
+        Args:
+            generations (int) : Number of generations.
+            a           (A)   : Arguments passed to the program (class holder).
+            render      (bool): The last generation is rendered.
+
+        Returns:
+            list[dict[str, int]]:
+                For each generation, from the current one (0) to 'generations':
+                "generation", "vertices", "main edges", "faces", "half-edges",
+                "triangles", "memory", "obj" and "html" (sizes in bytes).
+
+        """
+
+        mesh = self.mesh
+        # characters per written coordinate: the input ones, and full-precision
+        # cut points for the next generations
+        sample = mesh.edges[:1000]
+        input_chars = _mean_repr_length(mesh.vertices[np.unique(sample)])
+        cut_chars = _mean_repr_length(
+            chaikin_kernel.cut_points(mesh.vertices, sample, a.chaikin_coef)
         )
 
+        plan = list()
+        for generation, (counts, memory) in enumerate(
+            self._predict(generations, a, render)
+        ):
+            num_vertices, num_main_edges, num_faces, num_half_edges, _ = counts
+            num_triangles = num_half_edges - 2 * num_faces
+            chars = cut_chars if generation or not self.initial_mesh else input_chars
+            digits = _mean_digits(num_vertices)
+            obj = (
+                70  # header
+                + num_vertices * (2 + 3 * (chars + 1))
+                + num_faces * 2
+                + num_half_edges * (digits + 1)
+                + 2
+            )
+            # x, y, z / i, j, k arrays of the polygons, and (A, B, NaN) x, y, z
+            # arrays of the main edges (base64-encoded)
+            itemsize = index_dtype(max(num_vertices, num_half_edges)).itemsize
+            html = (
+                3 * _base64_length(8 * num_vertices)
+                + 3 * _base64_length(itemsize * num_triangles)
+                + 3 * _base64_length(8 * 3 * num_main_edges)
+            )
+            plan.append(
+                {
+                    "generation": generation,
+                    "vertices": num_vertices,
+                    "main edges": num_main_edges,
+                    "faces": num_faces,
+                    "half-edges": num_half_edges,
+                    "triangles": num_triangles,
+                    "memory": memory,
+                    "obj": obj,
+                    "html": html,
+                }
+            )
+        return plan
+
+    def memory_plan(self, generations: int, a: A, render: bool = True) -> list[int]:
+        """
+        Estimate the memory of the next Chaikin3D generations of this polyhedron.
+
+        This is the "memory" of 'plan', without the file sizes (only the counts
+        of the mesh are read). The memory is the estimated peak of the run up to
+        the generation, for the chosen kernel: the arrays of the meshes and the
+        object graphs (see the '*_BYTES_PER_HALF_EDGE' constants), plus the
+        object graph and the draw data of the last generation if it is
+        rendered. The meshes are counted with one edge per half-edge (the upper
+        bound of their edges, see 'chaikin_kernel.predict_counts').
+
+        Args:
+            generations (int) : Number of generations.
+            a           (A)   : Arguments passed to the program (class holder).
+            render      (bool): The last generation is rendered.
+
+        Returns:
+            list[int]:
+                Estimated memory (bytes) of each generation, from the current
+                one (0) to 'generations'.
+
+        """
+
+        return [memory for _, memory in self._predict(generations, a, render)]
+
+    def _predict(
+        self, generations: int, a: A, render: bool
+    ) -> list[tuple[tuple[int, int, int, int, int], int]]:
+        # counts (see 'chaikin_kernel.mesh_counts') and memory of each generation
+        assert (
+            generations >= 0
+        ), f"Number of generations must be positive ({generations} >= 0)"
+        counts = chaikin_kernel.mesh_counts(self.mesh)
+        previous = None
+        peak = 0
+        predictions = list()
+        for generation in range(generations + 1):
+            if generation:
+                counts = chaikin_kernel.predict_counts(*counts)
+            num_vertices, _, num_faces, num_half_edges, _ = counts
+            graph = GRAPH_BYTES_PER_HALF_EDGE * num_half_edges
+            arrays = _mesh_bytes(
+                num_vertices, num_half_edges, num_faces, num_half_edges
+            )
+            if a.chaikin_kernel == "numpy":
+                # two meshes and the temporaries while computing, the object
+                # graph of the last generation for the renderers
+                step = arrays + KERNEL_BYTES_PER_HALF_EDGE * num_half_edges
+                if previous is not None:
+                    step += previous[0]
+                peak = max(peak, step)
+                memory = max(peak, arrays + graph) if render else peak
+            else:
+                # the previous object graph is alive while the new one is built
+                # (with its temporary dicts)
+                step = graph + arrays
+                if previous is not None:
+                    step += graph // 2 + GRAPH_BYTES_PER_HALF_EDGE * previous[1]
+                peak = max(peak, step)
+                memory = peak
+            if render:
+                memory += RENDER_BYTES_PER_HALF_EDGE * num_half_edges
+            predictions.append((counts, memory))
+            previous = (arrays, num_half_edges)
+        return predictions
+
     @staticmethod
     def _nec_group_cond(group):
         assert type(group) == VirtualSet
@@ -502,3 +992,84 @@ class Polyhedron:
 
 
 #
+
+
+def _mesh_bytes(
+    num_vertices: int, num_edges: int, num_faces: int, num_half_edges: int
+) -> int:
+    """
+    Returns the number of bytes of the arrays of a HalfEdgeMesh (see 'HalfEdgeMesh.nbytes').
+
+    Args:
+        num_vertices   (int): Number of vertices.
+        num_edges      (int): Number of edges.
+        num_faces      (int): Number of faces.
+        num_half_edges (int): Number of half-edges.
+
+    Returns:
+        int: Number of bytes.
+
+    """
+
+    itemsize = index_dtype(max(num_vertices, num_half_edges)).itemsize
+    return (
+        num_vertices * 3 * 8
+        + (num_faces + 1) * 8
+        + (5 * num_half_edges + 2 * num_edges) * itemsize
+    )
+
+
+def _base64_length(num_bytes: int) -> int:
+    """
+    Returns the length of the base64 encoding of binary data.
+
+    Args:
+        num_bytes (int): Number of bytes of the data.
+
+    Returns:
+        int: Number of characters.
+
+    """
+
+    return -(-num_bytes // 3) * 4
+
+
+def _mean_digits(number: int) -> float:
+    """
+    Returns the mean number of digits of the integers from 1 to 'number'.
+
+    Args:
+        number (int): Last integer.
+
+    Returns:
+        float: Mean number of digits.
+
+    """
+
+    if number < 1:
+        return 1.0
+    total = 0
+    low = 1
+    while low <= number:
+        high = min(low * 10 - 1, number)
+        total += (high - low + 1) * len(str(low))
+        low *= 10
+    return total / number
+
+
+def _mean_repr_length(values: np.ndarray) -> float:
+    """
+    Returns the mean length of the text representation of floats.
+
+    Args:
+        values (np.ndarray): Values.
+
+    Returns:
+        float: Mean number of characters.
+
+    """
+
+    values = np.asarray(values, dtype=np.float64).ravel().tolist()
+    if not values:
+        return 1.0
+    return sum(map(len, map(str, values))) / len(values)
@@ -0,0 +1,109 @@
+# Chaikin3D - Provenance module
+from __future__ import annotations
+from halfedge import index_dtype
+import numpy as np
+
+
+class Provenance:
+    """
+    Provenance index of the vertices of a Chaikin3D generation.
+
+    Every Chaikin3D generation splits each vertex of the previous generation
+    into one new vertex per (main) edge. For the generation 'g' (g > 0), the
+    vertex 'v' was created by splitting the vertex 'parent_vertices[g - 1][v]'
+    of the generation 'g - 1', along its edge 'parent_edges[g - 1][v]' (index
+    in the 'edges' array of the mesh of generation 'g - 1').
+
+    The arrays of the previous generations are shared (not copied) between the
+    Provenance instances of successive generations.
+
+    """
+
+    def __init__(
+        self,
+        parent_vertices: list[np.ndarray] = None,
+        parent_edges: list[np.ndarray] = None,
+    ):
+        self.parent_vertices: list[np.ndarray] = parent_vertices or list()
+        self.parent_edges: list[np.ndarray] = parent_edges or list()
+        assert len(self.parent_vertices) == len(self.parent_edges)
+
+    def __str__(self) -> str:
+        return f"Provenance(generation={self.generation})"
+
+    def __repr__(self) -> str:
+        return str(self)
+
+    @property
+    def generation(self) -> int:
+        return len(self.parent_vertices)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in self.parent_vertices + self.parent_edges)
+
+    def split(self, parent_vertex: np.ndarray, parent_edge: np.ndarray) -> Provenance:
+        """
+        Returns the Provenance of the next generation.
+
+        Args:
+            parent_vertex (np.ndarray): Split vertex of each new vertex.
+            parent_edge   (np.ndarray): Cut edge of each new vertex.
+
+        Returns:
+            Provenance: Provenance of the next generation.
+
+        """
+
+        assert len(parent_vertex) == len(parent_edge)
+        dtype = index_dtype(len(parent_vertex))
+        return Provenance(
+            self.parent_vertices + [np.asarray(parent_vertex, dtype=dtype)],
+            self.parent_edges + [np.asarray(parent_edge, dtype=dtype)],
+        )
+
+    def origin(self, vertices: np.ndarray = None, generation: int = 0) -> np.ndarray:
+        """
+        Trace vertices of the last generation back to an older generation.
+
+        Args:
+            vertices   (np.ndarray): Vertices of the last generation (all if None).
+            generation (int)       : Generation to go back to (input mesh: 0).
+
+        Returns:
+            np.ndarray: Ancestor of each vertex in the given generation.
+
+        """
+
+        assert 0 <= generation <= self.generation
+        if vertices is None:
+            if generation == self.generation:
+                raise ValueError("Unknown number of vertices in the last generation")
+            vertices = np.arange(len(self.parent_vertices[-1]))
+        vertices = np.asarray(vertices)
+        for parent_vertex in reversed(self.parent_vertices[generation:]):
+            vertices = parent_vertex[vertices]
+        return vertices
+
+    def trace(self, vertex: int) -> list[tuple[int, int]]:
+        """
+        Returns the full history of a vertex of the last generation.
+
+        Args:
+            vertex (int): Vertex of the last generation.
+
+        Returns:
+            list[tuple[int, int]]:
+                (vertex, cut edge) for each generation, from the last one to
+                generation 1, followed by (input vertex, -1).
+
+        """
+
+        history = list()
+        for parent_vertex, parent_edge in zip(
+            reversed(self.parent_vertices), reversed(self.parent_edges)
+        ):
+            history.append((vertex, int(parent_edge[vertex])))
+            vertex = int(parent_vertex[vertex])
+        history.append((vertex, -1))
+        return history
@@ -0,0 +1,136 @@
+# Chaikin3D - Triangle enumeration module
+from __future__ import annotations
+from functools import lru_cache
+import numpy as np
+
+
+def enumerate_triangles(
+    edges: np.ndarray, main: np.ndarray, num_vertices: int
+) -> dict[str, np.ndarray]:
+    """
+    Enumerate all the triangles (3-cliques) of a graph in one pass.
+
+    The edges are oriented from the lower to the higher vertex index. For
+    every edge (u, v), the candidates w are the higher neighbours of v, and
+    (u, w) is looked up in the sorted edge keys. Each triangle is found exactly
+    once, as its canonical (u < v < w) vertex triple, and the triangles come
+    out in lexicographic order.
+
+    A triangle is "main" (resp. "graphical") if its three edges are main
+    (resp. graphical) edges, like in 'Node.get_triangles'.
+
+    Args:
+        edges        (np.ndarray): (E, 2) vertex indices of the (unique) edges.
+        main         (np.ndarray): (E,) the edge is a main edge.
+        num_vertices (int)       : Number of vertices.
+
+    Returns:
+        dict[str, np.ndarray]:
+            (T, 3) canonical vertex triples for each edge type ("main",
+            "graphical" and "any").
+
+    """
+
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    main = np.asarray(main, dtype=bool)
+    assert len(edges) == len(main), "One type per edge"
+    # sorted edge keys (low * V + high)
+    low = edges.min(axis=1)
+    high = edges.max(axis=1)
+    keys = low * num_vertices + high
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    low, high, main = low[order], high[order], main[order]
+    assert not np.any(keys[1:] == keys[:-1]), "Duplicate edge"
+
+    # forward adjacency (CSR): the higher neighbours of every vertex, sorted
+    offsets = np.zeros(num_vertices + 1, dtype=np.int64)
+    np.cumsum(np.bincount(low, minlength=num_vertices), out=offsets[1:])
+
+    # candidates (u, v, w) for every edge (u, v) and every w in fwd(v)
+    counts = offsets[high + 1] - offsets[high]
+    uv = np.repeat(np.arange(len(keys)), counts)
+    starts = np.cumsum(counts) - counts
+    vw = offsets[high[uv]] + np.arange(len(uv)) - np.repeat(starts, counts)
+    u = low[uv]
+    w = high[vw]
+    # keep the candidates for which (u, w) is an edge too
+    uw_keys = u * num_vertices + w
+    uw = np.minimum(np.searchsorted(keys, uw_keys), max(len(keys) - 1, 0))
+    found = keys[uw] == uw_keys if len(keys) else np.zeros(0, dtype=bool)
+    uv, vw, uw = uv[found], vw[found], uw[found]
+
+    triangles = np.stack((low[uv], high[uv], high[vw]), axis=1)
+    num_main = main[uv].astype(np.int8) + main[vw] + main[uw]
+    return {
+        "any": triangles,
+        "main": triangles[num_main == 3],
+        "graphical": triangles[num_main == 0],
+    }
+
+
+@lru_cache(maxsize=None)
+def polygon_triangulation(size: int) -> np.ndarray:
+    """
+    Triangulation of an ordered polygon, following its graphical edges.
+
+    'Group.inter_connect' connects every other node of the polygon, then every
+    fourth node, etc. (all anchored at the first node). Each of these edges
+    closes one triangle. The polygon that is left at the end (the nodes at
+    multiples of the last step) is fan-triangulated from the first node.
+
+    Args:
+        size (int): Number of nodes in the polygon.
+
+    Returns:
+        np.ndarray: (size - 2, 3) node positions in the polygon.
+
+    """
+
+    assert size > 2, f"A polygon has at least three nodes ({size})"
+    triangles = list()
+    num_iter = int(np.log2(size)) - 1
+    for x in range(num_iter):
+        step = 2 ** (x + 1)
+        half = step // 2
+        for p in range(0, size - half, step):
+            triangles.append((p, p + half, p + step if p + step < size else 0))
+    rest = list(range(0, size, 2 ** max(num_iter, 0)))
+    for i in range(1, len(rest) - 1):
+        triangles.append((rest[0], rest[i], rest[i + 1]))
+    return np.array(triangles, dtype=np.int64).reshape(-1, 3)
+
+
+def triangulate_faces(he_vertex: np.ndarray, face_offsets: np.ndarray) -> np.ndarray:
+    """
+    Triangulate all the faces of a mesh in one gather per face size.
+
+    Args:
+        he_vertex    (np.ndarray): Vertices of the faces (in face order).
+        face_offsets (np.ndarray): (F + 1,) offsets of the faces in 'he_vertex'.
+
+    Returns:
+        np.ndarray:
+            (T, 3) vertex indices of the triangles, face by face (see
+            'polygon_triangulation'). The triangles keep the winding of their
+            face.
+
+    """
+
+    face_sizes = np.diff(face_offsets)
+    triangles = list()
+    faces = list()
+    for size in np.unique(face_sizes).tolist():
+        if size < 3:
+            continue
+        face_ids = np.flatnonzero(face_sizes == size)
+        template = polygon_triangulation(size)
+        # (F_n, size) vertices -> (F_n, T_n, 3) triangles
+        vertices = he_vertex[face_offsets[face_ids, None] + np.arange(size)]
+        triangles.append(vertices[:, template].reshape(-1, 3))
+        faces.append(np.repeat(face_ids, len(template)))
+    if not triangles:
+        return np.empty((0, 3), dtype=he_vertex.dtype)
+    # back to the face order
+    order = np.argsort(np.concatenate(faces), kind="stable")
+    return np.concatenate(triangles)[order]
@@ -1,14 +1,21 @@
 #
 from __future__ import annotations
 from polyhedron import Polyhedron
+from halfedge import HalfEdgeMesh
 import numpy as np
 import os
 
+# size of the chunks read from the file (bytes)
+CHUNK_SIZE = 1 << 22
+
 
 class WaveFrontReader:
     """
     Read WaveFront a file (.obj). And parse it into a Polyhedron instance.
 
+    The faces are stored in CSR layout: the vertex indices of the face 'f' are
+    'face_indices[face_offsets[f] : face_offsets[f + 1]]'.
+
     """
 
     def __init__(
@@ -21,63 +28,85 @@ class WaveFrontReader:
         # attributes
         self.path: str = os.path.abspath(path)
         assert os.path.isfile(self.path)
-        self.vertices: list[np.array] = []
-        self.vertex_indices: list[np.array] = []
+        self.vertices: np.ndarray = np.empty((0, 3), dtype=np.float32)
+        self.face_indices: np.ndarray = np.empty(0, dtype=np.uint32)
+        self.face_offsets: np.ndarray = np.zeros(1, dtype=np.int64)
         # verbosity
         self.verbose = verbose
         # parse
         if parse_on_load:
             self.parse(rotate)
 
+    @property
+    def vertex_indices(self) -> list[np.ndarray]:
+        """Vertex indices of each face (views on 'face_indices')."""
+        return np.split(self.face_indices, self.face_offsets[1:-1])
+
     def parse(self, rotate: bool = False):
         """
         Parse the input file.
 
+        The file is read in large chunks (of whole lines). In each chunk, the
+        vertex and face lines are found and converted in bulk, with NumPy
+        operations on the raw bytes: no line is handled in Python.
+
         Args:
             rotate  (bool): Invert the y and z axes.
 
         Raises:
-            AssertionError: Invalid number of vertices in a face.
+            AssertionError: Invalid number of vertices in a face, or invalid vertex index.
 
         """
 
-        lines = open(self.path, "r").readlines()
-        vertices_str = []
-        vertex_indices_str = []
-        for line in lines:
-            # vertex line
-            if line.startswith("v "):
-                vertices_str.append(line[2:])
-            elif line.startswith("f "):
-                vertex_indices_str.append(line[2:])
-
+        vertices = list()
+        face_indices = list()
+        face_sizes = list()
+        num_vertices = 0
+        with open(self.path, "rb") as f:
+            rest = b""
+            while True:
+                data = f.read(CHUNK_SIZE)
+                chunk = rest + data
+                if data:
+                    # only whole lines (the rest goes to the next chunk)
+                    end = chunk.rfind(b"\n") + 1
+                    chunk, rest = chunk[:end], chunk[end:]
+                elif not chunk.endswith(b"\n"):
+                    chunk += b"\n"
+                if chunk:
+                    chunk_vertices, chunk_indices, chunk_sizes = _parse_chunk(
+                        chunk, num_vertices
+                    )
+                    vertices.append(chunk_vertices)
+                    face_indices.append(chunk_indices)
+                    face_sizes.append(chunk_sizes)
+                    num_vertices += len(chunk_vertices)
+                if not data:
+                    break
+
+        self.vertices = np.concatenate(vertices) if vertices else self.vertices
+        if rotate:
+            # needed, because there is some sort of rotatiton ?
+            self.vertices = self.vertices[:, [0, 2, 1]]
+        self.vertices = np.ascontiguousarray(self.vertices, dtype=np.float32)
+        sizes = np.concatenate(face_sizes) if face_sizes else np.zeros(0, np.int64)
         if self.verbose:
-            print("obj file -> num vertices:", len(vertices_str))
-            print("obj file -> num groups:", len(vertex_indices_str))
-
-        for vertex_str in vertices_str:
-            raw_vert = list(filter(None, vertex_str.split()))
-            x, y, z = raw_vert[:3]
-            raw_vert = (
-                (x, z, y) if rotate else (x, y, z)
-            )  # needed, because there is some sort of rotatiton ?
-            # assert len(raw_vert) == 3 # could be 4 bc of w ( = 1.0)
-            self.vertices.append(np.fromiter(map(float, raw_vert), dtype=np.float32))
-
-        for vertex_index_str in vertex_indices_str:
-            raw_vert_index = list(filter(None, vertex_index_str.split()))
-            vertex_list = list(
-                map(lambda s: int(s.split("/")[0]) - 1, raw_vert_index)
-            )  # - 1 because indexes are starting at 1 in .obj files
-            num_vertices = len(raw_vert_index)
-            assert (
-                num_vertices > 2
-            ), f"Number of vertices are less than two: {num_vertices} > 2"  # >= 3
-            self.vertex_indices.append(
-                np.fromiter(
-                    (vertex_list[i] for i in range(num_vertices)), dtype=np.uint16
-                )
-            )
+            print("obj file -> num vertices:", len(self.vertices))
+            print("obj file -> num groups:", len(sizes))
+        assert np.all(
+            sizes > 2
+        ), f"Number of vertices are less than two: {sizes.min(initial=3)} > 2"  # >= 3
+        self.face_offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=self.face_offsets[1:])
+        # index width: uint32, or uint64 for the huge meshes
+        self.face_indices = np.concatenate(face_indices)
+        assert len(self.face_indices) == 0 or (
+            self.face_indices.min() >= 0
+            and self.face_indices.max() < len(self.vertices)
+        ), "Face vertex index out of range"
+        self.face_indices = self.face_indices.astype(
+            np.uint32 if len(self.vertices) <= 2 ** 32 else np.uint64
+        )
 
     def to_polyhedron(self) -> Polyhedron:
         """
@@ -88,6 +117,114 @@ class WaveFrontReader:
 
         """
 
-        return Polyhedron.from_standard_vertex_lists(
-            self.vertices, self.vertex_indices, self.verbose
-        )
+        if self.verbose:
+            print(f"Building the mesh from {len(self.face_offsets) - 1} faces")
+        mesh = HalfEdgeMesh(self.vertices, self.face_indices, self.face_offsets)
+        return Polyhedron.from_mesh(mesh, verbose=self.verbose)
+
+
+def _parse_chunk(chunk: bytes, vertex_base: int) -> tuple[np.ndarray]:
+    """
+    Parse the vertex ('v') and face ('f') lines of a chunk of an OBJ file.
+
+    Only the position of the vertices (first three values) and the vertex index
+    of the face corners ('v', 'v/vt', 'v//vn' or 'v/vt/vn') are kept. Negative
+    (relative) indices are resolved.
+
+    Args:
+        chunk       (bytes): Whole lines of the file (ending with a newline).
+        vertex_base (int)  : Number of vertices in the previous chunks.
+
+    Returns:
+        tuple[np.ndarray]:
+            (vertices, face_indices, face_sizes): (V, 3) vertices, 0-based
+            vertex indices of the faces (flat) and size of each face.
+
+    """
+
+    buffer = np.frombuffer(chunk, dtype=np.uint8)
+    line_ends = np.flatnonzero(buffer == ord("\n")) + 1
+    line_starts = np.concatenate(([0], line_ends[:-1]))
+    # line type: "v " / "f " (the second character is a space or a tab)
+    first = buffer[line_starts]
+    second = buffer[np.minimum(line_starts + 1, len(buffer) - 1)]
+    second_is_space = (second == ord(" ")) | (second == ord("\t"))
+    is_vertex = (first == ord("v")) & second_is_space
+    is_face = (first == ord("f")) & second_is_space
+
+    # vertices: all the values, then the first three of each line
+    values, counts = _line_tokens(buffer, line_starts, line_ends, is_vertex)
+    assert np.all(counts >= 3), "A vertex needs three coordinates"
+    if np.all(counts == 3):
+        vertices = values.reshape(-1, 3)
+    else:
+        starts = np.cumsum(counts) - counts
+        vertices = values[starts[:, None] + np.arange(3)]
+
+    # faces: only keep the vertex index of 'v/vt/vn'
+    values, face_sizes = _line_tokens(
+        buffer, line_starts, line_ends, is_face, cut_at_slash=True
+    )
+    indices = values.astype(np.int64)
+    # - 1 because indexes are starting at 1 in .obj files, negative indices
+    # are relative to the vertices defined before the face
+    vertices_before = vertex_base + np.cumsum(is_vertex)[is_face]
+    relative_base = np.repeat(vertices_before, face_sizes)
+    indices = np.where(indices < 0, relative_base + indices, indices - 1)
+    return vertices, indices, face_sizes
+
+
+def _line_tokens(
+    buffer: np.ndarray,
+    line_starts: np.ndarray,
+    line_ends: np.ndarray,
+    selected: np.ndarray,
+    cut_at_slash: bool = False,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Convert the tokens of the selected lines (after their keyword) to numbers.
+
+    Args:
+        buffer       (np.ndarray): Bytes of the chunk.
+        line_starts  (np.ndarray): Start of each line.
+        line_ends    (np.ndarray): End of each line (after its newline).
+        selected     (np.ndarray): Lines to read.
+        cut_at_slash (bool)      :
+            Only keep the part of each token that comes before its first '/'.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]:
+            (values, counts): the values of all the lines (flat) and the number
+            of values in each line.
+
+    """
+
+    if not np.any(selected):
+        return np.zeros(0, dtype=np.float64), np.zeros(0, dtype=np.int64)
+    # selected lines, with their keyword blanked (each one ends with its newline)
+    line_lengths = line_ends - line_starts
+    body = buffer[np.repeat(selected, line_lengths)]
+    lengths = line_lengths[selected]
+    body_starts = np.cumsum(lengths) - lengths
+    body[body_starts] = ord(" ")
+    # whitespace (space, tab, carriage return, newline, etc.)
+    space = body <= ord(" ")
+    if cut_at_slash and ord("/") in body:
+        # blank the bytes that come after a slash in the same token
+        positions = np.arange(len(body), dtype=np.int32)
+        last_space = np.maximum.accumulate(np.where(space, positions, -1))
+        last_slash = np.maximum.accumulate(np.where(body == ord("/"), positions, -1))
+        del positions
+        after_slash = last_slash > last_space
+        body[after_slash] = ord(" ")
+        space |= after_slash
+    token_start = ~space
+    token_start[1:] &= space[:-1]
+    token_starts = np.flatnonzero(token_start)
+    counts = np.diff(
+        np.append(np.searchsorted(token_starts, body_starts), len(token_starts))
+    )
+    values = np.fromstring(body.tobytes(), dtype=np.float64, sep=" ")
+    if len(values) != counts.sum():
+        raise ValueError("Invalid number in the vertex or face lines")
+    return values, counts
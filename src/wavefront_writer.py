@@ -0,0 +1,65 @@
+# Chaikin3D - WaveFront writer module
+from __future__ import annotations
+import _io
+import numpy as np
+
+# number of vertices (or faces) formatted at once
+CHUNK_SIZE = 1 << 16
+
+
+def write_wavefront(
+    stream: _io.TextIOWrapper,
+    vertices: np.ndarray,
+    face_indices: np.ndarray,
+    face_offsets: np.ndarray,
+    precision: int | None = None,
+) -> None:
+    """
+    Write a mesh to a stream, in the WaveFront (.obj) format.
+
+    The lines are formatted chunk by chunk: one '%' formatting (in C) turns a
+    whole chunk of vertices or faces into a single string, which is written at
+    once.
+
+    Args:
+        stream       (_io.TextIOWrapper): Output stream.
+        vertices     (np.ndarray)       : (V, 3) vertex coordinates.
+        face_indices (np.ndarray)       : 0-based vertex indices of the faces (flat).
+        face_offsets (np.ndarray)       : (F + 1,) offsets of the faces in 'face_indices'.
+        precision    (int | None)       :
+            Number of significant digits of the coordinates (None: shortest
+            representation that reads back to the same float).
+
+    """
+
+    stream.write(
+        "# Mesh file generated by https://github.com/Nicolas-Reyland/Chaikin3D\n"
+    )
+
+    # write vertex positions
+    stream.write("\n")
+    number = "%r" if precision is None else f"%.{precision}g"
+    vertex_line = f"v {number} {number} {number}\n"
+    vertices = np.asarray(vertices, dtype=np.float64).reshape(-1, 3)
+    for start in range(0, len(vertices), CHUNK_SIZE):
+        chunk = vertices[start : start + CHUNK_SIZE]
+        stream.write(vertex_line * len(chunk) % tuple(chunk.ravel().tolist()))
+
+    # write faces (one line template per face size)
+    stream.write("\n")
+    face_offsets = np.asarray(face_offsets, dtype=np.int64)
+    sizes = np.diff(face_offsets)
+    templates = dict()
+    for start in range(0, len(sizes), CHUNK_SIZE):
+        chunk_sizes = sizes[start : start + CHUNK_SIZE].tolist()
+        for size in set(chunk_sizes) - templates.keys():
+            templates[size] = "f" + " %d" * size + "\n"
+        if min(chunk_sizes) == max(chunk_sizes):
+            face_lines = templates[chunk_sizes[0]] * len(chunk_sizes)
+        else:
+            face_lines = "".join(map(templates.__getitem__, chunk_sizes))
+        indices = face_indices[
+            face_offsets[start] : face_offsets[start + len(chunk_sizes)]
+        ]
+        # + 1 because indexes are starting at 1 in .obj files
+        stream.write(face_lines % tuple((indices.astype(np.int64) + 1).tolist()))
@@ -0,0 +1,224 @@
+# Chaikin3D - Worker pool module
+from __future__ import annotations
+from collections.abc import Callable, Iterable
+from multiprocessing import resource_tracker, shared_memory
+import multiprocessing
+import numpy as np
+
+# number of chunks per worker (load balancing)
+CHUNKS_PER_WORKER = 4
+
+
+class WorkerPool:
+    """
+    Process pool working on NumPy arrays in shared memory.
+
+    The arrays are registered by name ('share' and 'empty'), in shared memory
+    blocks that the workers attach to. The arrays that already are in shared
+    memory (views on a 'buffer' of the pool, or on another shared array) are
+    registered without being copied. A task is a module-level function
+    'task(arrays, start, stop, *args)' that reads the arrays and writes the
+    rows [start, stop) of its output arrays. 'map' splits a range into chunks
+    and runs one task per chunk: since the chunks are disjoint, the result does
+    not depend on the number of workers or on the scheduling.
+
+    """
+
+    def __init__(self, workers: int):
+        assert workers > 0, f"Number of workers must be positive ({workers} > 0)"
+        self.workers = workers
+        # the workers must share the resource tracker of this process, or
+        # their own trackers would unlink the shared blocks when they exit
+        resource_tracker.ensure_running()
+        self._pool = multiprocessing.Pool(workers)
+        self._blocks: dict[str, shared_memory.SharedMemory] = dict()
+        self._buffers: list[shared_memory.SharedMemory] = list()
+        # (block name, offset, shape, dtype) of every shared array
+        self._specs: dict[str, tuple[str, int, tuple[int, ...], str]] = dict()
+
+    def __enter__(self) -> WorkerPool:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def buffer(self, nbytes: int) -> np.ndarray:
+        """
+        Returns a new raw (uint8) shared buffer, that lives until the pool is
+        closed (it is not freed by 'release').
+
+        Args:
+            nbytes (int): Size of the buffer.
+
+        Returns:
+            np.ndarray: Buffer in shared memory.
+
+        """
+
+        block = shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+        self._buffers.append(block)
+        return np.ndarray(nbytes, dtype=np.uint8, buffer=block.buf)
+
+    def empty(self, key: str, shape: tuple[int, ...], dtype: np.dtype) -> np.ndarray:
+        """
+        Returns a new (uninitialized) shared array.
+
+        Args:
+            key   (str)            : Name of the array in the tasks.
+            shape (tuple[int, ...]): Shape of the array.
+            dtype (np.dtype)       : Type of the elements.
+
+        Returns:
+            np.ndarray: Array in shared memory.
+
+        """
+
+        assert key not in self._specs, f"Shared array {key!r} already exists"
+        dtype = np.dtype(dtype)
+        nbytes = int(np.prod(shape, dtype=np.int64)) * dtype.itemsize
+        block = shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+        self._blocks[key] = block
+        self._specs[key] = (block.name, 0, tuple(shape), dtype.str)
+        return np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+    def share(self, key: str, array: np.ndarray) -> np.ndarray:
+        """
+        Returns a shared array with the content of an array.
+
+        An array that is already in shared memory is shared as is: it is the
+        returned array, and the tasks write into it. Otherwise, it is copied.
+
+        Args:
+            key   (str)       : Name of the array in the tasks.
+            array (np.ndarray): Array to share.
+
+        Returns:
+            np.ndarray: Array in shared memory.
+
+        """
+
+        assert key not in self._specs, f"Shared array {key!r} already exists"
+        if array.flags.c_contiguous:
+            address = array.__array_interface__["data"][0]
+            for block in self._buffers + list(self._blocks.values()):
+                start = np.frombuffer(block.buf, dtype=np.uint8).ctypes.data
+                if start <= address and address + array.nbytes <= start + block.size:
+                    self._specs[key] = (
+                        block.name,
+                        address - start,
+                        tuple(array.shape),
+                        array.dtype.str,
+                    )
+                    return array
+        shared = self.empty(key, array.shape, array.dtype)
+        shared[...] = array
+        return shared
+
+    def map(self, task: Callable, size: int, *args) -> None:
+        """
+        Run a task on all the chunks of the range [0, size).
+
+        Args:
+            task (Callable): Module-level function 'task(arrays, start, stop, *args)'.
+            size (int)     : Size of the range.
+            args (_)       : Extra (picklable) arguments of the task.
+
+        """
+
+        bounds = np.linspace(
+            0, size, min(self.workers * CHUNKS_PER_WORKER, max(size, 1)) + 1
+        ).astype(np.int64)
+        self._pool.starmap(
+            _run_task,
+            (
+                (task, self._specs, start, stop, args)
+                for start, stop in zip(bounds[:-1].tolist(), bounds[1:].tolist())
+                if start < stop
+            ),
+        )
+
+    def release(self) -> None:
+        """
+        Free all the shared arrays (but not the buffers).
+
+        The arrays must not be used anymore (their memory is unmapped as soon
+        as the last reference to them is dropped).
+
+        """
+
+        _free(self._blocks.values())
+        self._blocks.clear()
+        self._specs.clear()
+
+    def close(self) -> None:
+        """
+        Free all the shared arrays and buffers, and stop the workers.
+
+        The arrays and the buffers must not be used anymore.
+
+        """
+
+        self.release()
+        _free(self._buffers)
+        self._buffers.clear()
+        self._pool.close()
+        self._pool.join()
+
+
+def _free(blocks: Iterable[shared_memory.SharedMemory]) -> None:
+    """
+    Unlink shared memory blocks, and unmap the ones that are not used anymore.
+
+    Args:
+        blocks (Iterable[shared_memory.SharedMemory]): Blocks.
+
+    """
+
+    for block in blocks:
+        block.unlink()
+        try:
+            block.close()
+        except BufferError:
+            # still referenced: unmapped by the garbage collector
+            pass
+
+
+def _run_task(
+    task: Callable,
+    specs: dict[str, tuple[str, int, tuple[int, ...], str]],
+    start: int,
+    stop: int,
+    args: tuple,
+) -> None:
+    """
+    Attach the shared arrays and run a task on a chunk (in a worker process).
+
+    Args:
+        task  (Callable): Task.
+        specs (dict[str, tuple[str, int, tuple[int, ...], str]]):
+            (block name, offset, shape, dtype) of every shared array.
+        start (int)     : Start of the chunk.
+        stop  (int)     : End of the chunk.
+        args  (tuple)   : Extra arguments of the task.
+
+    """
+
+    blocks = {
+        name: shared_memory.SharedMemory(name=name) for name, _, _, _ in specs.values()
+    }
+    arrays = {
+        key: np.ndarray(
+            shape, dtype=np.dtype(dtype), buffer=blocks[name].buf, offset=offset
+        )
+        for key, (name, offset, shape, dtype) in specs.items()
+    }
+    try:
+        task(arrays, start, stop, *args)
+    finally:
+        del arrays
+        for block in blocks.values():
+            try:
+                block.close()
+            except BufferError:
+                # still referenced by the traceback of a failed task
+                pass
@@ -0,0 +1,36 @@
+# Chaikin3D - Test configuration
+from __future__ import annotations
+import os
+import sys
+import types
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MESHES = os.path.join(ROOT, "example-meshes")
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+
+@pytest.fixture
+def make_args():
+    """
+    Returns a factory of argument holders, like the ones of 'arg_utils'.
+
+    """
+
+    def make_args(**kwargs) -> types.SimpleNamespace:
+        defaults = {
+            "chaikin_coef": 4.0,
+            "chaikin_kernel": "numpy",
+            "order_edges": "none",
+            "rotate_mesh": False,
+            "workers": 1,
+            "verbosity": 0,
+            "verbose": False,
+        }
+        return types.SimpleNamespace(**{**defaults, **kwargs})
+
+    return make_args
+
+
+def mesh_path(name: str) -> str:
+    return os.path.join(MESHES, name)
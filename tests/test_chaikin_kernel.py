@@ -0,0 +1,111 @@
+# Chaikin3D - Kernel tests
+from __future__ import annotations
+from conftest import MESHES, mesh_path
+from halfedge import HalfEdgeMesh
+import chaikin_kernel
+import mesh_cache
+import numpy as np
+import os
+import pytest
+
+EXAMPLE_MESHES = sorted(name for name in os.listdir(MESHES) if name.endswith(".obj"))
+# generations compared on each mesh (the python kernel takes about a minute
+# for the third generation of the largest one)
+GENERATIONS = {"girl.obj": 2}
+
+
+def points(poly) -> list:
+    return [tuple(point) for point in poly.mesh.vertices.round(9).tolist()]
+
+
+def faces(poly) -> list:
+    # faces as sorted tuples of rounded coordinates (independent of the
+    # vertex numbering of the kernels)
+    mesh = poly.mesh
+    coords = points(poly)
+    return sorted(tuple(sorted(coords[v] for v in face)) for face in mesh.iter_faces())
+
+
+def main_edges(poly) -> list:
+    # main edges as sorted pairs of rounded coordinates, from the object graph
+    # if there is one, from the mesh otherwise
+    if poly.has_object_graph:
+        edges, main = poly.edge_index()
+        edges = edges[main]
+    else:
+        edges = poly.mesh.edges[poly.mesh.edge_main]
+    coords = points(poly)
+    return sorted(tuple(sorted((coords[a], coords[b]))) for a, b in edges.tolist())
+
+
+def assert_same_generation(numpy_poly, python_poly) -> None:
+    assert not numpy_poly.has_object_graph and python_poly.has_object_graph
+    assert len(numpy_poly) == len(python_poly)
+    assert faces(numpy_poly) == faces(python_poly)
+    assert main_edges(numpy_poly) == main_edges(python_poly)
+
+
+@pytest.mark.parametrize("name", EXAMPLE_MESHES)
+def test_kernels_agree(make_args, name):
+    # the faces of the second and third generations have graphical edges on
+    # most of these meshes (see 'chaikin_kernel.chaikin_step')
+    numpy_poly = python_poly = mesh_cache.load_polyhedron(mesh_path(name))
+    for _ in range(GENERATIONS.get(name, 3)):
+        numpy_poly = numpy_poly.chaikin(1, make_args())
+        python_poly = python_poly.chaikin(1, make_args(chaikin_kernel="python"))
+        assert_same_generation(numpy_poly, python_poly)
+
+
+@pytest.mark.parametrize(
+    "name,order_edges",
+    [("cube.obj", "all"), ("diamond.obj", "first"), ("diamond.obj", "all")],
+)
+def test_kernels_agree_with_ordered_edges(make_args, name, order_edges):
+    numpy_poly = mesh_cache.load_polyhedron(mesh_path(name)).chaikin(
+        3, make_args(order_edges=order_edges)
+    )
+    python_poly = mesh_cache.load_polyhedron(mesh_path(name)).chaikin(
+        3, make_args(order_edges=order_edges, chaikin_kernel="python")
+    )
+    assert_same_generation(numpy_poly, python_poly)
+
+
+def test_graphical_edges_are_kept(make_args):
+    # the graphical edges of a numpy generation stay graphical in the object
+    # graph built from its mesh
+    poly = mesh_cache.load_polyhedron(mesh_path("dog.obj")).chaikin(2, make_args())
+    mesh_main_edges = main_edges(poly)
+    assert len(mesh_main_edges) < poly.mesh.num_edges
+    poly.nodes
+    assert main_edges(poly) == mesh_main_edges
+
+
+@pytest.mark.parametrize("name", EXAMPLE_MESHES)
+def test_predicted_counts(make_args, name):
+    poly = mesh_cache.load_polyhedron(mesh_path(name))
+    plan = poly.plan(3, make_args(), render=False)
+    assert [row["memory"] for row in plan] == poly.memory_plan(
+        3, make_args(), render=False
+    )
+    for row in plan[1:]:
+        poly = poly.chaikin(1, make_args())
+        mesh = poly.mesh
+        assert (row["vertices"], row["faces"], row["half-edges"]) == (
+            mesh.num_vertices,
+            mesh.num_faces,
+            mesh.num_half_edges,
+        )
+        assert row["main edges"] == mesh.edge_main.sum()
+        # the graphical edges are not predicted
+        assert row["main edges"] <= mesh.num_edges <= row["half-edges"]
+
+
+def test_workers_give_the_same_mesh():
+    # the generations are written in the shared buffers of the workers, and
+    # the last one is copied out of them before they are freed
+    mesh = mesh_cache.load_polyhedron(mesh_path("dog.obj")).mesh
+    rotations = [True, False, False]
+    expected, _, _ = chaikin_kernel.chaikin(mesh, 4.0, rotations)
+    result, _, _ = chaikin_kernel.chaikin(mesh, 4.0, rotations, workers=2)
+    for name in HalfEdgeMesh.ARRAYS:
+        assert np.array_equal(getattr(result, name), getattr(expected, name)), name
@@ -0,0 +1,47 @@
+# Chaikin3D - Checkpoint tests
+from __future__ import annotations
+from arg_utils import gen_arg_parser, read_args
+from checkpoint import Checkpoint
+from conftest import mesh_path
+from halfedge import HalfEdgeMesh
+from unittest import mock
+import glob
+import mesh_cache
+import numpy as np
+import os
+import pytest
+
+
+def run(args, generations: int, directory: str = None):
+    path = mesh_path("dog.obj")
+    poly = mesh_cache.load_polyhedron(path)
+    checkpoint = None if directory is None else Checkpoint(directory, path, args)
+    return poly.chaikin(generations, args, checkpoint)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_resumed_run_equals_direct_run(make_args, tmp_path, workers):
+    # the second generation of dog.obj has graphical edges (see 'HalfEdgeMesh.edge_main')
+    args = make_args(workers=workers)
+    direct = run(args, 3).mesh
+    run(args, 2, str(tmp_path))
+    assert len(glob.glob(os.path.join(tmp_path, "*.ckpt"))) == 2
+    resumed = run(args, 3, str(tmp_path)).mesh
+    for name in HalfEdgeMesh.ARRAYS:
+        assert np.array_equal(getattr(resumed, name), getattr(direct, name)), name
+
+
+def test_python_kernel_is_rejected(make_args, tmp_path):
+    with pytest.raises(AssertionError):
+        Checkpoint(
+            str(tmp_path), mesh_path("dog.obj"), make_args(chaikin_kernel="python")
+        )
+    parser = gen_arg_parser()
+    argv = ["chaikin3d.py", "-i", mesh_path("dog.obj"), "-cpd", str(tmp_path)]
+    with mock.patch("sys.argv", [*argv, "-ck", "numpy"]):
+        assert read_args(parser)["checkpoint dir"] == str(tmp_path)
+    # (the "python" kernel is the default one)
+    for kernel in ([], ["-ck", "python"]):
+        with mock.patch("sys.argv", [*argv, *kernel]):
+            with pytest.raises(AssertionError, match="checkpoint-dir"):
+                read_args(parser)
@@ -0,0 +1,35 @@
+# Chaikin3D - Generation cache tests
+from __future__ import annotations
+from conftest import mesh_path
+from generation_cache import GenerationCache
+from halfedge import HalfEdgeMesh
+import mesh_cache
+import numpy as np
+import pytest
+
+
+@pytest.mark.parametrize("kernel", ["numpy", "python"])
+def test_prefetched_generations_are_the_same(make_args, kernel):
+    args = make_args(chaikin_kernel=kernel)
+    poly = mesh_cache.load_polyhedron(mesh_path("dog.obj"))
+    expected = list(GenerationCache().generations(poly, 3, args))
+    poly = mesh_cache.load_polyhedron(mesh_path("dog.obj"))
+    prefetched = list(GenerationCache().generations(poly, 3, args, prefetch=1))
+    assert len(prefetched) == len(expected) == 4
+    for expected_poly, prefetched_poly in zip(expected, prefetched):
+        for name in HalfEdgeMesh.ARRAYS:
+            assert np.array_equal(
+                getattr(prefetched_poly.mesh, name), getattr(expected_poly.mesh, name)
+            ), name
+
+
+def test_python_object_graph_is_not_prefetched(make_args, capsys):
+    # the object graph of generation 1 is not sent to the worker: the next
+    # generations are computed in this process, and the verbose mode says so
+    args = make_args(chaikin_kernel="python")
+    cache = GenerationCache(verbose=True)
+    poly = mesh_cache.load_polyhedron(mesh_path("cube.obj"))
+    cache.chaikin(poly, 1, args)
+    generations = list(cache.generations(poly, 3, args, prefetch=1))
+    assert len(generations) == 4 and generations[3].has_object_graph
+    assert "without prefetching" in capsys.readouterr().out
@@ -0,0 +1,155 @@
+# Chaikin3D - Mesh writers tests
+from __future__ import annotations
+from conftest import mesh_path
+from triangles import triangulate_faces
+from wavefront_reader import WaveFrontReader
+from wavefront_writer import write_wavefront
+import json
+import mesh_cache
+import mesh_writers
+import numpy as np
+import pytest
+import struct
+
+
+@pytest.fixture(params=[("cube.obj", 2), ("dog.obj", 1), ("dodecahedron.obj", 0)])
+def reference(request, make_args, tmp_path):
+    """
+    Returns (vertices, face_indices, face_offsets) of a mesh, read back from
+    the OBJ file written by 'write_wavefront'.
+
+    """
+
+    name, generations = request.param
+    mesh = (
+        mesh_cache.load_polyhedron(mesh_path(name))
+        .chaikin(generations, make_args())
+        .mesh
+    )
+    path = tmp_path / "reference.obj"
+    with open(path, "w") as f:
+        write_wavefront(f, mesh.vertices, mesh.he_vertex, mesh.face_offsets)
+    reader = WaveFrontReader(str(path))
+    return reader.vertices, reader.face_indices, reader.face_offsets
+
+
+def read_ply(path) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    with open(path, "rb") as f:
+        data = f.read()
+    header_end = data.index(b"end_header\n") + len(b"end_header\n")
+    header = data[:header_end].decode("ascii").splitlines()
+    assert header[1] == "format binary_little_endian 1.0"
+    num_vertices = int(
+        next(l for l in header if l.startswith("element vertex")).split()[2]
+    )
+    num_faces = int(next(l for l in header if l.startswith("element face")).split()[2])
+    count_type = next(l for l in header if l.startswith("property list")).split()[2]
+    count_dtype = np.dtype("<u1" if count_type == "uchar" else "<i4")
+    vertices = np.frombuffer(data, "<f4", 3 * num_vertices, header_end).reshape(-1, 3)
+    offset = header_end + vertices.nbytes
+    face_indices = list()
+    face_offsets = [0]
+    for _ in range(num_faces):
+        (size,) = np.frombuffer(data, count_dtype, 1, offset)
+        offset += count_dtype.itemsize
+        face_indices.append(np.frombuffer(data, "<i4", size, offset))
+        offset += 4 * int(size)
+        face_offsets.append(face_offsets[-1] + int(size))
+    assert offset == len(data)
+    return vertices, np.concatenate(face_indices), np.array(face_offsets)
+
+
+def read_stl(path) -> np.ndarray:
+    with open(path, "rb") as f:
+        data = f.read()
+    (num_facets,) = struct.unpack_from("<I", data, 80)
+    assert len(data) == 84 + 50 * num_facets
+    facets = np.frombuffer(
+        data,
+        [("normal", "<f4", (3,)), ("vertices", "<f4", (3, 3)), ("attr", "<u2")],
+        num_facets,
+        84,
+    )
+    return facets["vertices"]
+
+
+def read_glb(path) -> tuple[np.ndarray, np.ndarray]:
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, length = struct.unpack_from("<4sII", data)
+    assert (magic, version, length) == (b"glTF", 2, len(data))
+    json_length, json_type = struct.unpack_from("<I4s", data, 12)
+    assert json_type == b"JSON"
+    gltf = json.loads(data[20 : 20 + json_length])
+    binary_start = 20 + json_length + 8
+    assert struct.unpack_from("<I4s", data, binary_start - 8)[1] == b"BIN\x00"
+
+    def accessor(index: int, dtype: str, width: int) -> np.ndarray:
+        spec = gltf["accessors"][index]
+        view = gltf["bufferViews"][spec["bufferView"]]
+        return np.frombuffer(
+            data, dtype, spec["count"] * width, binary_start + view["byteOffset"]
+        ).reshape(spec["count"], width)
+
+    primitive = gltf["meshes"][0]["primitives"][0]
+    positions = accessor(primitive["attributes"]["POSITION"], "<f4", 3)
+    indices = accessor(primitive["indices"], "<u4", 1).reshape(-1, 3)
+    return positions, indices
+
+
+def test_ply_round_trip(reference, tmp_path):
+    vertices, face_indices, face_offsets = reference
+    path = tmp_path / "mesh.ply"
+    mesh_writers.write_ply(path, vertices, face_indices, face_offsets)
+    ply_vertices, ply_indices, ply_offsets = read_ply(path)
+    assert np.array_equal(ply_vertices, vertices.astype(np.float32))
+    assert np.array_equal(ply_indices, face_indices)
+    assert np.array_equal(ply_offsets, face_offsets)
+
+
+def test_ply_large_faces(tmp_path):
+    # faces with more than 255 vertices: the sizes are written as 'int'
+    vertices = np.random.default_rng(0).random((300, 3))
+    face_indices = np.concatenate((np.arange(300), np.arange(3)))
+    face_offsets = np.array([0, 300, 303])
+    path = tmp_path / "mesh.ply"
+    mesh_writers.write_ply(path, vertices, face_indices, face_offsets)
+    ply_vertices, ply_indices, ply_offsets = read_ply(path)
+    assert np.array_equal(ply_vertices, vertices.astype(np.float32))
+    assert np.array_equal(ply_indices, face_indices)
+    assert np.array_equal(ply_offsets, face_offsets)
+
+
+def test_stl_round_trip(reference, tmp_path):
+    vertices, face_indices, face_offsets = reference
+    triangles = triangulate_faces(face_indices, face_offsets)
+    path = tmp_path / "mesh.stl"
+    mesh_writers.write_stl(path, vertices, triangles)
+    assert np.array_equal(read_stl(path), vertices.astype(np.float32)[triangles])
+
+
+def test_glb_round_trip(reference, tmp_path):
+    vertices, face_indices, face_offsets = reference
+    triangles = triangulate_faces(face_indices, face_offsets)
+    path = tmp_path / "mesh.glb"
+    mesh_writers.write_glb(path, vertices, triangles)
+    positions, indices = read_glb(path)
+    assert np.array_equal(positions, vertices.astype(np.float32))
+    assert np.array_equal(indices, triangles)
+
+
+def test_obj_holds_the_mesh_faces(make_args, tmp_path):
+    # with the "python" kernel too: the faces are ordered, and the two-node
+    # groups of the open vertices are not faces
+    poly = mesh_cache.load_polyhedron(mesh_path("deer.obj")).chaikin(
+        2, make_args(chaikin_kernel="python")
+    )
+    assert poly.has_object_graph
+    path = tmp_path / "mesh.obj"
+    with open(path, "w") as f:
+        poly.save(f)
+    reader = WaveFrontReader(str(path))
+    mesh = poly.mesh
+    assert np.array_equal(reader.vertices, mesh.vertices.astype(np.float32))
+    assert np.array_equal(reader.face_indices, mesh.he_vertex)
+    assert np.array_equal(reader.face_offsets, mesh.face_offsets)